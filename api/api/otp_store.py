@@ -0,0 +1,235 @@
+"""
+Pluggable OTP storage backends
+
+Each backend keeps one live code per (user_id, method) and verifies it with a
+single atomic compare-and-increment, so a double-submitted code can only
+succeed once and a guess costs exactly one write. Every submission counts
+as an attempt; a submission beyond max_attempts locks the code (the 4th
+with the default of 3), whether or not it matches.
+
+Backends:
+    memory - process-local dict (development / single worker)
+    redis  - Redis hash per code with native TTL, verified by a Lua script
+    sql    - the existing OTPCode table, verified by a conditional UPDATE
+"""
+
+import hmac
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Verification outcomes
+VERIFIED = 'verified'
+INVALID = 'invalid'
+LOCKED = 'locked'
+MISSING = 'missing'
+
+
+class MemoryOTPStore:
+    """In-process OTP store keyed by (user_id, method)"""
+
+    def __init__(self):
+        self._codes = {}
+        self._lock = threading.Lock()
+
+    def put(self, user_id, method, code, ttl_seconds):
+        with self._lock:
+            self._codes[(user_id, method)] = {
+                'code': str(code),
+                'expires_at': time.time() + ttl_seconds,
+                'attempts': 0
+            }
+        return True
+
+    def verify(self, user_id, method, code, max_attempts):
+        """Return (outcome, attempts_remaining)"""
+        key = (user_id, method)
+        with self._lock:
+            entry = self._codes.get(key)
+            if not entry or entry['expires_at'] <= time.time():
+                self._codes.pop(key, None)
+                return MISSING, 0
+
+            entry['attempts'] += 1
+            if entry['attempts'] > max_attempts:
+                del self._codes[key]
+                return LOCKED, 0
+            if hmac.compare_digest(entry['code'], str(code).strip()):
+                del self._codes[key]
+                return VERIFIED, 0
+            return INVALID, max_attempts - entry['attempts']
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._codes.items() if entry['expires_at'] <= now]
+            for key in expired:
+                del self._codes[key]
+        return len(expired)
+
+
+class RedisOTPStore:
+    """Redis OTP store; expiry is handled by key TTL"""
+
+    # No sweeper needed
+    expires_itself = True
+
+    # KEYS[1] = otp key, ARGV[1] = submitted code, ARGV[2] = max attempts
+    VERIFY_SCRIPT = """
+local code = redis.call('HGET', KEYS[1], 'code')
+if not code then
+    return {'missing', 0}
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+local max_attempts = tonumber(ARGV[2])
+if attempts > max_attempts then
+    redis.call('DEL', KEYS[1])
+    return {'locked', 0}
+end
+if code == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return {'verified', 0}
+end
+return {'invalid', max_attempts - attempts}
+"""
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._verify = self._redis.register_script(self.VERIFY_SCRIPT)
+
+    @staticmethod
+    def _key(user_id, method):
+        return f"otp:{user_id}:{method}"
+
+    def put(self, user_id, method, code, ttl_seconds):
+        key = self._key(user_id, method)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping={'code': str(code), 'attempts': 0})
+        pipe.expire(key, ttl_seconds)
+        pipe.execute()
+        return True
+
+    def verify(self, user_id, method, code, max_attempts):
+        outcome, remaining = self._verify(
+            keys=[self._key(user_id, method)],
+            args=[str(code).strip(), max_attempts]
+        )
+        if isinstance(outcome, bytes):
+            outcome = outcome.decode()
+        return outcome, int(remaining)
+
+    def sweep(self):
+        # Keys expire on their own
+        return 0
+
+
+class SQLOTPStore:
+    """OTP store on the OTPCode table using conditional UPDATEs"""
+
+    def put(self, user_id, method, code, ttl_seconds):
+        from models import db, OTPCode
+        try:
+            OTPCode.query.filter_by(user_id=user_id, method=method, is_used=False).delete()
+            db.session.add(OTPCode(
+                user_id=user_id,
+                code=code,
+                method=method,
+                expiry=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+            ))
+            db.session.commit()
+            return True
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def verify(self, user_id, method, code, max_attempts):
+        from models import db, OTPCode
+        from sqlalchemy import or_, update
+        code = str(code).strip()
+        # One conditional UPDATE counts the attempt, consumes the code on a
+        # match or past max_attempts, and returns what it did; a concurrent
+        # double submit finds is_used already set and matches no row
+        statement = update(OTPCode).where(
+            OTPCode.user_id == user_id,
+            OTPCode.method == method,
+            OTPCode.is_used == False,
+            OTPCode.expiry > datetime.utcnow()
+        ).values(
+            attempts=OTPCode.attempts + 1,
+            is_used=or_(OTPCode.code == code, OTPCode.attempts + 1 > max_attempts)
+        ).returning(OTPCode.attempts, OTPCode.code == code).execution_options(synchronize_session=False)
+        try:
+            row = db.session.execute(statement).first()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if row is None:
+            return MISSING, 0
+        attempts, matched = row
+        if attempts > max_attempts:
+            return LOCKED, 0
+        if matched:
+            return VERIFIED, 0
+        return INVALID, max_attempts - attempts
+
+    def sweep(self):
+        from models import db, OTPCode
+        try:
+            expired = OTPCode.query.filter(
+                (OTPCode.expiry < datetime.utcnow()) | (OTPCode.is_used == True)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            return expired
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def create_otp_store(backend=None, redis_url=None):
+    """Build the store named by OTP_STORE_BACKEND (memory, redis or sql)"""
+    backend = backend or os.environ.get('OTP_STORE_BACKEND', 'sql')
+    if backend == 'memory':
+        return MemoryOTPStore()
+    if backend == 'redis':
+        return RedisOTPStore(redis_url or os.environ.get('OTP_REDIS_URL', 'redis://localhost:6379/0'))
+    return SQLOTPStore()
+
+
+class OTPSweeper:
+    """Background thread that periodically purges expired codes"""
+
+    def __init__(self, store, interval_seconds=300, app=None):
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.app = app
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='otp-sweeper')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        removed = self.store.sweep()
+                else:
+                    removed = self.store.sweep()
+                if removed:
+                    print(f"🧹 Swept {removed} expired OTPs")
+            except Exception as e:
+                print(f"⚠️ OTP sweep failed: {str(e)}")
@@ -5,9 +5,9 @@ OTP Service for email and SMS verification
 import random
 import string
 import secrets
-from datetime import datetime, timedelta
 from flask import current_app
-from models import db, User, OTPCode
+from models import User
+from otp_store import create_otp_store, OTPSweeper, VERIFIED, LOCKED, MISSING
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -17,89 +17,53 @@ import json
 class OTPService:
     """Service to handle OTP generation and verification via Email/SMS"""
     
-    def __init__(self):
+    def __init__(self, store=None):
         self.otp_expiry_minutes = 5
         self.otp_length = 6
+        self.max_attempts = 3
+        self.store = store or create_otp_store()
+        self._sweeper = None
     
     def generate_otp(self):
         """Generate a 6-digit OTP"""
         return ''.join([str(random.randint(0, 9)) for _ in range(self.otp_length)])
     
     def store_otp(self, user_id, otp, method='email'):
-        """Store OTP in database"""
+        """Store OTP, replacing any live code for this user and method"""
         try:
-            # Delete any existing unused OTPs for this user and method
-            OTPCode.query.filter_by(
-                user_id=user_id, 
-                method=method,
-                is_used=False
-            ).delete()
-            
-            # Create new OTP
-            expiry = datetime.utcnow() + timedelta(minutes=self.otp_expiry_minutes)
-            otp_code = OTPCode(
-                user_id=user_id,
-                code=otp,
-                method=method,
-                expiry=expiry
-            )
-            db.session.add(otp_code)
-            db.session.commit()
-            
-            print(f"📝 Stored OTP in DB for user {user_id} via {method}: {otp}")
+            self.store.put(user_id, method, otp, self.otp_expiry_minutes * 60)
+            print(f"📝 Stored OTP for user {user_id} via {method}")
+            # The first stored code starts the purge of expired ones
+            if self._sweeper is None and not getattr(self.store, 'expires_itself', False):
+                self.start_sweeper(current_app._get_current_object())
             return True
         except Exception as e:
             print(f"❌ Failed to store OTP: {str(e)}")
-            db.session.rollback()
             return False
     
     def verify_otp(self, user_id, otp, method='email'):
-        """Verify the provided OTP from database"""
+        """
+        Verify the provided OTP with a single atomic compare-and-increment
+
+        Every submission counts as an attempt; the one after the third
+        (more than max_attempts) locks the code, as before.
+        """
         try:
-            print(f"🔐 Verifying OTP for user {user_id} via {method}: received '{otp}'")
-            
-            # Find the OTP in database
-            otp_record = OTPCode.query.filter_by(
-                user_id=user_id,
-                method=method,
-                is_used=False
-            ).order_by(OTPCode.created_at.desc()).first()
-            
-            if not otp_record:
-                print(f"❌ No OTP found in DB for user {user_id} via {method}")
-                return {'success': False, 'message': 'No OTP found. Please request a new one.'}
-            
-            print(f"🔐 Found OTP in DB: '{otp_record.code}', Received: '{otp}'")
-            
-            # Check expiry
-            if datetime.utcnow() > otp_record.expiry:
-                otp_record.is_used = True  # Mark as used
-                db.session.commit()
-                return {'success': False, 'message': 'OTP expired. Please request a new one.'}
-            
-            # Check attempts
-            otp_record.attempts += 1
-            db.session.commit()
-            
-            if otp_record.attempts > 3:
-                otp_record.is_used = True  # Mark as used after too many attempts
-                db.session.commit()
-                return {'success': False, 'message': 'Too many failed attempts. Please request a new OTP.'}
-            
-            # Verify OTP - compare as strings
-            if str(otp_record.code).strip() == str(otp).strip():
-                otp_record.is_used = True  # Mark as used
-                db.session.commit()
-                print(f"✅ OTP verified successfully")
-                return {'success': True, 'message': 'OTP verified successfully'}
-            
-            print(f"❌ OTP mismatch")
-            return {'success': False, 'message': f"Invalid OTP. {3 - otp_record.attempts} attempts remaining."}
-            
+            outcome, remaining = self.store.verify(user_id, method, otp, self.max_attempts)
         except Exception as e:
             print(f"❌ Error verifying OTP: {str(e)}")
-            db.session.rollback()
             return {'success': False, 'message': 'Error verifying OTP. Please try again.'}
+        
+        if outcome == VERIFIED:
+            print(f"✅ OTP verified successfully")
+            return {'success': True, 'message': 'OTP verified successfully'}
+        if outcome == MISSING:
+            return {'success': False, 'message': 'No valid OTP found. Please request a new one.'}
+        if outcome == LOCKED:
+            return {'success': False, 'message': 'Too many failed attempts. Please request a new OTP.'}
+        
+        print(f"❌ OTP mismatch")
+        return {'success': False, 'message': f"Invalid OTP. {remaining} attempts remaining."}
     
     def send_otp_email(self, user, otp):
         """Send OTP via email"""
@@ -284,18 +248,19 @@ ONTECH ICT Management System
             }
     
     def cleanup_expired_otps(self):
-        """Remove expired OTPs from database"""
+        """Remove expired OTPs from the store"""
         try:
-            current_time = datetime.utcnow()
-            expired_count = OTPCode.query.filter(
-                OTPCode.expiry < current_time
-            ).delete()
-            db.session.commit()
-            return expired_count
+            return self.store.sweep()
         except Exception as e:
             print(f"❌ Error cleaning up expired OTPs: {str(e)}")
-            db.session.rollback()
             return 0
+    
+    def start_sweeper(self, app=None, interval_seconds=300):
+        """Start the background sweeper that replaces ad-hoc cleanup calls (store_otp does on first use)"""
+        if self._sweeper is None:
+            self._sweeper = OTPSweeper(self.store, interval_seconds, app)
+        self._sweeper.start()
+        return self._sweeper
 
 # Create global instance
 otp_service = OTPService()
\ No newline at end of file
@@ -6,20 +6,54 @@ Two-Factor Authentication Service for ONTECH ICT Management System
 import random
 import string
 import secrets
+import hmac
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from flask import current_app, request
 import pyotp
 from models import db, TwoFactorMethod, TwoFactorBackupCode, TwoFactorSession, TwoFactorAuditLog
 from services.sms_service import SMSService
 from services.notification_service import NotificationService
 
+TOTP_VALID_WINDOW = 1  # accept codes from one step either side of now
+
+
+@lru_cache(maxsize=1024)
+def _parse_device_name(user_agent):
+    """Parse device name from user agent"""
+    # Simple parsing - can be enhanced
+    if 'Mobile' in user_agent:
+        return 'Mobile Device'
+    elif 'Tablet' in user_agent:
+        return 'Tablet'
+    else:
+        return 'Desktop'
+
+
+def _totp_window_codes(secret, counter, window=TOTP_VALID_WINDOW):
+    """All valid codes for the steps around `counter` (not memoised: that would keep secrets in memory)"""
+    totp = pyotp.TOTP(secret)
+    return tuple(totp.generate_otp(counter + offset) for offset in range(-window, window + 1))
+
+
 class TwoFactorService:
     """Service to handle all 2FA operations"""
     
+    # Only write TwoFactorSession.last_activity this often per trusted token
+    ACTIVITY_WRITE_INTERVAL = 60
+    
     def __init__(self):
         self.sms_service = SMSService()
         self.notification_service = NotificationService()
     
+    def _verify_totp(self, secret, code):
+        """Check the code against every step in the window in one pass"""
+        counter = int(time.time()) // pyotp.TOTP(secret).interval
+        submitted = str(code).strip()
+        matches = [hmac.compare_digest(candidate, submitted) for candidate in _totp_window_codes(secret, counter)]
+        return any(matches)
+    
     def enable_2fa_for_user(self, user, method_type='email', contact_info=None):
         """Enable 2FA for a user with specified method"""
         try:
@@ -91,9 +125,10 @@ class TwoFactorService:
     def verify_2fa_code(self, user, code, method_id=None):
         """Verify a 2FA code"""
         try:
-            # Get the 2FA method
+            # Get the 2FA method; methods are read from the DB on every use, so
+            # disabling 2FA takes effect in every worker at once
             if method_id:
-                method = TwoFactorMethod.query.get(method_id)
+                method = TwoFactorMethod.query.filter_by(id=method_id, user_id=user.id).first()
             else:
                 # Get primary method
                 method = TwoFactorMethod.query.filter_by(
@@ -106,29 +141,25 @@ class TwoFactorService:
             
             # Verify based on method type
             if method.method_type == 'totp':
-                totp = pyotp.TOTP(method.totp_secret)
-                if totp.verify(code, valid_window=1):
-                    success = True
-                else:
-                    success = False
+                success = self._verify_totp(method.totp_secret, code)
             else:
                 # SMS or Email verification
                 success = method.verify_code(code)
             
             if success:
-                method.last_used = datetime.utcnow()
+                backup_codes = None
+                now = datetime.utcnow()
+                method.last_used = now
                 
                 # Update user's 2FA status
                 if not user.two_factor_enabled:
                     user.two_factor_enabled = True
-                    user.two_factor_enabled_at = datetime.utcnow()
+                    user.two_factor_enabled_at = now
                     
                     # Generate backup codes on first enable
                     backup_codes = TwoFactorBackupCode.generate_backup_codes(user.id)
-                    
-                db.session.commit()
                 
-                # Create trusted session
+                # Create trusted session in the same transaction
                 session = TwoFactorSession.create_session(
                     user_id=user.id,
                     device_info=self._get_device_info()
@@ -228,7 +259,6 @@ class TwoFactorService:
             if backup:
                 backup.is_used = True
                 backup.used_at = datetime.utcnow()
-                db.session.commit()
                 
                 # Create session
                 session = TwoFactorSession.create_session(
@@ -310,18 +340,25 @@ class TwoFactorService:
     def check_trusted_device(self, user, session_token=None):
         """Check if the current device is trusted"""
         try:
-            if session_token:
-                session = TwoFactorSession.query.filter_by(
-                    user_id=user.id,
-                    session_token=session_token
-                ).first()
-                
-                if session and session.expires_at > datetime.utcnow():
-                    session.last_activity = datetime.utcnow()
-                    db.session.commit()
-                    return True
+            if not session_token:
+                return False
             
-            return False
+            # Checked against the DB on every use, so a revoked session is
+            # refused by every worker at once
+            now = datetime.utcnow()
+            session = TwoFactorSession.query.filter_by(
+                user_id=user.id,
+                session_token=session_token
+            ).first()
+            if not session or session.expires_at <= now:
+                return False
+            
+            # Throttle last_activity writes; the stored time is shared by all workers
+            if (session.last_activity is None or
+                    (now - session.last_activity).total_seconds() >= self.ACTIVITY_WRITE_INTERVAL):
+                session.last_activity = now
+                db.session.commit()
+            return True
             
         except Exception as e:
             current_app.logger.error(f"Error checking trusted device: {str(e)}")
@@ -431,14 +468,8 @@ class TwoFactorService:
         return {}
     
     def _parse_device_name(self, user_agent):
-        """Parse device name from user agent"""
-        # Simple parsing - can be enhanced
-        if 'Mobile' in user_agent:
-            return 'Mobile Device'
-        elif 'Tablet' in user_agent:
-            return 'Tablet'
-        else:
-            return 'Desktop'
+        """Parse device name from user agent (memoised)"""
+        return _parse_device_name(user_agent)
 
 # Create singleton instance
 two_factor_service = TwoFactorService()
\ No newline at end of file
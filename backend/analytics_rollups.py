@@ -0,0 +1,217 @@
+"""
+Analytics rollups
+
+Member growth and revenue are pre-aggregated into daily and monthly summary
+rows (growth per constituency and ward), and engagement counts into a dated
+snapshot, so the analytics endpoints read a few hundred rows instead of
+scanning members, payments and activity tables on every request.
+
+Refreshes are incremental: rows created since the stored watermark give the
+earliest affected period, and only periods from there on are re-aggregated
+with indexed range scans. Deletions leave no change timestamp, so a full
+rebuild runs on a longer interval.
+
+Run once from cron with `python analytics_rollups.py [--full]`, or let
+AnalyticsRollupJob refresh in the background of the API process.
+"""
+import argparse
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Member, MemberActivity, MembershipPayment
+from models_enhanced import (
+    Donation, TrainingAttendance, Volunteer, PollResponse,
+    MemberGrowthRollup, RevenueRollup, EngagementSnapshot, RollupWatermark
+)
+
+ANALYTICS_ROLLUP_INTERVAL = int(os.getenv("ANALYTICS_ROLLUP_INTERVAL", "300"))
+ANALYTICS_ROLLUP_FULL_INTERVAL = int(os.getenv("ANALYTICS_ROLLUP_FULL_INTERVAL", "86400"))
+
+PERIODS = ("day", "month")
+WATERMARK = "analytics"
+# Rows committed shortly after a refresh read can carry an earlier
+# created_at; re-scanning a small overlap is harmless because periods are
+# recomputed, not incremented
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+class AnalyticsRollups:
+    def is_ready(self, db: Session) -> bool:
+        """True once the rollups have been built at least once"""
+        return db.query(RollupWatermark.name).filter(RollupWatermark.name == WATERMARK).first() is not None
+
+    def refresh(self, db: Session, full: bool = False) -> None:
+        """Bring the rollups up to date; full=True rebuilds them from scratch"""
+        now = datetime.utcnow()
+        watermark = db.query(RollupWatermark).filter(RollupWatermark.name == WATERMARK).with_for_update().first()
+        if watermark is None:
+            watermark = RollupWatermark(name=WATERMARK, high_water=now)
+            db.add(watermark)
+            full = True
+
+        since = None if full else watermark.high_water - WATERMARK_OVERLAP
+
+        self._refresh_growth(db, since)
+        self._refresh_revenue(db, "membership", MembershipPayment.payment_date,
+                              MembershipPayment.amount, MembershipPayment.created_at, since)
+        self._refresh_revenue(db, "donation", Donation.donation_date, Donation.amount, Donation.created_at, since)
+        self._snapshot_engagement(db, now)
+
+        watermark.high_water = now
+        if full:
+            watermark.last_full_refresh = now
+        db.commit()
+
+    def _refresh_from(self, db: Session, event_column, created_column, since) -> Optional[date]:
+        """Month start of the earliest event changed since the watermark (None: nothing to do)"""
+        if since is None:
+            earliest = db.query(func.min(event_column)).scalar()
+        else:
+            earliest = db.query(func.min(event_column)).filter(created_column >= since).scalar()
+        return _month_start(earliest) if earliest else None
+
+    def _refresh_growth(self, db: Session, since) -> None:
+        start = self._refresh_from(db, Member.registration_date, Member.created_at, since)
+        if since is None:
+            db.query(MemberGrowthRollup).delete(synchronize_session=False)
+        if start is None:
+            return
+
+        for period in PERIODS:
+            db.query(MemberGrowthRollup).filter(
+                MemberGrowthRollup.period_type == period,
+                MemberGrowthRollup.period_start >= start
+            ).delete(synchronize_session=False)
+
+            bucket = cast(func.date_trunc(period, Member.registration_date), Date)
+            db.execute(MemberGrowthRollup.__table__.insert().from_select(
+                ["period_type", "period_start", "constituency", "ward", "new_members"],
+                select(literal(period), bucket, Member.constituency, Member.ward, func.count()).where(
+                    Member.registration_date >= start
+                ).group_by(bucket, Member.constituency, Member.ward)
+            ))
+
+    def _refresh_revenue(self, db: Session, source: str, event_column, amount_column, created_column, since) -> None:
+        start = self._refresh_from(db, event_column, created_column, since)
+        if since is None:
+            db.query(RevenueRollup).filter(RevenueRollup.source == source).delete(synchronize_session=False)
+        if start is None:
+            return
+
+        for period in PERIODS:
+            db.query(RevenueRollup).filter(
+                RevenueRollup.period_type == period,
+                RevenueRollup.source == source,
+                RevenueRollup.period_start >= start
+            ).delete(synchronize_session=False)
+
+            bucket = cast(func.date_trunc(period, event_column), Date)
+            db.execute(RevenueRollup.__table__.insert().from_select(
+                ["period_type", "period_start", "source", "amount", "transactions"],
+                select(literal(period), bucket, literal(source), func.sum(amount_column), func.count()).where(
+                    event_column >= start
+                ).group_by(bucket)
+            ))
+
+    def _snapshot_engagement(self, db: Session, now: datetime) -> None:
+        snapshot = db.get(EngagementSnapshot, now.date()) or EngagementSnapshot(snapshot_date=now.date())
+        snapshot.total_members = db.query(func.count(Member.id)).scalar()
+        snapshot.activity_participants = db.query(func.count(func.distinct(MemberActivity.member_id))).scalar()
+        snapshot.training_participants = db.query(func.count(func.distinct(TrainingAttendance.member_id))).scalar()
+        snapshot.active_volunteers = db.query(func.count(Volunteer.id)).filter(Volunteer.status == "active").scalar()
+        snapshot.poll_participants = db.query(func.count(func.distinct(PollResponse.member_id))).scalar()
+        snapshot.refreshed_at = now
+        db.add(snapshot)
+
+    def member_growth(self, db: Session, period: str, constituency: Optional[str] = None, ward: Optional[str] = None):
+        """[(period_start, new_members)] in ascending order"""
+        query = db.query(
+            MemberGrowthRollup.period_start,
+            func.sum(MemberGrowthRollup.new_members)
+        ).filter(MemberGrowthRollup.period_type == period)
+        if constituency:
+            query = query.filter(MemberGrowthRollup.constituency == constituency)
+        if ward:
+            query = query.filter(MemberGrowthRollup.ward == ward)
+        return query.group_by(MemberGrowthRollup.period_start).order_by(MemberGrowthRollup.period_start)
+
+    def revenue(self, db: Session, source: str, year: int):
+        """[(period_start, amount)] per month of the given year"""
+        return db.query(RevenueRollup.period_start, RevenueRollup.amount).filter(
+            RevenueRollup.period_type == "month",
+            RevenueRollup.source == source,
+            RevenueRollup.period_start >= date(year, 1, 1),
+            RevenueRollup.period_start < date(year + 1, 1, 1)
+        ).order_by(RevenueRollup.period_start).all()
+
+    def engagement(self, db: Session) -> Optional[EngagementSnapshot]:
+        return db.query(EngagementSnapshot).order_by(EngagementSnapshot.snapshot_date.desc()).first()
+
+
+class AnalyticsRollupJob:
+    """Background thread that refreshes the rollups on an interval"""
+
+    def __init__(self, rollups, interval_seconds=ANALYTICS_ROLLUP_INTERVAL,
+                 full_interval_seconds=ANALYTICS_ROLLUP_FULL_INTERVAL):
+        self.rollups = rollups
+        self.interval_seconds = interval_seconds
+        self.full_interval_seconds = full_interval_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analytics-rollups")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            watermark = db.get(RollupWatermark, WATERMARK)
+            full = (
+                watermark is None or watermark.last_full_refresh is None or
+                datetime.utcnow() - watermark.last_full_refresh >= timedelta(seconds=self.full_interval_seconds)
+            )
+            self.rollups.refresh(db, full=full)
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Analytics rollup refresh failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _run(self):
+        self.run_once()
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+
+analytics_rollups = AnalyticsRollups()
+rollup_job = AnalyticsRollupJob(analytics_rollups)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh analytics rollup tables")
+    parser.add_argument("--full", action="store_true", help="rebuild from scratch")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        analytics_rollups.refresh(session, full=args.full)
+    finally:
+        session.close()
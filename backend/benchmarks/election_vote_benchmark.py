@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Election voting concurrency benchmark
+
+Casts thousands of votes from parallel workers (each voter also retries once,
+simulating a double submit) and checks that candidate tallies equal the
+number of ElectionVote rows. The legacy read-modify-write of
+votes_received is run alongside for comparison.
+
+Requires PostgreSQL (ON CONFLICT upserts):
+    DATABASE_URL=postgresql://... python backend/benchmarks/election_vote_benchmark.py --voters 5000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import importlib.util
+
+from sqlalchemy import create_engine, func
+
+from database import Base, SessionLocal, DATABASE_URL
+
+# The models/ package shadows models.py on sys.path; load the module the
+# enhanced schema is built on directly
+_spec = importlib.util.spec_from_file_location("models", os.path.join(BACKEND_DIR, "models.py"))
+_models = importlib.util.module_from_spec(_spec)
+sys.modules["models"] = _models
+_spec.loader.exec_module(_models)
+Member = _models.Member
+
+from models_enhanced import InternalElection, ElectionCandidate, ElectionVote
+from voting_engine import VotingEngine, AlreadyVotedError
+
+
+def seed(voters, candidates):
+    """Create an election, its candidates and `voters` members"""
+    db = SessionLocal()
+    try:
+        election = InternalElection(election_title="Benchmark", election_date=date.today(), status="active")
+        db.add(election)
+        db.flush()
+
+        run_id = uuid.uuid4().hex[:8]
+        member_ids = [uuid.uuid4() for _ in range(voters + candidates)]
+        db.bulk_insert_mappings(Member, [{
+            "id": member_id,
+            "membership_number": f"B{run_id}{i:07d}",
+            "first_name": "Bench",
+            "last_name": f"Voter{i}",
+            "date_of_birth": date(1990, 1, 1),
+            "gender": "Female" if i % 2 else "Male",
+            "national_id": f"{run_id}/{i}",
+            "voter_id_number": f"V{run_id}{i}",
+            "phone_number": f"26097{i:07d}",
+            "physical_address": "Lusaka",
+            "constituency": "Lusaka Central",
+            "ward": "Ward 1",
+            "branch": "Main",
+            "registration_channel": "web"
+        } for i, member_id in enumerate(member_ids)])
+
+        candidate_ids = []
+        for member_id in member_ids[voters:]:
+            candidate = ElectionCandidate(election_id=election.id, candidate_id=member_id, votes_received=0)
+            db.add(candidate)
+            db.flush()
+            candidate_ids.append(candidate.id)
+
+        db.commit()
+        return election.id, member_ids[:voters], candidate_ids
+    finally:
+        db.close()
+
+
+def vote_engine(voting, election_id, voter_id, candidate_id):
+    db = SessionLocal()
+    try:
+        for _ in range(2):  # second attempt is the double submit
+            try:
+                voting.cast_vote(db, election_id, voter_id, candidate_id)
+            except AlreadyVotedError:
+                pass
+    finally:
+        db.close()
+
+
+def vote_legacy(election_id, voter_id, candidate_id):
+    """Pre-engine behaviour: duplicate SELECT, insert, then votes_received += 1 in Python"""
+    db = SessionLocal()
+    try:
+        for _ in range(2):
+            if db.query(ElectionVote).filter(
+                ElectionVote.election_id == election_id,
+                ElectionVote.voter_id == voter_id
+            ).first():
+                continue
+            db.add(ElectionVote(election_id=election_id, voter_id=voter_id, candidate_id=candidate_id, vote_method="online"))
+            candidate = db.query(ElectionCandidate).filter(ElectionCandidate.id == candidate_id).first()
+            candidate.votes_received += 1
+            try:
+                db.commit()
+            except Exception:
+                db.rollback()
+    finally:
+        db.close()
+
+
+def run(label, fn, election_id, voters, candidate_ids, workers):
+    # Skew towards the first candidate to create a hot row
+    assignments = [candidate_ids[0] if i % 3 else candidate_ids[i % len(candidate_ids)] for i in range(len(voters))]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda args: fn(election_id, *args), zip(voters, assignments)))
+        elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(voters) / elapsed:>10.1f} votes/s  ({elapsed:.2f}s)")
+
+
+def check(label, election_id, tally_fn):
+    db = SessionLocal()
+    try:
+        rows = db.query(func.count(ElectionVote.id)).filter(ElectionVote.election_id == election_id).scalar()
+        tallied = tally_fn(db)
+        status = "OK" if rows == tallied else "MISMATCH"
+        print(f"{label:<10} vote rows={rows} tallied={tallied} -> {status}")
+        return rows == tallied
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent election voting")
+    parser.add_argument("--voters", type=int, default=5000)
+    parser.add_argument("--candidates", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    # One pooled connection per worker
+    engine = create_engine(DATABASE_URL, pool_size=args.workers, max_overflow=0)
+    SessionLocal.configure(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    voting = VotingEngine(shards=args.shards)
+    election_id, voters, candidate_ids = seed(args.voters, args.candidates)
+    run("engine", lambda e, v, c: vote_engine(voting, e, v, c), election_id, voters, candidate_ids, args.workers)
+    ok = check("engine", election_id, lambda db: sum(voting.tally(db, election_id).values()))
+
+    if not args.skip_legacy:
+        election_id, voters, candidate_ids = seed(args.voters, args.candidates)
+        run("legacy", vote_legacy, election_id, voters, candidate_ids, args.workers)
+        check("legacy", election_id, lambda db: db.query(func.sum(ElectionCandidate.votes_received)).filter(
+            ElectionCandidate.election_id == election_id
+        ).scalar() or 0)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Hot query plan check
+
+Seeds a realistic dataset into a scratch schema on a PostgreSQL database,
+runs EXPLAIN ANALYZE on each hot query shape and fails if any of them reads
+its table with a sequential scan instead of an index.
+
+The scratch schema is created and dropped by the script, so it is safe to
+point at a development database.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.hot_query_plans --scale 1
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, or_, select, text
+from sqlalchemy.dialects import postgresql
+
+from backend.config.database import Base
+from backend.models import Event, EventRegistration, Member, MembershipCounter, Referral, User, USSDSession
+from backend.services.member_service import MemberService
+
+SCHEMA = "hot_query_plans"
+
+# Row counts at --scale 1
+SEED_ROWS = {
+    "members": 100000,
+    "users": 20000,
+    "ussd_sessions": 50000,
+    "events": 5000,
+    "event_registrations": 100000,
+    "referrals": 50000,
+}
+
+SEED_SQL = [
+    """INSERT INTO provinces (id, name) SELECT g, 'Province ' || g FROM generate_series(1, 10) g""",
+    """INSERT INTO districts (id, name, province_id)
+       SELECT g, 'District ' || g, 1 + g % 10 FROM generate_series(1, 116) g""",
+    """INSERT INTO constituencies (id, name, district_id)
+       SELECT g, 'Constituency ' || g, 1 + g % 116 FROM generate_series(1, 156) g""",
+    """INSERT INTO wards (id, name, constituency_id)
+       SELECT g, 'Ward ' || g, 1 + g % 156 FROM generate_series(1, 1858) g""",
+    # About a third of members registered without a phone number
+    """INSERT INTO members (id, name, gender, date_of_birth, voters_id, contact, contact_e164, ward_id)
+       SELECT g, 'Member ' || g, CASE WHEN g % 2 = 0 THEN 'Male' ELSE 'Female' END,
+              DATE '1960-01-01' + (g % 15000),
+              'V' || lpad(g::text, 9, '0'),
+              CASE WHEN g % 3 = 0 THEN NULL ELSE '09' || lpad(g::text, 8, '0') END,
+              CASE WHEN g % 3 = 0 THEN NULL ELSE '+2609' || lpad(g::text, 8, '0') END,
+              1 + g % 1858
+       FROM generate_series(1, :members) g""",
+    """INSERT INTO users (id, email, phone, phone_e164, pin_hash, full_name, role, is_active, member_id)
+       SELECT g, 'user' || g || '@example.org', '+2609' || lpad(g::text, 8, '0'), '+2609' || lpad(g::text, 8, '0'),
+              'x', 'User ' || g, 'member', true, g
+       FROM generate_series(1, :users) g""",
+    # Nearly all stored sessions have ended; a few hundred are live
+    """INSERT INTO ussd_sessions (session_id, phone_number, current_step, session_data, is_active, created_at, updated_at)
+       SELECT 'ATUid_' || g, '+2609' || lpad((g % 20000)::text, 8, '0'), 'main_menu', '{}',
+              g % 200 = 0, now() - g * interval '10 seconds', now() - g * interval '10 seconds'
+       FROM generate_series(1, :ussd_sessions) g""",
+    """INSERT INTO events (id, title, start_date, status, created_by)
+       SELECT g, 'Event ' || g, now() - (g % 1000) * interval '1 day',
+              (ARRAY['upcoming', 'ongoing', 'completed', 'cancelled'])[1 + g % 4], 1
+       FROM generate_series(1, :events) g""",
+    """INSERT INTO event_registrations (event_id, member_id, registration_status)
+       SELECT 1 + g % :events, 1 + g % :members, CASE WHEN g % 3 = 0 THEN 'attended' ELSE 'registered' END
+       FROM generate_series(1, :event_registrations) g""",
+    """INSERT INTO referrals (referrer_id, referral_code, referred_name, referred_contact, status, referred_date)
+       SELECT 1 + g % 5000, 'REF' || g, 'Referred ' || g, '097' || lpad(g::text, 7, '0'),
+              (ARRAY['pending', 'contacted', 'registered', 'expired', 'declined'])[1 + g % 5],
+              now() - g * interval '1 minute'
+       FROM generate_series(1, :referrals) g""",
+    """INSERT INTO membership_counters
+           (province_id, district_id, constituency_id, ward_id, gender, birth_year, member_count)
+       SELECT d.province_id, c.district_id, w.constituency_id, m.ward_id, m.gender,
+              extract(year FROM m.date_of_birth)::int, count(*)
+       FROM members m
+       JOIN wards w ON w.id = m.ward_id
+       JOIN constituencies c ON c.id = w.constituency_id
+       JOIN districts d ON d.id = c.district_id
+       GROUP BY 1, 2, 3, 4, 5, 6""",
+]
+
+
+def hot_queries():
+    """(label, statement, tables that must be read through an index)"""
+    return [
+        ("ussd member by contact",
+         select(Member).where(Member.contact == "0900012345").limit(1), {"members"}),
+        ("ussd caller recognition",
+         MemberService.phone_lookup("+260900012345"), {"members", "users"}),
+        ("login by email or phone",
+         select(User).where(or_(User.email == "+260900012345", User.phone_matches("+260900012345"))).limit(1),
+         {"users"}),
+        ("ussd active session",
+         select(USSDSession).where(USSDSession.session_id == "ATUid_400", USSDSession.is_active == True).limit(1),
+         {"ussd_sessions"}),
+        ("idle active sessions",
+         select(USSDSession.id).where(
+             USSDSession.is_active == True,
+             USSDSession.updated_at < datetime.utcnow() - timedelta(minutes=5)
+         ), {"ussd_sessions"}),
+        ("members in ward",
+         select(Member).where(Member.ward_id == 42), {"members"}),
+        ("events by status",
+         select(Event).where(Event.status == "upcoming").order_by(Event.start_date.desc()).limit(100),
+         {"events"}),
+        ("event attendance count",
+         select(func.count()).select_from(EventRegistration).where(
+             EventRegistration.event_id == 17, EventRegistration.registration_status == "attended"
+         ), {"event_registrations"}),
+        ("referrals by referrer",
+         select(Referral).where(Referral.referrer_id == 42).order_by(Referral.referred_date.desc()).limit(100),
+         {"referrals"}),
+        ("referrals by status",
+         select(Referral).where(Referral.status == "pending").order_by(Referral.referred_date.desc()).limit(100),
+         {"referrals"}),
+        ("membership drill-down",
+         select(MembershipCounter.district_id, func.sum(MembershipCounter.member_count)).where(
+             MembershipCounter.province_id == 3
+         ).group_by(MembershipCounter.district_id), {"membership_counters"}),
+    ]
+
+
+def seq_scans(plan):
+    """Relations read by Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan tree"""
+    found = set()
+    if plan.get("Node Type") == "Seq Scan":
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found |= seq_scans(child)
+    return found
+
+
+def seed(engine, scale):
+    rows = {table: max(1, int(count * scale)) for table, count in SEED_ROWS.items()}
+    with engine.begin() as connection:
+        for statement in SEED_SQL:
+            connection.execute(text(statement), rows)
+        connection.exec_driver_sql("ANALYZE")
+    return rows
+
+
+def explain(connection, statement):
+    compiled = statement.compile(dialect=postgresql.dialect())
+    plan = connection.exec_driver_sql(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a hot query falls back to a sequential scan")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for seeded row counts")
+    parser.add_argument("--keep", action="store_true", help="leave the scratch schema in place")
+    parser.add_argument("--verbose", action="store_true", help="print each plan tree")
+    args = parser.parse_args()
+
+    if not args.database_url or not args.database_url.startswith("postgresql"):
+        parser.error("a PostgreSQL --database-url (or DATABASE_URL) is required")
+
+    admin = create_engine(args.database_url)
+    with admin.begin() as connection:
+        connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        connection.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+
+    engine = create_engine(args.database_url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    failures = []
+    try:
+        Base.metadata.create_all(bind=engine)
+        rows = seed(engine, args.scale)
+        print("Seeded " + ", ".join(f"{table}={count}" for table, count in rows.items()))
+        print(f"{'query':<28} {'ms':>8}  plan")
+
+        with engine.connect() as connection:
+            for label, statement, tables in hot_queries():
+                plan = explain(connection, statement)
+                root = plan["Plan"]
+                scanned = seq_scans(root) & tables
+                status = "SEQ SCAN " + ",".join(sorted(scanned)) if scanned else "ok"
+                print(f"{label:<28} {plan['Execution Time']:>8.2f}  {root['Node Type']} -> {status}")
+                if args.verbose:
+                    print(json.dumps(root, indent=2))
+                if scanned:
+                    failures.append(label)
+    finally:
+        engine.dispose()
+        if not args.keep:
+            with admin.begin() as connection:
+                connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        admin.dispose()
+
+    if failures:
+        print(f"\n{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} fell back to a sequential scan: "
+              + ", ".join(failures))
+        sys.exit(1)
+    print("\nAll hot queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Member import throughput benchmark
+
+Generates synthetic member files with realistic Zambian names, NRCs, phone
+numbers and wards, then runs each through the import pipeline the way the
+API does: store the upload, stage it (parse, validate, check duplicates,
+write staging rows) and commit it into members. Reports the time of each
+phase and rows per second end to end.
+
+On PostgreSQL the tables live in a scratch schema that the script creates
+and drops; without a PostgreSQL URL a temporary SQLite database is used.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.import_benchmark --rows 1000 10000 100000
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config.database import Base
+from backend.models import Constituency, District, Province, Ward
+from backend.services.import_service import ImportJobService
+
+SCHEMA = "import_benchmark"
+
+FIRST_NAMES = {
+    "Male": ("Chanda", "Mwila", "Bwalya", "Mulenga", "Musonda", "Mwansa", "Kalaba", "Lubinda", "Mubanga",
+             "Kondwani", "Lweendo", "Chileshe", "Kelvin", "Joseph", "Emmanuel", "Moses", "Brian", "Patrick"),
+    "Female": ("Chilufya", "Natasha", "Mapalo", "Namakau", "Inonge", "Thandiwe", "Chipo", "Mutinta", "Nkandu",
+               "Mwaka", "Luyando", "Bupe", "Grace", "Mary", "Esther", "Precious", "Ruth", "Agness"),
+}
+SURNAMES = ("Banda", "Phiri", "Mwale", "Tembo", "Zulu", "Lungu", "Mulenga", "Sakala", "Daka", "Mumba", "Chanda",
+            "Musonda", "Kabwe", "Mwanza", "Ng'andu", "Sichone", "Simukonda", "Nyirenda", "Chisanga", "Kapata",
+            "Mweemba", "Hamoonga", "Siame", "Sinkala", "Kaunda", "Mutale", "Bwalya", "Mbewe", "Njovu", "Chirwa")
+
+# province -> (district, constituency, wards)
+GEOGRAPHY = {
+    "Lusaka": ("Lusaka", "Kabwata", ("Kabwata", "Kamwala", "Libala", "Chilenje")),
+    "Copperbelt": ("Kitwe", "Nkana", ("Nkana", "Chimwemwe", "Kwacha", "Buchi")),
+    "Central": ("Kabwe", "Bwacha", ("Bwacha", "Makululu", "Kasanda")),
+    "Eastern": ("Chipata", "Chipata Central", ("Kapata", "Msanzala", "Chipata Central")),
+    "Northern": ("Kasama", "Kasama Central", ("Lukashya", "Chiba", "Kasama Central")),
+    "Luapula": ("Mansa", "Bahati", ("Bahati", "Chembe", "Mansa Central")),
+    "Muchinga": ("Chinsali", "Chinsali", ("Chinsali Central", "Shambalakale")),
+    "North-Western": ("Solwezi", "Solwezi Central", ("Kyawama", "Mapunga", "Solwezi Central")),
+    "Southern": ("Choma", "Choma Central", ("Choma Central", "Mbabala", "Mapanza")),
+    "Western": ("Mongu", "Mongu Central", ("Mongu Central", "Lealui", "Limulunga")),
+}
+WARDS = [(province, district, ward) for province, (district, _, wards) in GEOGRAPHY.items() for ward in wards]
+
+HEADINGS = ("First Name", "Last Name", "NRC Number", "Phone", "Gender", "Date of Birth", "Voter ID",
+            "Province", "District", "Ward")
+PHONE_PREFIXES = ("095", "096", "097", "076", "077")
+
+
+def seed_geography(session):
+    for province_name, (district_name, constituency_name, ward_names) in GEOGRAPHY.items():
+        province = Province(name=province_name)
+        session.add(province)
+        session.flush()
+        district = District(name=district_name, province_id=province.id)
+        session.add(district)
+        session.flush()
+        constituency = Constituency(name=constituency_name, district_id=district.id)
+        session.add(constituency)
+        session.flush()
+        session.add_all(Ward(name=name, constituency_id=constituency.id) for name in ward_names)
+    session.commit()
+
+
+def member_rows(count, first_serial, invalid_share, rng):
+    """`count` source rows; NRC and voter ID serials start at first_serial so runs never collide"""
+    today = date.today()
+    for serial in range(first_serial, first_serial + count):
+        gender = rng.choice(("Male", "Female"))
+        province, district, ward = rng.choice(WARDS)
+        born = today - timedelta(days=rng.randint(18 * 365, 80 * 365))
+        nrc = f"{serial:06d}/{rng.randint(10, 99)}/1"
+        if rng.random() < invalid_share:
+            # Typed without the slashes, as often happens on paper forms
+            nrc = nrc.replace("/", "")
+        yield (rng.choice(FIRST_NAMES[gender]), rng.choice(SURNAMES), nrc,
+               rng.choice(PHONE_PREFIXES) + f"{rng.randint(0, 9999999):07d}", gender[0],
+               born.strftime("%d/%m/%Y"), f"{serial:09d}", province, district, ward)
+
+
+def write_file(path, file_format, rows):
+    if file_format == "csv":
+        with open(path, "w", newline="") as target:
+            writer = csv.writer(target)
+            writer.writerow(HEADINGS)
+            writer.writerows(rows)
+    else:
+        import openpyxl
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(HEADINGS)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(path)
+
+
+def run(session, path, file_format):
+    """Upload, stage and commit one file; returns the job and the seconds each phase took"""
+    started = time.perf_counter()
+    with open(path, "rb") as source:
+        job = ImportJobService.create_job(session, f"benchmark.{file_format}", source)
+    uploaded = time.perf_counter()
+    job = ImportJobService.stage(session, job.id)
+    if job.status != "staged":
+        raise RuntimeError(f"staging failed: {job.error}")
+    staged = time.perf_counter()
+    ImportJobService.start_commit(session, job.id)
+    job = ImportJobService.commit(session, job.id)
+    if job.status != "completed":
+        raise RuntimeError(f"import failed: {job.error}")
+    committed = time.perf_counter()
+    return job, (uploaded - started, staged - uploaded, committed - staged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure member import throughput end to end")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--formats", nargs="+", choices=("csv", "xlsx"), default=["csv", "xlsx"])
+    parser.add_argument("--invalid", type=float, default=0.02, help="share of rows with a malformed NRC")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="leave the scratch schema in place")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="import_benchmark_")
+    postgres = bool(args.database_url and args.database_url.startswith("postgresql"))
+    if postgres:
+        admin = create_engine(args.database_url)
+        with admin.begin() as connection:
+            connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            connection.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+        engine = create_engine(args.database_url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    else:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'benchmark.db')}")
+    session = sessionmaker(bind=engine)()
+    rng = random.Random(args.seed)
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        seed_geography(session)
+        print(f"Database: {engine.dialect.name}")
+        print(f"{'format':<6} {'rows':>8} {'upload s':>9} {'stage s':>8} {'commit s':>9} {'total s':>8} "
+              f"{'rows/s':>8} {'valid':>8} {'imported':>9}")
+
+        serial = 100000
+        for rows in args.rows:
+            for file_format in args.formats:
+                path = os.path.join(workdir, f"members_{rows}.{file_format}")
+                write_file(path, file_format, member_rows(rows, serial, args.invalid, rng))
+                serial += rows
+
+                job, phases = run(session, path, file_format)
+                total = sum(phases)
+                print(f"{file_format:<6} {rows:>8} {phases[0]:>9.2f} {phases[1]:>8.2f} {phases[2]:>9.2f} "
+                      f"{total:>8.2f} {rows / total:>8.0f} {job.valid_rows:>8} {job.imported_rows:>9}")
+                sys.stdout.flush()
+                os.remove(path)
+    finally:
+        session.close()
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+        if postgres:
+            if not args.keep:
+                with admin.begin() as connection:
+                    connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            admin.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+PIN verification benchmark
+
+Simulates concurrent logins against the argon2id PinHasher at the configured
+cost parameters and reports throughput and latency percentiles, with the
+verification cache disabled (every login pays argon2) and enabled (repeat
+logins within the TTL).
+
+Usage:
+    python -m backend.benchmarks.pin_login_benchmark --logins 400 --concurrency 32
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.services.pin_hasher import PinHasher, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(hasher, stored_hashes, logins, concurrency):
+    """Verify `logins` PINs across `concurrency` threads; return per-login latencies in ms"""
+    def login(i):
+        pin, stored = stored_hashes[i % len(stored_hashes)]
+        start = time.perf_counter()
+        valid, _ = hasher.verify(pin, stored)
+        assert valid
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def report(label, latencies, elapsed):
+    print(f"{label:<22} {len(latencies) / elapsed:>9.1f} {statistics.median(latencies):>9.1f} "
+          f"{percentile(latencies, 95):>9.1f} {percentile(latencies, 99):>9.1f} {max(latencies):>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark argon2id PIN login verification")
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=50, help="distinct users (cache hit ratio)")
+    parser.add_argument("--workers", type=int, default=None, help="hashing pool size")
+    parser.add_argument("--time-cost", type=int, default=ARGON2_TIME_COST)
+    parser.add_argument("--memory-cost", type=int, default=ARGON2_MEMORY_COST)
+    parser.add_argument("--parallelism", type=int, default=ARGON2_PARALLELISM)
+    args = parser.parse_args()
+
+    options = dict(
+        time_cost=args.time_cost,
+        memory_cost=args.memory_cost,
+        parallelism=args.parallelism,
+        max_pending=max(args.concurrency, 1)
+    )
+    if args.workers:
+        options["max_workers"] = args.workers
+
+    cold = PinHasher(cache_size=0, **options)
+    warm = PinHasher(**options)
+
+    print(f"argon2id t={args.time_cost} m={args.memory_cost}KiB p={args.parallelism} "
+          f"workers={cold.max_workers} concurrency={args.concurrency} logins={args.logins}")
+
+    pins = [f"{i % 10000:04d}" for i in range(args.users)]
+    stored_hashes = [(pin, cold.hash(pin)) for pin in pins]
+
+    print(f"{'mode':<22} {'logins/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    report("no cache", *run(cold, stored_hashes, args.logins, args.concurrency))
+    report("verification cache", *run(warm, stored_hashes, args.logins, args.concurrency))
+
+    cold.shutdown()
+    warm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Frontend session overhead benchmark
+
+Simulates admins using the frontend concurrently: each logs in, then makes
+requests that read the session, one in --write-every of them changing it
+(as starting an import or flashing a message does). Every session backend
+is timed inside open_session/save_session, so the figures are the session
+cost per request without views or network.
+
+Backends: Flask's signed cookie, the server-side SQLite (WAL) store, Redis
+with --redis-url, and Flask-Session's pickled files when it is installed.
+
+Usage:
+    python -m backend.benchmarks.session_benchmark --admins 20 --requests 500 --redis-url redis://localhost:6379/15
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from flask import Flask, flash, get_flashed_messages, session
+from flask.sessions import SecureCookieSessionInterface, SessionInterface
+
+from frontend.session_store import RedisSessionStore, ServerSessionInterface, SQLiteSessionStore
+
+LIFETIME = timedelta(hours=2)
+
+
+class TimedSessionInterface(SessionInterface):
+    """Wraps a session interface, recording open + save time per request"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.timings = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def open_session(self, app, request):
+        started = time.perf_counter()
+        opened = self.inner.open_session(app, request)
+        self._local.elapsed = time.perf_counter() - started
+        return opened
+
+    def make_null_session(self, app):
+        return self.inner.make_null_session(app)
+
+    def is_null_session(self, obj):
+        return self.inner.is_null_session(obj)
+
+    def save_session(self, app, session, response):
+        started = time.perf_counter()
+        self.inner.save_session(app, session, response)
+        elapsed = self._local.elapsed + time.perf_counter() - started
+        with self._lock:
+            self.timings.append(elapsed)
+
+
+def make_app(interface):
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY="benchmark", PERMANENT_SESSION_LIFETIME=LIFETIME,
+                      SESSION_TYPE="filesystem", SESSION_FILE_DIR=tempfile.mkdtemp(prefix="sessions_"))
+    app.session_interface = TimedSessionInterface(interface(app))
+
+    @app.route("/login")
+    def login():
+        # What the auth blueprint keeps: a signed token, the role and a small profile
+        session["user_token"] = "eyJ" + os.urandom(200).hex()
+        session["user_role"] = "admin"
+        session["user_data"] = {"id": 1, "email": "admin@add.org.zm", "full_name": "Admin User", "role": "admin"}
+        session["language"] = "en"
+        return "ok"
+
+    @app.route("/page")
+    def page():
+        get_flashed_messages()
+        return session["user_token"][:8]
+
+    @app.route("/write/<int:n>")
+    def write(n):
+        session["import_job_id"] = n
+        flash(f"Import {n} started", "info")
+        return "ok"
+
+    return app
+
+
+def admin(app, requests, write_every):
+    client = app.test_client()
+    client.get("/login")
+    for n in range(requests):
+        client.get(f"/write/{n}" if n % write_every == 0 else "/page")
+
+
+def backends(args, workdir):
+    """(name, factory building the session interface for an app)"""
+    found = [
+        ("cookie", lambda app: SecureCookieSessionInterface()),
+        ("sqlite", lambda app: ServerSessionInterface(
+            SQLiteSessionStore(os.path.join(workdir, "sessions.db")), int(LIFETIME.total_seconds()))),
+    ]
+    if args.redis_url:
+        found.append(("redis", lambda app: ServerSessionInterface(
+            RedisSessionStore(args.redis_url, prefix="session_benchmark:"), int(LIFETIME.total_seconds()))))
+    try:
+        from flask_session import Session
+    except ImportError:
+        print("Flask-Session is not installed; skipping the filesystem backend")
+    else:
+        def filesystem(app):
+            Session(app)
+            return app.session_interface
+        found.append(("filesystem", filesystem))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-request session overhead per backend")
+    parser.add_argument("--admins", type=int, default=20, help="concurrent admin clients")
+    parser.add_argument("--requests", type=int, default=500, help="requests per admin after logging in")
+    parser.add_argument("--write-every", type=int, default=10, help="one request in this many changes the session")
+    parser.add_argument("--redis-url", default=os.getenv("SESSION_REDIS_URL"))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="session_benchmark_")
+    try:
+        print(f"{args.admins} admins x {args.requests} requests, one in {args.write_every} writing")
+        print(f"{'backend':<11} {'requests':>9} {'req/s':>8} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+        for name, factory in backends(args, workdir):
+            app = make_app(factory)
+            timed = app.session_interface
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.admins) as pool:
+                for future in [pool.submit(admin, app, args.requests, args.write_every) for _ in range(args.admins)]:
+                    future.result()
+            elapsed = time.perf_counter() - started
+
+            timings = sorted(timed.timings)
+            percentile = lambda p: timings[min(len(timings) - 1, int(len(timings) * p))] * 1000
+            print(f"{name:<11} {len(timings):>9} {len(timings) / elapsed:>8.0f} "
+                  f"{statistics.mean(timings) * 1000:>8.3f} {percentile(0.5):>7.3f} {percentile(0.95):>7.3f} "
+                  f"{percentile(0.99):>7.3f}")
+            shutil.rmtree(app.config["SESSION_FILE_DIR"], ignore_errors=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+USSD hop benchmark
+
+Drives complete USSD dialogues through USSDService against a scratch
+database (a temporary SQLite file, or a scratch schema that is dropped
+afterwards on PostgreSQL) and reports hops per second per worker, commits
+per hop and how many dialogues reached their end. Each dialogue is a new
+caller registering (10 hops) followed by the same caller returning to view
+their details (2 hops).
+
+Usage:
+    python -m backend.benchmarks.ussd_hop_benchmark --dialogues 200 --workers 1
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.ussd_hop_benchmark --workers 8
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.config.database import Base
+from backend.models import Province, District, Constituency, Ward
+from backend.ussd_service import USSDService
+
+SCHEMA = "ussd_hop_benchmark"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed_locations(SessionFactory):
+    db = SessionFactory()
+    try:
+        province = Province(name="Lusaka")
+        db.add(province)
+        db.flush()
+        district = District(name="Lusaka", province_id=province.id)
+        db.add(district)
+        db.flush()
+        constituency = Constituency(name="Kabwata", district_id=district.id)
+        db.add(constituency)
+        db.flush()
+        db.add(Ward(name="Kamwala", constituency_id=constituency.id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def dialogue(n):
+    """(session_id, phone, [texts]) for registration, then a returning visit"""
+    phone = f"+26097{n:07d}"
+    answers = [f"{n:06d}/78/9", f"V{n:07d}", f"Caller {n}", "2", "15/05/1990", "1", "1", "1", "1"]
+    texts = [""] + ["*".join(answers[:i]) for i in range(1, len(answers) + 1)]
+    return [(f"reg-{n}", phone, texts), (f"ret-{n}", phone, ["", "1"])]
+
+
+def run(SessionFactory, dialogues, workers):
+    service = USSDService()
+
+    def caller(n):
+        latencies = []
+        completed = 0
+        for session_id, phone, texts in dialogue(n):
+            for text in texts:
+                db = SessionFactory()
+                start = time.perf_counter()
+                try:
+                    _, end = service.handle_request(session_id, phone, text, db)
+                finally:
+                    db.close()
+                latencies.append((time.perf_counter() - start) * 1000)
+            completed += end
+        return latencies, completed
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(caller, range(dialogues)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency for hop_latencies, _ in results for latency in hop_latencies]
+    completed = sum(done for _, done in results)
+    return latencies, completed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark USSD hops through USSDService")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="defaults to a temporary SQLite file")
+    parser.add_argument("--dialogues", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{scratch.name}"
+
+    admin = None
+    if url.startswith("postgresql"):
+        admin = create_engine(url)
+        with admin.begin() as connection:
+            connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            connection.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+        engine = create_engine(url, pool_size=args.workers, max_overflow=0,
+                               connect_args={"options": f"-csearch_path={SCHEMA}"})
+    else:
+        engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(engine)
+    SessionFactory = sessionmaker(bind=engine)
+    seed_locations(SessionFactory)
+
+    commits = [0]
+    event.listen(engine, "commit", lambda connection: commits.__setitem__(0, commits[0] + 1))
+
+    latencies, completed, elapsed = run(SessionFactory, args.dialogues, args.workers)
+    hops = len(latencies)
+    print(f"database          {engine.dialect.name}")
+    print(f"hops              {hops} ({args.dialogues * 2} dialogues, {completed} reached their end)")
+    print(f"hops/s            {hops / elapsed:.1f} total, {hops / elapsed / args.workers:.1f} per worker")
+    print(f"commits/hop       {commits[0] / hops:.2f}")
+    print(f"latency ms        p50 {statistics.median(latencies):.2f}  p95 {percentile(latencies, 95):.2f}  "
+          f"p99 {percentile(latencies, 99):.2f}")
+
+    engine.dispose()
+    if admin:
+        with admin.begin() as connection:
+            connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        admin.dispose()
+    if scratch:
+        os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
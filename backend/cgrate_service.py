@@ -7,7 +7,14 @@ import uuid
 import hashlib
 from datetime import datetime
 import logging
+import time
 from decimal import Decimal
+try:
+    from backend.utils.metrics import CGRATE_REQUEST_SECONDS, soap_operation
+except ImportError:
+    # Vendored as app.services.cgrate_service without the backend's metrics: the metrics_noop.py
+    # copied next to it records nothing
+    from .metrics_noop import CGRATE_REQUEST_SECONDS, soap_operation
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +86,9 @@ class CgrateService:
             'SOAPAction': ''
         }
         
+        operation = soap_operation(soap_body)
+        outcome = 'error'
+        started = time.perf_counter()
         try:
             response = requests.post(
                 self.soap_url,
@@ -86,6 +96,8 @@ class CgrateService:
                 headers=headers,
                 timeout=self.timeout
             )
+            outcome = 'ok' if response.status_code == 200 else 'http_error'
+            CGRATE_REQUEST_SECONDS.labels(operation, outcome).observe(time.perf_counter() - started)
             
             if response.status_code == 200:
                 return self._parse_soap_response(response.text)
@@ -97,6 +109,8 @@ class CgrateService:
                 }
                 
         except Exception as e:
+            if outcome == 'error':
+                CGRATE_REQUEST_SECONDS.labels(operation, outcome).observe(time.perf_counter() - started)
             logger.error(f"SOAP request error: {e}")
             return {
                 'success': False,
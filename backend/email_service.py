@@ -13,6 +13,12 @@ import logging
 import os
 from typing import List, Dict, Optional, Union
 from threading import Thread
+try:
+    from backend.utils.metrics import NOTIFICATION_QUEUE_DEPTH, time_provider_call
+except ImportError:
+    # Vendored as services.email_service without the backend's metrics: the metrics_noop.py
+    # copied next to it records nothing
+    from .metrics_noop import NOTIFICATION_QUEUE_DEPTH, time_provider_call
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -60,12 +66,15 @@ class EmailService:
         """Send email asynchronously with proper app context"""
         with app.app_context():
             try:
-                self.mail.send(msg)
+                with time_provider_call('email', 'smtp'):
+                    self.mail.send(msg)
                 logger.info(f"✅ Email sent successfully to {msg.recipients}")
             except Exception as e:
                 logger.error(f"❌ Failed to send email to {msg.recipients}: {str(e)}")
                 import traceback
                 traceback.print_exc()
+            finally:
+                NOTIFICATION_QUEUE_DEPTH.labels('email').dec()
     
     def send_email(self, subject: str, recipients: List[str], 
                    html_body: str = None, text_body: str = None,
@@ -126,11 +135,13 @@ class EmailService:
                     # Send asynchronously
                     logger.info("📧 Sending email asynchronously...")
                     thread = Thread(target=self._send_async_email, args=(self.app, msg))
+                    NOTIFICATION_QUEUE_DEPTH.labels('email').inc()
                     thread.start()
                 else:
                     # Send synchronously
                     logger.info("📧 Sending email synchronously...")
-                    self.mail.send(msg)
+                    with time_provider_call('email', 'smtp'):
+                        self.mail.send(msg)
                     logger.info(f"✅ Email sent successfully from {mail_username} to {valid_recipients}")
                 
                 return True
@@ -1,10 +1,16 @@
 """
 FastAPI main application
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routes import api_router
-from backend.config.database import init_db
+from backend.config.database import init_db, SessionLocal, engine
+from backend.services.pin_hasher import pin_hasher
+from backend.services.membership_counter_service import MembershipCounterService
+from backend.services.import_service import ImportJobService
+from backend.services.ussd_session_service import ussd_session_reaper
+from backend.utils.metrics import PrometheusMiddleware, instrument_engine, metrics_response
+from backend.utils import sql_profiler
 
 # Create FastAPI app
 app = FastAPI(
@@ -22,6 +28,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency, per-request query counts and pool gauges, scraped from /metrics;
+# in development/staging also per-request query headers and N+1 warnings
+app.add_middleware(
+    PrometheusMiddleware, service="backend",
+    profiler=sql_profiler.SQLProfiler() if sql_profiler.SQL_PROFILER else None,
+)
+instrument_engine(engine)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -31,6 +45,22 @@ async def startup_event():
     """Initialize database on startup"""
     init_db()
 
+    db = SessionLocal()
+    try:
+        MembershipCounterService.ensure_built(db)
+        ImportJobService.recover_interrupted(db)
+    finally:
+        db.close()
+
+    ussd_session_reaper.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the PIN hashing worker pool and the USSD session reaper"""
+    pin_hasher.shutdown()
+    ussd_session_reaper.stop()
+
 
 @app.get("/")
 async def root():
@@ -48,6 +78,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics"""
+    body, content_type = metrics_response()
+    return Response(body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=9500)
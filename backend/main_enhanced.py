@@ -1,8 +1,10 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Header, status, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta, date
+import hmac
+import logging
 import uvicorn
 import os
 
@@ -16,13 +18,31 @@ from main import (
 from models_enhanced import (
     Donation, Campaign, Volunteer, Communication, CommunicationRecipient,
     Committee, CommitteeMember, TrainingProgram, TrainingAttendance,
-    Poll, PollQuestion, PollResponse, Document, DocumentAccessLog,
-    Grievance, InternalElection, ElectionCandidate, ElectionVote,
+    Poll, PollQuestion, PollResponse, PollTally, Document, DocumentAccessLog,
+    Grievance, InternalElection, ElectionCandidate,
     AttendanceRecord, DisciplinaryAction, Partner
 )
 
 # Import schemas (would need to be created)
 from schemas_enhanced import *
+from schemas_enhanced import PollBatchCreate, PollBatchResult
+
+from voting_engine import voting_engine, AlreadyVotedError, InvalidCandidateError
+from poll_engine import poll_engine, PollNotFoundError, InvalidPollResponseError
+from analytics_rollups import analytics_rollups, rollup_job
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Shared secret of the USSD/SMS gateway for the service-to-service endpoints
+GATEWAY_SERVICE_TOKEN = os.getenv("GATEWAY_SERVICE_TOKEN")
+
+def require_gateway_token(x_gateway_token: Optional[str] = Header(None)):
+    """Accept only callers presenting the gateway's service token"""
+    if not GATEWAY_SERVICE_TOKEN:
+        raise HTTPException(status_code=503, detail="Gateway ingestion is not configured")
+    if not x_gateway_token or not hmac.compare_digest(x_gateway_token, GATEWAY_SERVICE_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid gateway token")
 
 # ============== DONATION ENDPOINTS ==============
 
@@ -376,6 +396,9 @@ def create_poll(poll: PollCreate, current_member = Depends(get_current_member),
         )
         db.add(db_question)
 
+    # New polls are tallied incrementally from their first response
+    db.add(PollTally(poll_id=db_poll.id))
+
     db.commit()
     db.refresh(db_poll)
 
@@ -406,89 +429,49 @@ def submit_poll_response(
     current_member = Depends(get_current_member),
     db: Session = Depends(get_db)
 ):
-    poll = db.query(Poll).filter(Poll.id == poll_id).first()
-    if not poll:
-        raise HTTPException(status_code=404, detail="Poll not found")
-
-    # Check if already responded (if not anonymous)
-    if not poll.allow_multiple_votes:
-        existing = db.query(PollResponse).filter(
-            PollResponse.poll_id == poll_id,
-            PollResponse.member_id == current_member.id
-        ).first()
-
-        if existing:
-            raise HTTPException(status_code=400, detail="You have already responded to this poll")
-
-    # Save responses
-    for response in responses:
-        db_response = PollResponse(
-            poll_id=poll_id,
-            member_id=current_member.id if not poll.is_anonymous else None,
-            **response.dict()
-        )
-        db.add(db_response)
-
-    db.commit()
+    try:
+        poll_engine.submit(db, poll_id, current_member.id, responses)
+    except PollNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidPollResponseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {"message": "Poll response submitted successfully"}
 
+@app.post("/api/polls/{poll_id}/responses/batch", response_model=PollBatchResult,
+          dependencies=[Depends(require_gateway_token)])
+def submit_poll_responses_batch(poll_id: str, batch: PollBatchCreate, db: Session = Depends(get_db)):
+    """Ingest poll answers collected offline by the USSD/SMS gateway"""
+    try:
+        result = poll_engine.submit_batch(db, poll_id, batch.submissions)
+    except PollNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    logger.info(
+        "Gateway poll batch for %s: %d accepted, %d duplicates, %d rejected",
+        poll_id, result["accepted"], result["duplicates"], len(result["rejected"])
+    )
+    return result
+
 @app.get("/api/polls/{poll_id}/results")
 def get_poll_results(poll_id: str, db: Session = Depends(get_db)):
-    from sqlalchemy import func
-
     poll = db.query(Poll).filter(Poll.id == poll_id).first()
     if not poll:
         raise HTTPException(status_code=404, detail="Poll not found")
 
-    questions = db.query(PollQuestion).filter(PollQuestion.poll_id == poll_id).all()
-
-    results = []
-    for question in questions:
-        responses = db.query(PollResponse).filter(
-            PollResponse.question_id == question.id
-        ).all()
-
-        if question.question_type == "single_choice" or question.question_type == "multiple_choice":
-            # Count responses for each option
-            option_counts = {}
-            for response in responses:
-                if response.response_options:
-                    for option in response.response_options:
-                        option_counts[option] = option_counts.get(option, 0) + 1
-
-            results.append({
-                "question": question.question_text,
-                "type": question.question_type,
-                "response_count": len(responses),
-                "results": option_counts
-            })
-        elif question.question_type == "rating":
-            # Calculate average rating
-            ratings = [r.response_rating for r in responses if r.response_rating]
-            avg_rating = sum(ratings) / len(ratings) if ratings else 0
-
-            results.append({
-                "question": question.question_text,
-                "type": question.question_type,
-                "response_count": len(responses),
-                "average_rating": avg_rating
-            })
-        else:  # text responses
-            results.append({
-                "question": question.question_text,
-                "type": question.question_type,
-                "response_count": len(responses),
-                "sample_responses": [r.response_text for r in responses[:5]]  # First 5 responses
-            })
+    return poll_engine.results(db, poll)
 
-    return {
-        "poll": poll,
-        "total_responses": db.query(func.count(func.distinct(PollResponse.member_id))).filter(
-            PollResponse.poll_id == poll_id
-        ).scalar(),
-        "results": results
-    }
+@app.post("/api/polls/{poll_id}/tallies/rebuild")
+def rebuild_poll_tallies(poll_id: str, current_member = Depends(get_current_member), db: Session = Depends(get_db)):
+    """Recompute a poll's results from its stored responses (maintenance)"""
+    poll = db.query(Poll).filter(Poll.id == poll_id).first()
+    if not poll:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    if poll.created_by != current_member.id:
+        raise HTTPException(status_code=403, detail="Only the poll's creator can rebuild its results")
+
+    poll_engine.rebuild(db, poll.id)
+    return {"message": "Poll results rebuilt"}
 
 # ============== DOCUMENT MANAGEMENT ENDPOINTS ==============
 
@@ -692,32 +675,10 @@ def cast_vote(
     if election.status != "active":
         raise HTTPException(status_code=400, detail="Election is not active")
 
-    # Check if already voted
-    existing_vote = db.query(ElectionVote).filter(
-        ElectionVote.election_id == election_id,
-        ElectionVote.voter_id == current_member.id
-    ).first()
-
-    if existing_vote:
-        raise HTTPException(status_code=400, detail="You have already voted in this election")
-
-    # Cast vote
-    db_vote = ElectionVote(
-        election_id=election_id,
-        voter_id=current_member.id,
-        candidate_id=vote.candidate_id,
-        vote_method="online"
-    )
-    db.add(db_vote)
-
-    # Update vote count
-    candidate = db.query(ElectionCandidate).filter(
-        ElectionCandidate.id == vote.candidate_id
-    ).first()
-    if candidate:
-        candidate.votes_received += 1
-
-    db.commit()
+    try:
+        voting_engine.cast_vote(db, election_id, current_member.id, vote.candidate_id, vote_method="online")
+    except (AlreadyVotedError, InvalidCandidateError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {"message": "Vote cast successfully"}
 
@@ -729,18 +690,30 @@ def get_election_results(election_id: str, db: Session = Depends(get_db)):
 
     candidates = db.query(ElectionCandidate).filter(
         ElectionCandidate.election_id == election_id
-    ).order_by(ElectionCandidate.votes_received.desc()).all()
+    ).all()
 
-    total_votes = db.query(ElectionVote).filter(
-        ElectionVote.election_id == election_id,
-        ElectionVote.is_valid == True
-    ).count()
+    # Tallies come from the sharded counters, not the per-candidate column
+    tally = voting_engine.tally(db, election_id)
+    total_votes = sum(tally.values())
+
+    results = sorted([
+        {
+            "id": c.id,
+            "candidate_id": c.candidate_id,
+            "running_mate_id": c.running_mate_id,
+            "campaign_slogan": c.campaign_slogan,
+            "manifesto_url": c.manifesto_url,
+            "is_winner": c.is_winner,
+            "withdrawal_date": c.withdrawal_date,
+            "votes_received": tally.get(c.id, 0)
+        } for c in candidates
+    ], key=lambda c: c["votes_received"], reverse=True)
 
     return {
         "election": election,
         "total_votes": total_votes,
         "turnout_percentage": (total_votes / election.eligible_voters_count * 100) if election.eligible_voters_count else 0,
-        "candidates": candidates
+        "candidates": results
     }
 
 # ============== ATTENDANCE ENDPOINTS ==============
@@ -879,46 +852,61 @@ def get_partners(
 @app.get("/api/analytics/member-growth")
 def get_member_growth_analytics(
     period: str = "monthly",  # daily, weekly, monthly, yearly
+    constituency: Optional[str] = None,
+    ward: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     from sqlalchemy import func
     from models import Member
 
-    if period == "monthly":
-        growth = db.query(
-            func.date_trunc('month', Member.registration_date).label('period'),
-            func.count(Member.id).label('new_members')
-        ).group_by('period').order_by('period').all()
-    elif period == "daily":
-        growth = db.query(
-            func.date_trunc('day', Member.registration_date).label('period'),
-            func.count(Member.id).label('new_members')
-        ).group_by('period').order_by('period').limit(30).all()
-    else:
+    rollup_periods = {"monthly": "month", "daily": "day"}
+    if period not in rollup_periods:
         growth = []
+    elif analytics_rollups.is_ready(db):
+        growth = analytics_rollups.member_growth(db, rollup_periods[period], constituency, ward)
+        growth = growth.limit(30).all() if period == "daily" else growth.all()
+    else:
+        # Rollups not built yet: aggregate live
+        bucket = func.date_trunc(rollup_periods[period], Member.registration_date).label('period')
+        growth = db.query(bucket, func.count(Member.id).label('new_members'))
+        if constituency:
+            growth = growth.filter(Member.constituency == constituency)
+        if ward:
+            growth = growth.filter(Member.ward == ward)
+        growth = growth.group_by('period').order_by('period')
+        growth = growth.limit(30).all() if period == "daily" else growth.all()
 
     return {
         "period": period,
-        "data": [{"period": str(g[0]), "count": g[1]} for g in growth]
+        "data": [{"period": str(g[0]), "count": int(g[1])} for g in growth]
     }
 
 @app.get("/api/analytics/engagement")
 def get_engagement_analytics(db: Session = Depends(get_db)):
     from sqlalchemy import func
-    from models import Member
-
-    # Activity participation rate
-    total_members = db.query(Member).count()
-    active_in_activities = db.query(func.count(func.distinct(MemberActivity.member_id))).scalar()
+    from models import Member, MemberActivity
+    from models_enhanced import PollResponse as PollResponseRecord
+
+    snapshot = analytics_rollups.engagement(db)
+    if snapshot:
+        total_members = snapshot.total_members
+        active_in_activities = snapshot.activity_participants
+        training_participants = snapshot.training_participants
+        active_volunteers = snapshot.active_volunteers
+        poll_participants = snapshot.poll_participants
+    else:
+        # Activity participation rate
+        total_members = db.query(Member).count()
+        active_in_activities = db.query(func.count(func.distinct(MemberActivity.member_id))).scalar()
 
-    # Training participation
-    training_participants = db.query(func.count(func.distinct(TrainingAttendance.member_id))).scalar()
+        # Training participation
+        training_participants = db.query(func.count(func.distinct(TrainingAttendance.member_id))).scalar()
 
-    # Volunteer participation
-    active_volunteers = db.query(Volunteer).filter(Volunteer.status == "active").count()
+        # Volunteer participation
+        active_volunteers = db.query(Volunteer).filter(Volunteer.status == "active").count()
 
-    # Poll participation
-    poll_participants = db.query(func.count(func.distinct(PollResponse.member_id))).scalar()
+        # Poll participation
+        poll_participants = db.query(func.count(func.distinct(PollResponseRecord.member_id))).scalar()
 
     return {
         "total_members": total_members,
@@ -939,32 +927,52 @@ def get_financial_analytics(
     if not year:
         year = datetime.now().year
 
-    # Monthly revenue
-    monthly_revenue = db.query(
-        extract('month', MembershipPayment.payment_date).label('month'),
-        func.sum(MembershipPayment.amount).label('revenue')
-    ).filter(
-        extract('year', MembershipPayment.payment_date) == year
-    ).group_by('month').all()
-
-    # Donation statistics
-    total_donations = db.query(func.sum(Donation.amount)).filter(
-        extract('year', Donation.donation_date) == year
-    ).scalar() or 0
+    if analytics_rollups.is_ready(db):
+        monthly_revenue = [(p.month, amount) for p, amount in analytics_rollups.revenue(db, "membership", year)]
+        total_donations = sum(amount for _, amount in analytics_rollups.revenue(db, "donation", year))
+    else:
+        # Monthly revenue; range filters instead of extract() so payment_date's index applies
+        monthly_revenue = db.query(
+            extract('month', MembershipPayment.payment_date).label('month'),
+            func.sum(MembershipPayment.amount).label('revenue')
+        ).filter(
+            MembershipPayment.payment_date >= datetime(year, 1, 1),
+            MembershipPayment.payment_date < datetime(year + 1, 1, 1)
+        ).group_by('month').all()
+
+        # Donation statistics
+        total_donations = db.query(func.sum(Donation.amount)).filter(
+            Donation.donation_date >= datetime(year, 1, 1),
+            Donation.donation_date < datetime(year + 1, 1, 1)
+        ).scalar() or 0
 
     # Campaign spending
     campaign_spending = db.query(func.sum(Campaign.actual_spending)).filter(
-        extract('year', Campaign.start_date) == year
+        Campaign.start_date >= date(year, 1, 1),
+        Campaign.start_date < date(year + 1, 1, 1)
     ).scalar() or 0
 
     return {
         "year": year,
-        "monthly_revenue": [{"month": m[0], "revenue": float(m[1])} for m in monthly_revenue],
+        "monthly_revenue": [{"month": int(m[0]), "revenue": float(m[1])} for m in monthly_revenue],
         "total_donations": float(total_donations),
         "campaign_spending": float(campaign_spending),
         "net_income": float(total_donations) - float(campaign_spending)
     }
 
+@app.on_event("startup")
+def start_analytics_rollups():
+    rollup_job.start()
+
+@app.on_event("startup")
+def build_legacy_poll_tallies():
+    db = SessionLocal()
+    try:
+        poll_engine.clear_anonymous_participation_times(db)
+        poll_engine.rebuild_missing(db)
+    finally:
+        db.close()
+
 # Background task for processing communications
 async def process_communication(communication_id: str):
     # This would contain actual logic for sending SMS/Email/WhatsApp
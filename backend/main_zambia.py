@@ -655,15 +655,15 @@ def get_voter_registration_analytics(db: Session = Depends(get_db)):
 @app.get("/api/zambia/analytics/youth-participation")
 def get_youth_participation_analytics(db: Session = Depends(get_db)):
     """Get youth participation analytics"""
-    from sqlalchemy import func
     from models import Member
     from datetime import date
 
     today = date.today()
     youth_age_limit = today.year - 35
 
+    # Born in or after the cut-off year; a date range keeps date_of_birth's index usable
     total_youth = db.query(Member).filter(
-        func.extract('year', Member.date_of_birth) >= youth_age_limit
+        Member.date_of_birth >= date(youth_age_limit, 1, 1)
     ).count()
 
     youth_wing_members = db.query(YouthWing).count()
@@ -12,6 +12,12 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from typing import Optional
 
+try:
+    from backend.utils.metrics import time_provider_call
+except ImportError:
+    # Imported from a script run in backend/
+    from utils.metrics import time_provider_call
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -71,9 +77,11 @@ class NotificationService:
 
             logger.info(f"📱 Sending SMS to {clean_phone}")
 
-            response = requests.get(self.sms_api_url, params=params, timeout=30)
+            with time_provider_call('sms', 'cloudservicezm') as call:
+                response = requests.get(self.sms_api_url, params=params, timeout=30)
+                call['ok'] = response.status_code == 200 and 'success' in response.text.lower()
 
-            if response.status_code == 200 and 'success' in response.text.lower():
+            if call['ok']:
                 logger.info(f"✅ SMS sent to {clean_phone}: {response.text}")
                 return True
             else:
@@ -135,7 +143,7 @@ class NotificationService:
             html_part = MIMEText(html_body, 'html')
             msg.attach(html_part)
 
-            with smtplib.SMTP(self.mail_server, self.mail_port) as server:
+            with time_provider_call('email', 'smtp'), smtplib.SMTP(self.mail_server, self.mail_port) as server:
                 server.starttls()
                 server.login(self.mail_username, self.mail_password)
                 server.send_message(msg)
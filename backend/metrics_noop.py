@@ -0,0 +1,38 @@
+"""
+No-op stand-ins for the backend.utils.metrics names the vendored services use
+
+sms_service, email_service and cgrate_service are also copied into other
+applications' service packages (services.*, app.services.*), where neither
+the backend nor prometheus_client exists. Copied next to them, this module
+lets them import and record nothing. It has no dependencies.
+"""
+from contextlib import contextmanager
+
+
+class _NoMetric:
+    """Accepts the metric calls the services make and records nothing"""
+
+    def labels(self, *values):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+NOTIFICATION_QUEUE_DEPTH = _NoMetric()
+CGRATE_REQUEST_SECONDS = _NoMetric()
+
+
+@contextmanager
+def time_provider_call(channel, provider):
+    yield {"ok": True}
+
+
+def soap_operation(soap_body):
+    return "unknown"
@@ -0,0 +1,45 @@
+-- Migration: Sharded election vote counters
+-- Date: 2026-10-18
+-- Description: One vote per member per election, and the per-candidate counter
+-- shards the results endpoint sums (backend/voting_engine.py). Run before
+-- deploying the voting engine so that elections already under way keep their
+-- counts. Safe to re-run.
+
+-- Members who voted twice through the old check-then-insert keep their first vote
+DELETE FROM election_votes later
+USING election_votes earlier
+WHERE later.election_id = earlier.election_id
+  AND later.voter_id = earlier.voter_id
+  AND (earlier.vote_timestamp, earlier.id::text) < (later.vote_timestamp, later.id::text);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_election_vote_voter') THEN
+        ALTER TABLE election_votes ADD CONSTRAINT uq_election_vote_voter UNIQUE (election_id, voter_id);
+    END IF;
+END $$;
+
+-- Invalidated votes are subtracted from the shard sums when tallying
+CREATE INDEX IF NOT EXISTS ix_election_votes_invalid ON election_votes(election_id) WHERE NOT is_valid;
+
+CREATE TABLE IF NOT EXISTS election_vote_shards (
+    candidate_id UUID NOT NULL REFERENCES election_candidates(id) ON DELETE CASCADE,
+    shard INTEGER NOT NULL,
+    election_id UUID NOT NULL REFERENCES internal_elections(id) ON DELETE CASCADE,
+    votes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (candidate_id, shard)
+);
+
+CREATE INDEX IF NOT EXISTS ix_election_vote_shards_election_id ON election_vote_shards(election_id);
+
+-- Backfill: every vote cast so far (valid or not, as the tally subtracts the
+-- invalid ones) goes into shard 0 of its candidate. Candidates that already
+-- have shards are skipped, so a re-run does not count votes twice.
+INSERT INTO election_vote_shards (candidate_id, shard, election_id, votes)
+SELECT v.candidate_id, 0, v.election_id, count(*)
+FROM election_votes v
+WHERE v.candidate_id IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM election_vote_shards s WHERE s.candidate_id = v.candidate_id)
+GROUP BY v.candidate_id, v.election_id;
+
+COMMENT ON TABLE election_vote_shards IS 'Votes cast per candidate, spread over shards; a tally is their sum less invalidated votes';
@@ -33,7 +33,7 @@ class Member(Base):
     literacy_level = Column(String(20), default="advanced")
     communication_preference = Column(String(20), default="sms")
     registration_channel = Column(String(20), nullable=False)
-    registration_date = Column(DateTime, default=datetime.utcnow)
+    registration_date = Column(DateTime, default=datetime.utcnow, index=True)
     membership_status = Column(String(20), default="pending", index=True)
     membership_type = Column(String(30), default="regular")
     photo_url = Column(String(500))
@@ -46,7 +46,7 @@ class Member(Base):
     is_verified = Column(Boolean, default=False)
     verification_token = Column(String(100))
     referred_by = Column(String(20))  # Membership number of referrer
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -62,13 +62,13 @@ class MembershipPayment(Base):
     amount = Column(DECIMAL(10, 2), nullable=False)
     payment_method = Column(String(50), nullable=False)
     payment_reference = Column(String(100), unique=True)
-    payment_date = Column(DateTime, default=datetime.utcnow)
+    payment_date = Column(DateTime, default=datetime.utcnow, index=True)
     payment_year = Column(Integer, nullable=False)
     payment_status = Column(String(20), default="pending")
     receipt_number = Column(String(50), unique=True)
     processed_by = Column(String(100))
     notes = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     # Relationships
     member = relationship("Member", back_populates="payments")
@@ -7,14 +7,17 @@ from .constituency import Constituency
 from .ward import Ward
 from .member import Member
 from .user import User
-from .ussd_session import USSDSession
+from .ussd_session import USSDSession, USSDSessionArchive
 from .rbac import Role, Permission, RolePermission, UserRole
 from .event import Event, EventRegistration, EventAttachment
 from .referral import Referral
+from .membership_counter import MembershipCounter
+from .import_job import ImportJob, ImportStagingRow
 
 __all__ = [
-    "Province", "District", "Constituency", "Ward", "Member", "User", "USSDSession",
+    "Province", "District", "Constituency", "Ward", "Member", "User", "USSDSession", "USSDSessionArchive",
     "Role", "Permission", "RolePermission", "UserRole",
     "Event", "EventRegistration", "EventAttachment",
-    "Referral"
+    "Referral", "MembershipCounter",
+    "ImportJob", "ImportStagingRow"
 ]
@@ -1,7 +1,7 @@
 """
 Event Management Models
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.config.database import Base
@@ -41,6 +41,11 @@ class Event(Base):
     registrations = relationship("EventRegistration", back_populates="event", cascade="all, delete-orphan")
     attachments = relationship("EventAttachment", back_populates="event", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Event listing filters by status and pages by start date
+        Index('ix_events_status_start_date', 'status', 'start_date'),
+    )
+
     def __repr__(self):
         return f"<Event {self.title}>"
 
@@ -61,6 +66,11 @@ class EventRegistration(Base):
     event = relationship("Event", back_populates="registrations")
     member = relationship("Member")
 
+    __table_args__ = (
+        # Registration and attendance counts per event
+        Index('ix_event_registrations_event_id_status', 'event_id', 'registration_status'),
+    )
+
     def __repr__(self):
         return f"<EventRegistration event_id={self.event_id} member_id={self.member_id}>"
 
@@ -0,0 +1,86 @@
+"""
+Member import job models
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from backend.config.database import Base
+
+
+class ImportJob(Base):
+    """
+    A bulk member import: the uploaded file, its parse progress and outcome
+
+    The file is stored once on disk; its rows are parsed into
+    import_staging_rows, previewed from there and copied into members in a
+    single statement when the job is committed.
+    """
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=False)
+    file_format = Column(String(10), nullable=False)  # csv, xlsx, xls, docx, zip
+    status = Column(String(20), nullable=False, default="uploaded", index=True)
+    default_ward_id = Column(Integer, ForeignKey("wards.id"), nullable=True)  # For rows without a ward
+    match_similar = Column(Boolean, nullable=False, default=False)  # Also flag near-duplicate name + date of birth
+    expected_rows = Column(Integer, nullable=True)  # Estimated from the file before parsing, where cheap
+    parsed_rows = Column(Integer, nullable=False, default=0)  # Read from the file so far
+    validated_rows = Column(Integer, nullable=False, default=0)  # Non-blank rows validated so far
+    total_rows = Column(Integer, nullable=False, default=0)  # Written to staging so far
+    valid_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    skipped_rows = Column(Integer, nullable=False, default=0)
+    warning_rows = Column(Integer, nullable=False, default=0)  # Valid rows flagged for a look before committing
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)  # Parsing began
+    staged_at = Column(DateTime(timezone=True), nullable=True)  # Parsing ended
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    rows = relationship("ImportStagingRow", back_populates="job", cascade="all, delete-orphan", passive_deletes=True)
+
+    @property
+    def invalid_rows(self) -> int:
+        return self.total_rows - self.valid_rows
+
+    def __repr__(self):
+        return f"<ImportJob(id={self.id}, filename='{self.filename}', status='{self.status}')>"
+
+
+class ImportStagingRow(Base):
+    """One parsed row of an import job, already mapped to member columns"""
+    __tablename__ = "import_staging_rows"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False)
+    row_number = Column(Integer, nullable=False)  # Position in the source file, from 1
+    name = Column(String(200), nullable=True)
+    gender = Column(String(10), nullable=True)
+    date_of_birth = Column(Date, nullable=True)
+    age = Column(Integer, nullable=True)
+    nrc = Column(String(50), nullable=True)
+    voters_id = Column(String(50), nullable=True)
+    contact = Column(String(50), nullable=True)
+    contact_e164 = Column(String(16), nullable=True)
+    province = Column(String(100), nullable=True)  # Location as written in the file
+    district = Column(String(100), nullable=True)
+    constituency = Column(String(100), nullable=True)
+    ward = Column(String(100), nullable=True)
+    ward_id = Column(Integer, nullable=True)  # Resolved from the names above
+    is_valid = Column(Boolean, nullable=False, default=False)
+    errors = Column(Text, nullable=True)  # "; "-separated
+    warnings = Column(Text, nullable=True)  # "; "-separated; shared phones and similar members, not blocking
+    status = Column(String(20), nullable=False, default="staged")  # staged, imported, skipped
+
+    job = relationship("ImportJob", back_populates="rows")
+
+    __table_args__ = (
+        # Preview pages and the commit both read one job's rows in file order
+        Index('ix_import_staging_rows_job_id_row_number', 'job_id', 'row_number', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<ImportStagingRow(job_id={self.job_id}, row_number={self.row_number}, name='{self.name}')>"
@@ -1,11 +1,12 @@
 """
 Member model
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from datetime import datetime, date
 from backend.config.database import Base
+from backend.utils.phone import to_e164
 
 
 class Member(Base):
@@ -14,19 +15,31 @@ class Member(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False, index=True)
     gender = Column(String(10), nullable=False)
-    date_of_birth = Column(Date, nullable=True)
+    date_of_birth = Column(Date, nullable=True, index=True)
     age = Column(Integer, nullable=True)  # Keep for backward compatibility, can be calculated
     nrc = Column(String(50), nullable=True, index=True)  # National Registration Card
     voters_id = Column(String(50), nullable=False, unique=True, index=True)  # Voter's ID - Required and Unique
     contact = Column(String(50), nullable=True)
+    contact_e164 = Column(String(16), nullable=True, index=True)  # Canonical form of contact, set on write
     profile_picture = Column(String(500), nullable=True)  # Path to profile picture
-    ward_id = Column(Integer, ForeignKey("wards.id"), nullable=False)
+    ward_id = Column(Integer, ForeignKey("wards.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     ward = relationship("Ward", back_populates="members")
 
+    __table_args__ = (
+        # USSD recognises returning callers by contact; most rows have none
+        Index('ix_members_contact', 'contact',
+              postgresql_where=contact.isnot(None), sqlite_where=contact.isnot(None)),
+    )
+
+    @validates("contact")
+    def _normalise_contact(self, key, value):
+        self.contact_e164 = to_e164(value)
+        return value
+
     @property
     def calculated_age(self):
         """Calculate age from date of birth"""
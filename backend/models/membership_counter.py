@@ -0,0 +1,28 @@
+"""
+Membership counter model
+"""
+from sqlalchemy import Column, Integer, String
+from backend.config.database import Base
+
+
+class MembershipCounter(Base):
+    """
+    Member counts per location, gender and birth year
+
+    The primary key runs province -> district -> constituency -> ward, so a
+    drill-down at any level is a single index range read. Birth year is
+    stored rather than an age band so rows never go stale as members age;
+    bands are summed from birth-year ranges at read time.
+    """
+    __tablename__ = "membership_counters"
+
+    province_id = Column(Integer, primary_key=True)
+    district_id = Column(Integer, primary_key=True)
+    constituency_id = Column(Integer, primary_key=True)
+    ward_id = Column(Integer, primary_key=True)
+    gender = Column(String(10), primary_key=True)
+    birth_year = Column(Integer, primary_key=True)  # 0 when unknown
+    member_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MembershipCounter(ward_id={self.ward_id}, gender='{self.gender}', birth_year={self.birth_year}, member_count={self.member_count})>"
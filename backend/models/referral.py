@@ -1,7 +1,7 @@
 """
 Referral Management Models
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.config.database import Base
@@ -36,5 +36,11 @@ class Referral(Base):
     referrer = relationship("Member", foreign_keys=[referrer_id], backref="referrals_made")
     referred_member = relationship("Member", foreign_keys=[referred_member_id], backref="referred_by")
 
+    __table_args__ = (
+        # Referral listing pages newest first, per referrer or per status
+        Index('ix_referrals_referrer_id_referred_date', 'referrer_id', 'referred_date'),
+        Index('ix_referrals_status_referred_date', 'status', 'referred_date'),
+    )
+
     def __repr__(self):
         return f"<Referral referrer_id={self.referrer_id} referred={self.referred_name}>"
@@ -2,9 +2,10 @@
 User model for system authentication
 """
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from backend.config.database import Base
+from backend.utils.phone import to_e164
 
 
 class User(Base):
@@ -14,6 +15,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(200), unique=True, nullable=False, index=True)
     phone = Column(String(50), unique=True, nullable=True, index=True)
+    phone_e164 = Column(String(16), unique=True, nullable=True, index=True)  # Canonical form of phone, set on write
     pin_hash = Column(String(255), nullable=False)  # Hashed PIN
     full_name = Column(String(200), nullable=False)
     role = Column(String(50), nullable=False, default="member")  # admin, coordinator, member, viewer
@@ -27,5 +29,16 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
 
+    @validates("phone")
+    def _normalise_phone(self, key, value):
+        self.phone_e164 = to_e164(value)
+        return value
+
+    @classmethod
+    def phone_matches(cls, phone: str):
+        """Filter condition matching a phone number written in any format"""
+        e164 = to_e164(phone)
+        return cls.phone_e164 == e164 if e164 else cls.phone == phone
+
     def __repr__(self):
         return f"<User {self.email} - {self.role}>"
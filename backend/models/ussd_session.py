@@ -1,7 +1,7 @@
 """
 USSD Session model for tracking USSD interactions
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Index
 from datetime import datetime
 from backend.config.database import Base
 
@@ -19,5 +19,35 @@ class USSDSession(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Active sessions are a small slice of the table; finding idle ones
+        # to expire reads only that slice
+        Index('ix_ussd_sessions_active_updated_at', 'updated_at',
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+    )
+
     def __repr__(self):
         return f"<USSDSession {self.session_id} - {self.phone_number}>"
+
+
+class USSDSessionArchive(Base):
+    """
+    Finished USSD sessions, kept for analytics
+
+    ussd_sessions only holds live sessions: a session is moved here when it
+    ends or when the reaper expires it, so lookups on the hot table stay
+    cheap however much traffic has been served.
+    """
+    __tablename__ = "ussd_session_archive"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(100), nullable=False)
+    phone_number = Column(String(50), nullable=False)
+    member_id = Column(Integer, nullable=True)
+    final_step = Column(String(100), nullable=False)
+    outcome = Column(String(20), nullable=False)  # 'completed', 'expired'
+    started_at = Column(DateTime, nullable=True)
+    ended_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<USSDSessionArchive {self.session_id} - {self.outcome}>"
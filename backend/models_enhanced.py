@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Date, Text, ForeignKey, JSON, DECIMAL, ARRAY, CheckConstraint
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Date, Text, ForeignKey, JSON, DECIMAL, ARRAY, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from database import Base
@@ -15,7 +15,7 @@ class Donation(Base):
     donor_type = Column(String(50))
     amount = Column(DECIMAL(12, 2), nullable=False)
     currency = Column(String(10), default="ZMW")
-    donation_date = Column(DateTime, default=datetime.utcnow)
+    donation_date = Column(DateTime, default=datetime.utcnow, index=True)
     donation_method = Column(String(50))
     purpose = Column(String(200))
     campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"))
@@ -23,7 +23,7 @@ class Donation(Base):
     receipt_number = Column(String(50))
     anonymous = Column(Boolean, default=False)
     notes = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     donor = relationship("Member", foreign_keys=[donor_member_id])
     campaign = relationship("Campaign", back_populates="donations")
@@ -220,6 +220,46 @@ class PollResponse(Base):
     question = relationship("PollQuestion", back_populates="responses")
     member = relationship("Member")
 
+    __table_args__ = (
+        Index("ix_poll_responses_question_submitted", "question_id", "submitted_at"),
+    )
+
+class PollParticipation(Base):
+    """One row per member who answered a poll; the primary key rejects double submits to one-vote polls"""
+    __tablename__ = "poll_participations"
+
+    poll_id = Column(UUID(as_uuid=True), ForeignKey("polls.id", ondelete="CASCADE"), primary_key=True)
+    member_id = Column(UUID(as_uuid=True), ForeignKey("members.id", ondelete="CASCADE"), primary_key=True)
+    # NULL for anonymous polls, whose answers could otherwise be matched to members by time
+    created_at = Column(DateTime, nullable=True, default=datetime.utcnow)
+
+class PollTally(Base):
+    """Running participant count for a poll; its presence marks the poll's tallies as complete"""
+    __tablename__ = "poll_tallies"
+
+    poll_id = Column(UUID(as_uuid=True), ForeignKey("polls.id", ondelete="CASCADE"), primary_key=True)
+    participants = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class PollQuestionTally(Base):
+    """Running response count and rating sum per question"""
+    __tablename__ = "poll_question_tallies"
+
+    question_id = Column(UUID(as_uuid=True), ForeignKey("poll_questions.id", ondelete="CASCADE"), primary_key=True)
+    poll_id = Column(UUID(as_uuid=True), ForeignKey("polls.id", ondelete="CASCADE"), nullable=False, index=True)
+    response_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+
+class PollOptionTally(Base):
+    """Running count per choice option"""
+    __tablename__ = "poll_option_tallies"
+
+    question_id = Column(UUID(as_uuid=True), ForeignKey("poll_questions.id", ondelete="CASCADE"), primary_key=True)
+    option = Column(String(500), primary_key=True)
+    poll_id = Column(UUID(as_uuid=True), ForeignKey("polls.id", ondelete="CASCADE"), nullable=False, index=True)
+    votes = Column(Integer, nullable=False, default=0)
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -335,6 +375,21 @@ class ElectionVote(Base):
     election = relationship("InternalElection", back_populates="votes")
     voter = relationship("Member")
 
+    __table_args__ = (
+        UniqueConstraint("election_id", "voter_id", name="uq_election_vote_voter"),
+        # Invalidated votes are subtracted from the shard tallies
+        Index("ix_election_votes_invalid", "election_id", postgresql_where=text("NOT is_valid")),
+    )
+
+class ElectionVoteShard(Base):
+    """Sharded per-candidate counters of votes cast; the tally is their sum less invalidated votes"""
+    __tablename__ = "election_vote_shards"
+
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("election_candidates.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    election_id = Column(UUID(as_uuid=True), ForeignKey("internal_elections.id", ondelete="CASCADE"), nullable=False, index=True)
+    votes = Column(Integer, nullable=False, default=0)
+
 class AttendanceRecord(Base):
     __tablename__ = "attendance_records"
 
@@ -388,4 +443,44 @@ class Partner(Base):
     agreement_date = Column(Date)
     agreement_expiry = Column(Date)
     partnership_details = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+# Analytics rollups
+class MemberGrowthRollup(Base):
+    """New registrations per day/month and ward"""
+    __tablename__ = "member_growth_rollups"
+
+    period_type = Column(String(10), primary_key=True)  # day, month
+    period_start = Column(Date, primary_key=True)
+    constituency = Column(String(100), primary_key=True)
+    ward = Column(String(100), primary_key=True)
+    new_members = Column(Integer, nullable=False, default=0)
+
+class RevenueRollup(Base):
+    """Membership payment and donation totals per day/month"""
+    __tablename__ = "revenue_rollups"
+
+    period_type = Column(String(10), primary_key=True)  # day, month
+    period_start = Column(Date, primary_key=True)
+    source = Column(String(20), primary_key=True)  # membership, donation
+    amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    transactions = Column(Integer, nullable=False, default=0)
+
+class EngagementSnapshot(Base):
+    """Distinct participant counts as of the latest rollup refresh"""
+    __tablename__ = "engagement_snapshots"
+
+    snapshot_date = Column(Date, primary_key=True)
+    total_members = Column(Integer, nullable=False, default=0)
+    activity_participants = Column(Integer, nullable=False, default=0)
+    training_participants = Column(Integer, nullable=False, default=0)
+    active_volunteers = Column(Integer, nullable=False, default=0)
+    poll_participants = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+class RollupWatermark(Base):
+    """Change timestamp up to which a rollup has been refreshed"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    high_water = Column(DateTime, nullable=False)
+    last_full_refresh = Column(DateTime)
@@ -0,0 +1,360 @@
+"""
+Poll submission and results
+
+Results are served from running tallies that are bumped in the same
+transaction as the responses, so reading a poll costs a handful of indexed
+lookups however many responses it has. Polls that predate the tally tables
+are rebuilt in SQL (jsonb_array_elements + GROUP BY for choice questions,
+SUM/COUNT for ratings) by rebuild_missing() at startup, or on demand through
+rebuild(); reads never write.
+
+Every participant is recorded in poll_participations. Its primary key turns
+a concurrent double submit to a one-vote poll into an ON CONFLICT no-op, and
+the participant tally counts its rows: distinct members, however many times
+each answered a multiple-vote poll. Answers are written with a single bulk
+insert per submission or offline batch.
+
+Answers to anonymous polls carry no member, and their participation rows
+carry no time (and are inserted in member id order), so the two cannot be
+matched up by when they were written.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models import Member
+from utils.phone import stored_forms, to_e164
+from models_enhanced import (
+    Poll, PollQuestion, PollResponse, PollParticipation, PollTally, PollQuestionTally, PollOptionTally
+)
+
+CHOICE_TYPES = ("single_choice", "multiple_choice")
+RATING_TYPE = "rating"
+TEXT_SAMPLE_SIZE = 5
+
+
+class PollNotFoundError(Exception):
+    """Raised when the poll does not exist"""
+
+
+class InvalidPollResponseError(Exception):
+    """Raised when a response does not belong to the poll"""
+
+
+class PollEngine:
+    def submit(self, db: Session, poll_id, member_id, responses: List) -> None:
+        """Store one member's answers and bump the poll's tallies in one transaction"""
+        poll, question_types = self._open(db, poll_id)
+        for response in responses:
+            if response.question_id not in question_types:
+                raise InvalidPollResponseError(f"Question {response.question_id} is not part of this poll")
+
+        new_participants = len(self._claim(db, poll, [member_id]))
+        if not new_participants and not poll.allow_multiple_votes:
+            db.rollback()
+            raise InvalidPollResponseError("You have already responded to this poll")
+
+        self._store(db, poll, question_types, [(member_id, datetime.utcnow(), responses)], new_participants)
+        db.commit()
+
+    def submit_batch(self, db: Session, poll_id, submissions: List) -> Dict:
+        """
+        Ingest offline submissions (e.g. USSD/SMS answers collected by the gateway)
+
+        Each submission names the handset it came from, and is counted for
+        the member registered with that phone number (compared in E.164, so
+        +260977... finds a member stored as 0977...); a member id that
+        belongs to another member is rejected rather than trusted.
+        Submissions with foreign questions are rejected too, repeat
+        participants in one-vote polls are counted as duplicates, and the
+        rest are stored with one bulk insert and one tally update.
+        """
+        poll, question_types = self._open(db, poll_id)
+
+        canonical = {s.phone_number: to_e164(s.phone_number) for s in submissions}
+        # members.phone_number is stored as entered, so every shape of each number is looked up
+        forms = {form for e164 in canonical.values() if e164 for form in stored_forms(e164)}
+        members_by_phone = {
+            to_e164(phone): member_id
+            for phone, member_id in db.query(Member.phone_number, Member.id).filter(Member.phone_number.in_(forms))
+        } if forms else {}
+
+        rejected = []
+        valid = []
+        for index, submission in enumerate(submissions):
+            member_id = members_by_phone.get(canonical[submission.phone_number])
+            if member_id is None:
+                rejected.append({"index": index, "reason": "Unknown member"})
+            elif submission.member_id and submission.member_id != member_id:
+                rejected.append({"index": index, "reason": "Member does not match phone number"})
+            elif any(r.question_id not in question_types for r in submission.responses):
+                rejected.append({"index": index, "reason": "Question is not part of this poll"})
+            else:
+                valid.append((member_id, submission.submitted_at or datetime.utcnow(), submission.responses))
+
+        claimed = self._claim(db, poll, [member_id for member_id, _, _ in valid])
+        new_participants = len(claimed)
+        if poll.allow_multiple_votes:
+            accepted = valid
+        else:
+            accepted = []
+            for member_id, submitted_at, responses in valid:
+                # A member listed twice in one batch only counts once
+                if member_id in claimed:
+                    accepted.append((member_id, submitted_at, responses))
+                    claimed.discard(member_id)
+
+        self._store(db, poll, question_types, accepted, new_participants)
+        db.commit()
+
+        return {
+            "accepted": len(accepted),
+            "duplicates": len(valid) - len(accepted),
+            "rejected": rejected
+        }
+
+    def _open(self, db: Session, poll_id):
+        """Load a poll and its question types, share-locked against rebuild()"""
+        poll = db.query(Poll).filter(Poll.id == poll_id).with_for_update(read=True).first()
+        if not poll:
+            raise PollNotFoundError("Poll not found")
+
+        question_types = dict(
+            db.query(PollQuestion.id, PollQuestion.question_type).filter(PollQuestion.poll_id == poll_id).all()
+        )
+        return poll, question_types
+
+    def _claim(self, db: Session, poll, member_ids: List) -> set:
+        """Record participation; returns the members that had not responded to the poll yet"""
+        if not member_ids:
+            return set()
+
+        # A participation time would link a member to their anonymous answers' submitted_at
+        created_at = None if poll.is_anonymous else datetime.utcnow()
+        stmt = insert(PollParticipation).values([
+            {"poll_id": poll.id, "member_id": member_id, "created_at": created_at}
+            for member_id in sorted(set(member_ids), key=str)
+        ]).on_conflict_do_nothing().returning(PollParticipation.member_id)
+        return {member_id for member_id, in db.execute(stmt)}
+
+    def _store(self, db: Session, poll, question_types: Dict, submissions: List, new_participants: int) -> None:
+        """Bulk insert the answers of accepted submissions and bump the tallies"""
+        if not submissions:
+            return
+
+        rows = [
+            dict(
+                response.dict(),
+                poll_id=poll.id,
+                member_id=member_id if not poll.is_anonymous else None,
+                submitted_at=submitted_at
+            )
+            for member_id, submitted_at, responses in submissions
+            for response in responses
+        ]
+        if rows:
+            # Core insert: the ORM bulk path splits rows whose NULL columns
+            # differ (choice vs rating vs text answers) into separate INSERTs
+            db.execute(insert(PollResponse.__table__), rows)
+
+        self._bump_tallies(
+            db, poll.id, question_types,
+            [response for _, _, responses in submissions for response in responses],
+            participants=new_participants
+        )
+
+    def _bump_tallies(self, db: Session, poll_id, question_types: Dict, responses: List, participants: int) -> None:
+        db.query(PollTally).filter(PollTally.poll_id == poll_id).update(
+            {PollTally.participants: PollTally.participants + participants, PollTally.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+
+        questions = {}
+        options = Counter()
+        for response in responses:
+            row = questions.setdefault(response.question_id, {
+                "question_id": response.question_id,
+                "poll_id": poll_id,
+                "response_count": 0,
+                "rating_sum": 0,
+                "rating_count": 0
+            })
+            row["response_count"] += 1
+            question_type = question_types[response.question_id]
+            if question_type == RATING_TYPE and response.response_rating is not None:
+                row["rating_sum"] += response.response_rating
+                row["rating_count"] += 1
+            elif question_type in CHOICE_TYPES:
+                for option in response.response_options or []:
+                    options[(response.question_id, option)] += 1
+
+        # Rows are upserted in key order so concurrent submissions lock them
+        # in the same order and cannot deadlock
+        if questions:
+            stmt = insert(PollQuestionTally).values(
+                [questions[key] for key in sorted(questions, key=str)]
+            )
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[PollQuestionTally.question_id],
+                set_={
+                    "response_count": PollQuestionTally.response_count + stmt.excluded.response_count,
+                    "rating_sum": PollQuestionTally.rating_sum + stmt.excluded.rating_sum,
+                    "rating_count": PollQuestionTally.rating_count + stmt.excluded.rating_count
+                }
+            ))
+
+        if options:
+            stmt = insert(PollOptionTally).values([
+                {"question_id": question_id, "option": option, "poll_id": poll_id, "votes": votes}
+                for (question_id, option), votes in sorted(options.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[PollOptionTally.question_id, PollOptionTally.option],
+                set_={"votes": PollOptionTally.votes + stmt.excluded.votes}
+            ))
+
+    def rebuild_missing(self, db: Session) -> int:
+        """Build tallies for every poll that predates them; returns how many were built"""
+        rebuilt = 0
+        for poll_id, in db.query(Poll.id).outerjoin(PollTally, PollTally.poll_id == Poll.id).filter(
+            PollTally.poll_id.is_(None)
+        ).all():
+            rebuilt += self.rebuild(db, poll_id, only_missing=True)
+        return rebuilt
+
+    def clear_anonymous_participation_times(self, db: Session) -> int:
+        """Drop the times recorded for anonymous polls' participants before they were left out"""
+        cleared = db.query(PollParticipation).filter(
+            PollParticipation.created_at.isnot(None),
+            PollParticipation.poll_id.in_(select(Poll.id).where(Poll.is_anonymous == True))
+        ).update({PollParticipation.created_at: None}, synchronize_session=False)
+        db.commit()
+        return cleared
+
+    def rebuild(self, db: Session, poll_id, only_missing: bool = False) -> bool:
+        """
+        Recompute a poll's tallies from its responses with one aggregate per table
+
+        With only_missing, a poll whose tallies exist by the time its lock is
+        taken (another worker built them) is left alone. Returns whether the
+        tallies were rebuilt.
+        """
+        poll = db.query(Poll).filter(Poll.id == poll_id).with_for_update().first()
+        if not poll:
+            raise PollNotFoundError("Poll not found")
+        if only_missing and db.query(PollTally.poll_id).filter(PollTally.poll_id == poll_id).first():
+            db.commit()
+            return False
+
+        for model in (PollOptionTally, PollQuestionTally, PollTally):
+            db.query(model).filter(model.poll_id == poll_id).delete(synchronize_session=False)
+
+        # Backfill participation for responses stored before the constraint
+        db.execute(insert(PollParticipation).from_select(
+            ["poll_id", "member_id"],
+            select(PollResponse.poll_id, PollResponse.member_id).where(
+                PollResponse.poll_id == poll_id,
+                PollResponse.member_id.isnot(None)
+            ).distinct()
+        ).on_conflict_do_nothing())
+
+        db.execute(insert(PollQuestionTally).from_select(
+            ["question_id", "poll_id", "response_count", "rating_sum", "rating_count"],
+            select(
+                PollResponse.question_id,
+                PollResponse.poll_id,
+                func.count(),
+                func.coalesce(func.sum(PollResponse.response_rating), 0),
+                func.count(PollResponse.response_rating)
+            ).where(
+                PollResponse.poll_id == poll_id,
+                PollResponse.question_id.isnot(None)
+            ).group_by(PollResponse.question_id, PollResponse.poll_id)
+        ))
+
+        option = func.jsonb_array_elements_text(PollResponse.response_options).table_valued("value").render_derived()
+        db.execute(insert(PollOptionTally).from_select(
+            ["question_id", "option", "poll_id", "votes"],
+            select(
+                PollResponse.question_id,
+                option.c.value,
+                PollResponse.poll_id,
+                func.count()
+            ).select_from(PollResponse).join(
+                PollQuestion, PollQuestion.id == PollResponse.question_id
+            ).join(option, true()).where(
+                PollResponse.poll_id == poll_id,
+                PollQuestion.question_type.in_(CHOICE_TYPES),
+                func.jsonb_typeof(PollResponse.response_options) == "array"
+            ).group_by(PollResponse.question_id, option.c.value, PollResponse.poll_id)
+        ))
+
+        # Same definition as the incremental path; answers to anonymous polls
+        # stored before participation was recorded carry no member to count
+        participants = db.query(func.count()).select_from(PollParticipation).filter(
+            PollParticipation.poll_id == poll_id
+        ).scalar()
+
+        db.add(PollTally(poll_id=poll_id, participants=participants))
+        db.commit()
+        return True
+
+    def results(self, db: Session, poll) -> Dict:
+        """Per-question results and participant count for a poll"""
+        tally = db.query(PollTally).filter(PollTally.poll_id == poll.id).first()
+
+        questions = db.query(PollQuestion).filter(
+            PollQuestion.poll_id == poll.id
+        ).order_by(PollQuestion.question_order).all()
+
+        question_tallies = {
+            t.question_id: t for t in db.query(PollQuestionTally).filter(PollQuestionTally.poll_id == poll.id)
+        }
+
+        option_counts = defaultdict(dict)
+        for question_id, option, votes in db.query(
+            PollOptionTally.question_id, PollOptionTally.option, PollOptionTally.votes
+        ).filter(PollOptionTally.poll_id == poll.id):
+            option_counts[question_id][option] = votes
+
+        # First few text answers per question via a LATERAL ... LIMIT
+        text_ids = [q.id for q in questions if q.question_type not in CHOICE_TYPES + (RATING_TYPE,)]
+        samples = defaultdict(list)
+        if text_ids:
+            sample = select(PollResponse.response_text).where(
+                PollResponse.question_id == PollQuestion.id
+            ).order_by(PollResponse.submitted_at).limit(TEXT_SAMPLE_SIZE).lateral("sample")
+            for question_id, text in db.query(PollQuestion.id, sample.c.response_text).join(
+                sample, true()
+            ).filter(PollQuestion.id.in_(text_ids)):
+                samples[question_id].append(text)
+
+        results = []
+        for question in questions:
+            question_tally = question_tallies.get(question.id)
+            result = {
+                "question": question.question_text,
+                "type": question.question_type,
+                "response_count": question_tally.response_count if question_tally else 0
+            }
+            if question.question_type in CHOICE_TYPES:
+                result["results"] = option_counts.get(question.id, {})
+            elif question.question_type == RATING_TYPE:
+                rated = question_tally.rating_count if question_tally else 0
+                result["average_rating"] = question_tally.rating_sum / rated if rated else 0
+            else:
+                result["sample_responses"] = samples.get(question.id, [])
+            results.append(result)
+
+        return {
+            "poll": poll,
+            "total_responses": tally.participants if tally else 0,
+            "results": results
+        }
+
+
+poll_engine = PollEngine()
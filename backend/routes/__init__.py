@@ -14,6 +14,8 @@ from .permissions import router as permission_router
 from .user_roles import router as user_role_router
 from .events import router as event_router
 from .referrals import router as referral_router
+from .statistics import router as statistics_router
+from .imports import router as import_router
 
 # Create main API router
 api_router = APIRouter()
@@ -42,4 +44,10 @@ api_router.include_router(event_router, tags=["events"])
 # Include referral router
 api_router.include_router(referral_router, tags=["referrals"])
 
+# Include member import router
+api_router.include_router(import_router, tags=["imports"])
+
+# Include statistics router
+api_router.include_router(statistics_router, prefix="/statistics", tags=["statistics"])
+
 __all__ = ["api_router"]
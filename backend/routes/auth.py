@@ -2,37 +2,50 @@
 Authentication API routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime
-import hashlib
+from typing import Optional
 
 from backend.config.database import get_db
 from backend.models import User
-from backend.schemas.user import UserLogin, UserResponse, TokenResponse
+from backend.schemas.user import UserLogin, UserResponse, TokenResponse, TokenRefresh, TokenPair
+from backend.services.rbac_service import permission_resolver
+from backend.services.token_service import token_service, InvalidTokenError, REFRESH_TOKEN
+from backend.services.pin_hasher import verify_pin_async, HasherBusyError
+from backend.routes.dependencies import Principal, get_current_principal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def hash_pin(pin: str) -> str:
-    """Hash a PIN using SHA256"""
-    return hashlib.sha256(pin.encode()).hexdigest()
+def _find_user(db: Session, identifier: str) -> Optional[User]:
+    return db.query(User).filter(
+        (User.email == identifier) |
+        User.phone_matches(identifier)
+    ).first()
 
 
-def verify_pin(plain_pin: str, hashed_pin: str) -> bool:
-    """Verify a PIN against its hash"""
-    return hash_pin(plain_pin) == hashed_pin
+def _record_login(db: Session, user: User, new_hash: Optional[str]) -> None:
+    # Upgrade legacy SHA-256 or outdated argon2 hashes in the same commit
+    if new_hash:
+        user.pin_hash = new_hash
+
+    # Update last login
+    user.last_login = datetime.utcnow()
+    db.commit()
+    db.refresh(user)
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     """
     Authenticate a user with email/phone and PIN
+
+    Async so that no threadpool thread waits out the argon2 verification;
+    the short database round trips run in the threadpool.
     """
     # Try to find user by email or phone
-    user = db.query(User).filter(
-        (User.email == credentials.identifier) |
-        (User.phone == credentials.identifier)
-    ).first()
+    user = await run_in_threadpool(_find_user, db, credentials.identifier)
 
     if not user:
         raise HTTPException(
@@ -46,64 +59,107 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Account is inactive"
         )
 
-    if not verify_pin(credentials.pin, user.pin_hash):
+    try:
+        valid, new_hash = await verify_pin_async(credentials.pin, user.pin_hash)
+    except HasherBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login is busy, please try again"
+        )
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(_record_login, db, user, new_hash)
 
-    # Generate token (simple token for now, in production use JWT)
-    token = f"user_{user.id}_{user.role}_{datetime.utcnow().timestamp()}"
+    tokens = token_service.create_token_pair(user.id, user.role, permission_resolver.version)
 
     return {
-        "access_token": token,
+        **tokens,
         "token_type": "bearer",
         "user": user
     }
 
 
-@router.post("/verify-token")
-def verify_token(token: str, db: Session = Depends(get_db)):
+@router.post("/refresh", response_model=TokenPair)
+def refresh_token(payload: TokenRefresh, db: Session = Depends(get_db)):
     """
-    Verify a token and return user info
+    Exchange a refresh token for a new token pair (the old refresh token is revoked)
     """
-    # Simple token parsing (user_id_role_timestamp)
     try:
-        parts = token.split("_")
-        if len(parts) >= 2 and parts[0] == "user":
-            user_id = int(parts[1])
-            user = db.query(User).filter(User.id == user_id).first()
+        claims = token_service.decode(payload.refresh_token, expected_type=REFRESH_TOKEN)
+    except InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
 
-            if user and user.is_active:
-                return {"valid": True, "user": UserResponse.from_orm(user)}
-    except:
-        pass
+    # Refresh is infrequent, so re-check the account here rather than on every request
+    user = db.query(User).filter(User.id == int(claims["sub"]), User.is_active == True).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
 
-    return {"valid": False}
+    token_service.revoke(claims)
 
+    return {
+        **token_service.create_token_pair(user.id, user.role, permission_resolver.version),
+        "token_type": "bearer"
+    }
 
-@router.get("/me", response_model=UserResponse)
-def get_current_user(token: str, db: Session = Depends(get_db)):
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(payload: Optional[TokenRefresh] = None, principal: Principal = Depends(get_current_principal)):
+    """
+    Revoke the current access token and, if given, its refresh token
+    """
+    token_service.revocations.revoke(principal.jti, principal.expires_at)
+
+    if payload is not None:
+        try:
+            token_service.revoke(token_service.decode(payload.refresh_token, expected_type=REFRESH_TOKEN))
+        except InvalidTokenError:
+            pass
+
+    return None
+
+
+@router.post("/verify-token")
+def verify_token(token: str):
     """
-    Get current user from token
+    Verify a token in-process and return its claims
     """
     try:
-        parts = token.split("_")
-        if len(parts) >= 2 and parts[0] == "user":
-            user_id = int(parts[1])
-            user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
-
-            if user:
-                return user
-    except:
-        pass
-
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid or expired token"
-    )
+        claims = token_service.decode(token)
+    except InvalidTokenError:
+        return {"valid": False}
+
+    return {
+        "valid": True,
+        "user_id": int(claims["sub"]),
+        "role": claims["role"],
+        "permission_version": claims["pv"],
+        "permissions_stale": claims["pv"] != permission_resolver.version,
+        "expires_at": claims["exp"]
+    }
+
+
+@router.get("/me", response_model=UserResponse)
+def get_current_user(principal: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
+    """
+    Get the current user's profile
+    """
+    user = db.query(User).filter(User.id == principal.user_id, User.is_active == True).first()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+
+    return user
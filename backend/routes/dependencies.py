@@ -0,0 +1,89 @@
+"""
+Shared FastAPI dependencies for authentication and authorization
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.orm import Session
+
+from backend.config.database import get_db
+from backend.services.rbac_service import permission_resolver
+from backend.services.token_service import token_service, InvalidTokenError
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated caller as carried by the access token"""
+    user_id: int
+    role: str
+    permission_version: int = 0
+    jti: Optional[str] = None
+    expires_at: int = 0
+
+    @property
+    def user_type(self) -> str:
+        """RBAC user type ('admin' or 'member') used by user role assignments"""
+        return "member" if self.role == "member" else "admin"
+
+
+def _extract_token(authorization: Optional[str], token: Optional[str]) -> Optional[str]:
+    """Read the token from a Bearer header, falling back to the ?token= query param"""
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return token
+
+
+def get_current_principal(
+    authorization: Optional[str] = Header(None),
+    token: Optional[str] = None
+) -> Principal:
+    """
+    Resolve the caller from the access token without a database lookup
+    """
+    raw_token = _extract_token(authorization, token)
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+
+    try:
+        claims = token_service.decode(raw_token)
+    except InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+
+    return Principal(
+        user_id=int(claims["sub"]),
+        role=claims["role"],
+        permission_version=claims.get("pv", 0),
+        jti=claims["jti"],
+        expires_at=claims["exp"]
+    )
+
+
+def require_permission(resource: str, action: str):
+    """
+    Build a dependency that rejects callers lacking resource.action
+
+    Usage: ``Depends(require_permission("members", "read"))``. Once a user's
+    effective set is cached the check is a single set lookup; the DB session
+    is only used to rebuild the set after a permission version bump.
+    """
+    def dependency(
+        principal: Principal = Depends(get_current_principal),
+        db: Session = Depends(get_db)
+    ) -> Principal:
+        if not permission_resolver.has_permission(
+            db, principal.user_id, principal.user_type, resource, action
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Missing permission '{resource}.{action}'"
+            )
+        return principal
+
+    return dependency
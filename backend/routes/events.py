@@ -3,7 +3,7 @@ Events API Router
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_, and_
+from sqlalchemy import case, func, or_, and_
 from typing import List, Optional
 from datetime import datetime
 
@@ -91,22 +91,24 @@ def list_events(
     # Get events with registration counts
     events = query.order_by(Event.start_date.desc()).offset(skip).limit(limit).all()
 
-    # Add registration and attendance counts to each event
+    # Registration and attendance counts of the whole page in one query
+    counts = {}
+    if events:
+        counts = {
+            event_id: (registration_count or 0, attendance_count or 0)
+            for event_id, registration_count, attendance_count in db.query(
+                EventRegistration.event_id,
+                func.sum(case((EventRegistration.registration_status != 'cancelled', 1), else_=0)),
+                func.sum(case((EventRegistration.registration_status == 'attended', 1), else_=0))
+            ).filter(
+                EventRegistration.event_id.in_([event.id for event in events])
+            ).group_by(EventRegistration.event_id).all()
+        }
+
     event_responses = []
     for event in events:
-        registration_count = db.query(EventRegistration).filter(
-            EventRegistration.event_id == event.id,
-            EventRegistration.registration_status != 'cancelled'
-        ).count()
-
-        attendance_count = db.query(EventRegistration).filter(
-            EventRegistration.event_id == event.id,
-            EventRegistration.registration_status == 'attended'
-        ).count()
-
         event_data = EventResponse.from_orm(event)
-        event_data.registration_count = registration_count
-        event_data.attendance_count = attendance_count
+        event_data.registration_count, event_data.attendance_count = counts.get(event.id, (0, 0))
         event_responses.append(event_data)
 
     return {"total": total, "events": event_responses}
@@ -0,0 +1,138 @@
+"""
+Member import API routes
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Query, UploadFile, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from backend.config.database import get_db
+from backend.routes.dependencies import Principal, require_permission
+from backend.schemas.import_job import ImportJobResponse, ImportProgressResponse, ImportRowPage
+from backend.services.import_service import ImportJobService
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+
+@router.post("", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def upload_import(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    default_ward_id: Optional[int] = Form(None),
+    match_similar: bool = Form(False),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "create"))
+):
+    """
+    Store an uploaded member file and parse it into staging in the background
+
+    Poll the job until its status is `staged`, then preview its rows and
+    commit it. `default_ward_id` is used for rows that name no ward. A .zip
+    of .docx registration forms is staged as one job, its documents parsed
+    in parallel and in file name order.
+
+    Repeated or already registered NRCs and voter IDs make a row invalid;
+    shared phone numbers, and with `match_similar` names resembling another
+    row or member born the same day, are reported as row warnings.
+    """
+    job = ImportJobService.create_job(db, file.filename or "", file.file, principal.user_id,
+                                      default_ward_id, match_similar)
+    background_tasks.add_task(ImportJobService.run_stage, job.id)
+    return job
+
+
+@router.get("", response_model=List[ImportJobResponse])
+def get_imports(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "read"))
+):
+    """Import jobs, newest first"""
+    return ImportJobService.get_jobs(db, skip, limit)
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+def get_import(
+    job_id: int,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "read"))
+):
+    return ImportJobService.get_job(db, job_id)
+
+
+@router.get("/{job_id}/rows", response_model=ImportRowPage)
+def get_import_rows(
+    job_id: int,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(50, ge=1, le=500),
+    valid: Optional[bool] = None,
+    flagged: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "read"))
+):
+    """
+    One page of the job's parsed rows in file order
+
+    Optionally only valid or invalid ones, or only those with (or without) warnings.
+    """
+    job = ImportJobService.get_job(db, job_id)
+    total, rows = ImportJobService.get_rows(db, job.id, page, per_page, valid, flagged)
+    return {"job": job, "rows": rows, "total": total, "page": page, "per_page": per_page}
+
+
+@router.get("/{job_id}/progress", response_model=ImportProgressResponse)
+def get_import_progress(
+    job_id: int,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "read"))
+):
+    """
+    Rows parsed, validated, staged (inserted) and failed so far, with the
+    rate and, while parsing a CSV or XLSX file, an estimated time left
+    """
+    return ImportJobService.get_progress(db, job_id)
+
+
+@router.post("/{job_id}/retry", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def retry_import(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "create"))
+):
+    """
+    Parse a `failed` job's stored file again, e.g. after a restart interrupted
+    it; a job stuck `uploaded` or `parsing` for IMPORT_STALE_SECONDS can be
+    retried too. Interrupted imports go back to `staged` at startup and are
+    simply committed again.
+    """
+    job = ImportJobService.start_retry(db, job_id)
+    background_tasks.add_task(ImportJobService.run_stage, job.id)
+    return job
+
+
+@router.post("/{job_id}/commit", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def commit_import(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "create"))
+):
+    """
+    Register the job's valid rows as members in the background
+
+    The job is `importing` until it is `completed`; if the import fails it
+    returns to `staged` with `error` set.
+    """
+    job = ImportJobService.start_commit(db, job_id)
+    background_tasks.add_task(ImportJobService.run_commit, job.id)
+    return job
+
+
+@router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_import(
+    job_id: int,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(require_permission("members", "create"))
+):
+    ImportJobService.delete_job(db, job_id)
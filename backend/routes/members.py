@@ -37,6 +37,17 @@ def get_members_by_ward(ward_id: int, db: Session = Depends(get_db)):
     return MemberService.get_members_by_ward(db, ward_id)
 
 
+@router.get("/check")
+def check_member_phone(phone: str = Query(...), db: Session = Depends(get_db)):
+    """Whether a phone number belongs to a registered member (used by the USSD gateway)"""
+    registered, member = MemberService.recognise_phone(db, phone)
+    return {
+        "exists": member is not None,
+        "member_id": member.id if member else None,
+        "name": member.name if member else None
+    }
+
+
 @router.get("/nrc/{nrc}", response_model=MemberResponse)
 def get_member_by_nrc(nrc: str, db: Session = Depends(get_db)):
     """Get member by NRC"""
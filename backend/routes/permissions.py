@@ -7,6 +7,7 @@ from typing import List, Optional
 
 from backend.config.database import get_db
 from backend.models import Permission
+from backend.services.rbac_service import permission_resolver
 from backend.schemas.rbac import (
     PermissionCreate, PermissionUpdate, PermissionResponse,
     PermissionListResponse
@@ -42,6 +43,7 @@ def create_permission(permission: PermissionCreate, db: Session = Depends(get_db
 
     db.add(db_permission)
     db.commit()
+    permission_resolver.bump_version()
     db.refresh(db_permission)
 
     return db_permission
@@ -109,6 +111,7 @@ def update_permission(
         db_permission.description = permission_update.description
 
     db.commit()
+    permission_resolver.bump_version()
     db.refresh(db_permission)
 
     return db_permission
@@ -129,6 +132,7 @@ def delete_permission(permission_id: int, db: Session = Depends(get_db)):
 
     db.delete(db_permission)
     db.commit()
+    permission_resolver.bump_version()
 
     return None
 
@@ -2,7 +2,7 @@
 Referrals API Router
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, aliased, joinedload
 from sqlalchemy import func, or_, and_
 from typing import List, Optional
 from datetime import datetime
@@ -71,8 +71,12 @@ def list_referrals(
     """
     List all referrals with optional filters
     """
-    query = db.query(Referral, Member).join(
+    # The referred member's name comes in the same query rather than one query per row
+    ReferredMember = aliased(Member)
+    query = db.query(Referral, Member, ReferredMember.name).join(
         Member, Referral.referrer_id == Member.id
+    ).outerjoin(
+        ReferredMember, Referral.referred_member_id == ReferredMember.id
     )
 
     # Apply filters
@@ -98,14 +102,7 @@ def list_referrals(
 
     # Build response
     referral_list = []
-    for referral, referrer in referrals:
-        # Get referred member name if registered
-        referred_member_name = None
-        if referral.referred_member_id:
-            referred_member = db.query(Member).filter(Member.id == referral.referred_member_id).first()
-            if referred_member:
-                referred_member_name = referred_member.name
-
+    for referral, referrer, referred_member_name in referrals:
         referral_data = ReferralWithDetails(
             id=referral.id,
             referrer_id=referral.referrer_id,
@@ -7,6 +7,7 @@ from typing import List, Optional
 
 from backend.config.database import get_db
 from backend.models import Role, Permission, RolePermission
+from backend.services.rbac_service import permission_resolver
 from backend.schemas.rbac import (
     RoleCreate, RoleUpdate, RoleResponse, RoleWithPermissions,
     RoleListResponse, RolePermissionAssign
@@ -126,6 +127,7 @@ def update_role(role_id: int, role_update: RoleUpdate, db: Session = Depends(get
         db_role.description = role_update.description
 
     db.commit()
+    permission_resolver.bump_version()
     db.refresh(db_role)
 
     return db_role
@@ -153,6 +155,7 @@ def delete_role(role_id: int, db: Session = Depends(get_db)):
 
     db.delete(db_role)
     db.commit()
+    permission_resolver.bump_version()
 
     return None
 
@@ -207,6 +210,7 @@ def assign_permissions_to_role(
             db.add(role_permission)
 
     db.commit()
+    permission_resolver.bump_version()
 
     # Return updated role with permissions
     return get_role(role_id, db)
@@ -249,5 +253,6 @@ def remove_permission_from_role(
 
     db.delete(role_permission)
     db.commit()
+    permission_resolver.bump_version()
 
     return None
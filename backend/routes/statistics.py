@@ -0,0 +1,28 @@
+"""
+Statistics API routes
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from backend.config.database import get_db
+from backend.schemas.statistics import MembershipBreakdown
+from backend.services.membership_counter_service import MembershipCounterService
+
+router = APIRouter()
+
+
+@router.get("/membership", response_model=MembershipBreakdown)
+def get_membership_breakdown(
+    province_id: Optional[int] = None,
+    district_id: Optional[int] = None,
+    constituency_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Member counts by location, gender and age band
+
+    Without filters the locations are provinces; each filter drills one level
+    down (province -> districts -> constituencies -> wards).
+    """
+    return MembershipCounterService.breakdown(db, province_id, district_id, constituency_id)
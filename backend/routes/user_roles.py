@@ -7,6 +7,7 @@ from typing import List
 
 from backend.config.database import get_db
 from backend.models import UserRole, Role, RolePermission, Permission
+from backend.services.rbac_service import permission_resolver
 from backend.schemas.rbac import (
     UserRoleCreate, UserRoleResponse, UserRoleAssign,
     UserPermissionsResponse, UserRoleListResponse
@@ -51,6 +52,7 @@ def assign_role_to_user(user_role: UserRoleCreate, db: Session = Depends(get_db)
 
     db.add(db_user_role)
     db.commit()
+    permission_resolver.bump_version()
     db.refresh(db_user_role)
 
     # Load role relationship
@@ -152,6 +154,7 @@ def remove_role_from_user(user_id: int, user_type: str, role_id: int, db: Sessio
 
     db.delete(user_role)
     db.commit()
+    permission_resolver.bump_version()
 
     return None
 
@@ -8,16 +8,12 @@ from typing import List
 from backend.config.database import get_db
 from backend.models import User, Member
 from backend.schemas.user import UserCreate, UserResponse, UserUpdate
-import hashlib
+from backend.services.pin_hasher import hash_pin
+from backend.services.rbac_service import sync_account_role
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-def hash_pin(pin: str) -> str:
-    """Hash a PIN using SHA256"""
-    return hashlib.sha256(pin.encode()).hexdigest()
-
-
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
     """
@@ -33,7 +29,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
     # Check if phone already exists
     if user.phone:
-        existing_phone = db.query(User).filter(User.phone == user.phone).first()
+        existing_phone = db.query(User).filter(User.phone_matches(user.phone)).first()
         if existing_phone:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -62,6 +58,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    sync_account_role(db, db_user)
 
     return db_user
 
@@ -132,7 +129,7 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
     # Check phone uniqueness
     if 'phone' in update_data and update_data['phone']:
         existing = db.query(User).filter(
-            User.phone == update_data['phone'],
+            User.phone_matches(update_data['phone']),
             User.id != user_id
         ).first()
         if existing:
@@ -146,6 +143,8 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
 
     db.commit()
     db.refresh(db_user)
+    if 'role' in update_data:
+        sync_account_role(db, db_user)
 
     return db_user
 
@@ -0,0 +1,75 @@
+"""
+Member import job schemas
+"""
+from pydantic import BaseModel
+from datetime import datetime, date
+from typing import List, Optional
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    filename: str
+    file_format: str
+    status: str
+    default_ward_id: Optional[int] = None
+    match_similar: bool = False
+    total_rows: int
+    valid_rows: int
+    invalid_rows: int
+    imported_rows: int
+    skipped_rows: int
+    warning_rows: int = 0
+    error: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ImportProgressResponse(BaseModel):
+    id: int
+    status: str
+    expected_rows: Optional[int] = None
+    parsed_rows: int
+    validated_rows: int
+    inserted_rows: int
+    failed_rows: int
+    imported_rows: int
+    skipped_rows: int
+    elapsed_seconds: float
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ImportRowResponse(BaseModel):
+    row_number: int
+    name: Optional[str] = None
+    gender: Optional[str] = None
+    date_of_birth: Optional[date] = None
+    age: Optional[int] = None
+    nrc: Optional[str] = None
+    voters_id: Optional[str] = None
+    contact: Optional[str] = None
+    province: Optional[str] = None
+    district: Optional[str] = None
+    constituency: Optional[str] = None
+    ward: Optional[str] = None
+    ward_id: Optional[int] = None
+    is_valid: bool
+    errors: Optional[str] = None
+    warnings: Optional[str] = None
+    status: str
+
+    class Config:
+        from_attributes = True
+
+
+class ImportRowPage(BaseModel):
+    job: ImportJobResponse
+    rows: List[ImportRowResponse]
+    total: int
+    page: int
+    per_page: int
@@ -0,0 +1,20 @@
+"""
+Statistics schemas
+"""
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+
+class LocationCount(BaseModel):
+    id: int
+    name: Optional[str] = None
+    member_count: int
+
+
+class MembershipBreakdown(BaseModel):
+    level: str
+    total_members: int
+    locations: List[LocationCount]
+    gender: Dict[str, int]
+    age_bands: Dict[str, int]
+    youth_members: int
@@ -189,6 +189,24 @@ class PollResponseCreate(BaseModel):
     response_options: Optional[List[str]] = None
     response_rating: Optional[int] = None
 
+class PollBatchSubmission(BaseModel):
+    phone_number: str  # the handset the gateway collected the answers from
+    member_id: Optional[UUID] = None  # must belong to phone_number when given
+    submitted_at: Optional[datetime] = None
+    responses: List[PollResponseCreate]
+
+class PollBatchCreate(BaseModel):
+    submissions: List[PollBatchSubmission]
+
+class PollBatchRejection(BaseModel):
+    index: int
+    reason: str
+
+class PollBatchResult(BaseModel):
+    accepted: int
+    duplicates: int
+    rejected: List[PollBatchRejection]
+
 # ============== DOCUMENT SCHEMAS ==============
 class DocumentCreate(BaseModel):
     document_title: str
@@ -5,10 +5,21 @@ from .province_service import ProvinceService
 from .district_service import DistrictService
 from .ward_service import WardService
 from .member_service import MemberService
+from .rbac_service import PermissionResolver, permission_resolver
+from .membership_counter_service import MembershipCounterService
+from .import_service import ImportJobService
+from .ussd_session_service import USSDSessionLifecycle, USSDSessionReaper, ussd_session_reaper
 
 __all__ = [
     "ProvinceService",
     "DistrictService",
     "WardService",
-    "MemberService"
+    "MemberService",
+    "PermissionResolver",
+    "permission_resolver",
+    "MembershipCounterService",
+    "ImportJobService",
+    "USSDSessionLifecycle",
+    "USSDSessionReaper",
+    "ussd_session_reaper"
 ]
@@ -0,0 +1,823 @@
+"""
+Member import jobs
+
+An upload is stored once under IMPORT_STORAGE_DIR and recorded as an
+ImportJob. Its rows are then read as a stream of DataFrames, IMPORT_FRAME_SIZE
+rows at a time, mapped to member columns and validated column by column, then
+written to import_staging_rows IMPORT_CHUNK_SIZE rows per transaction, so
+memory stays flat however large the file is. Preview pages are read from
+staging, and committing a job copies its valid rows into members with a
+single INSERT ... SELECT. A zip of registration form documents is one job,
+its documents parsed by a pool of worker processes.
+"""
+import csv
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from itertools import islice, repeat
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import and_, exists, extract, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from backend.config.database import SessionLocal
+from backend.models import Constituency, District, ImportJob, ImportStagingRow, Member, Province, Ward
+from backend.services.membership_counter_service import MembershipCounterService
+from backend.utils import docx_forms
+from backend.utils.phone import DEFAULT_COUNTRY_CODE
+
+logger = logging.getLogger(__name__)
+
+IMPORT_STORAGE_DIR = os.getenv("IMPORT_STORAGE_DIR", "/tmp/member_imports")
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Rows validated together; each pandas operation has a fixed cost, so larger
+# frames are cheaper per row
+IMPORT_FRAME_SIZE = int(os.getenv("IMPORT_FRAME_SIZE", "20000"))
+# Processes parsing the documents of a zip of registration forms
+IMPORT_DOCX_WORKERS = int(os.getenv("IMPORT_DOCX_WORKERS", str(os.cpu_count() or 1)))
+# How alike two names with the same date of birth must be to be flagged (0-1)
+IMPORT_SIMILAR_NAME_RATIO = float(os.getenv("IMPORT_SIMILAR_NAME_RATIO", "0.85"))
+# A parsing job not updated for this long has lost its worker (e.g. to a restart)
+IMPORT_STALE_SECONDS = int(os.getenv("IMPORT_STALE_SECONDS", "600"))
+
+# Job status
+UPLOADED = "uploaded"
+PARSING = "parsing"
+STAGED = "staged"
+IMPORTING = "importing"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Staging row status
+ROW_STAGED = "staged"
+ROW_IMPORTED = "imported"
+ROW_SKIPPED = "skipped"
+
+# Arrow-backed strings: .str methods run over the whole column in C++
+# instead of calling back into Python once per value
+TEXT_DTYPE = "string[pyarrow]"
+
+NRC_PATTERN = re.compile(r"^\d{6}/\d{2}/\d$")
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y")
+
+# Accepted column headings per field, compared lower-case with anything but
+# letters removed ("Voter's ID" -> "votersid")
+COLUMN_ALIASES = {
+    "name": ("name", "fullname"),
+    "first_name": ("firstname", "fname"),
+    "last_name": ("lastname", "lname", "surname"),
+    "nrc": ("nrc", "nrcnumber", "nationalid"),
+    "contact": ("phone", "contact", "mobile", "phonenumber"),
+    "gender": ("gender", "sex"),
+    "age": ("age",),
+    "date_of_birth": ("dob", "dateofbirth", "birthdate"),
+    "voters_id": ("voterid", "votersid", "voterregistration", "voterregistrationnumber"),
+    "province": ("province",),
+    "district": ("district",),
+    "constituency": ("constituency",),
+    "ward": ("ward",),
+}
+_HEADINGS = {alias: field for field, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+# Registration form documents have fixed columns
+FORM_COLUMNS = dict(enumerate(docx_forms.FORM_FIELDS + docx_forms.LOCATION_FIELDS))
+
+# Identifiers checked for repeats within the file and against members:
+# staging column, label, whether a repeat makes the row invalid
+IDENTIFIERS = (("nrc", "NRC", True), ("voters_id", "Voter ID", True), ("contact_e164", "Phone number", False))
+
+# Member columns copied from staging on commit
+MEMBER_COLUMNS = ("name", "gender", "date_of_birth", "age", "nrc", "voters_id", "contact", "contact_e164", "ward_id")
+
+
+# ==================== READERS ====================
+# Each yields DataFrames of at most IMPORT_FRAME_SIZE rows, one column per
+# mapped field, indexed by row number in the file (from 1)
+
+def _column_map(headings) -> Dict[int, str]:
+    """Source column index -> field, resolved once from the header row"""
+    columns: Dict[int, str] = {}
+    for index, heading in enumerate(headings):
+        field = _HEADINGS.get(re.sub(r"[^a-z]", "", str(heading or "").lower()))
+        if field and field not in columns.values():
+            columns[index] = field
+    return columns
+
+
+def _frames(rows: Iterator, columns: Dict[int, str]) -> Iterator[pd.DataFrame]:
+    """Chunk positional source rows into frames of the mapped columns"""
+    first = 1
+    while True:
+        chunk = list(islice(rows, IMPORT_FRAME_SIZE))
+        if not chunk:
+            return
+        frame = pd.DataFrame(chunk, dtype=object).reindex(columns=list(columns)).rename(columns=columns)
+        frame.index = pd.RangeIndex(first, first + len(chunk))
+        first += len(chunk)
+        yield frame
+
+
+def read_csv(path: str) -> Iterator[pd.DataFrame]:
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        sample = source.read(4096)
+        source.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        columns = _column_map(next(csv.reader(source, dialect), []))
+    if not columns:
+        return
+
+    # The C parser reads the file in chunks; only the mapped columns are kept
+    chunks = pd.read_csv(path, sep=dialect.delimiter, quotechar=dialect.quotechar, encoding="utf-8-sig",
+                         header=None, skiprows=1, usecols=list(columns), dtype=TEXT_DTYPE, keep_default_na=False,
+                         skip_blank_lines=False, chunksize=IMPORT_FRAME_SIZE)
+    for frame in chunks:
+        frame = frame.rename(columns=columns)
+        frame.index += 1
+        yield frame
+
+
+def read_xlsx(path: str) -> Iterator[pd.DataFrame]:
+    import openpyxl
+
+    # read_only streams rows from the sheet XML instead of loading the workbook
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        yield from _frames(rows, _column_map(next(rows, ())))
+    finally:
+        workbook.close()
+
+
+def read_xls(path: str) -> Iterator[pd.DataFrame]:
+    # Legacy .xls (at most 65,536 rows) is only readable whole, through xlrd
+    frame = pd.read_excel(path, dtype=object)
+    yield from _frames(frame.itertuples(index=False, name=None), _column_map(frame.columns))
+
+
+def read_docx(path: str) -> Iterator[pd.DataFrame]:
+    """Paper registration forms: a location header, then numbered member tables"""
+    yield from _frames(iter(docx_forms.parse_form(path)), FORM_COLUMNS)
+
+
+def _archived_form_rows(path: str, names: List[str]) -> Iterator[list]:
+    """Rows of each document in turn, parsed ahead by up to IMPORT_DOCX_WORKERS processes"""
+    workers = min(IMPORT_DOCX_WORKERS, len(names))
+    # spawn keeps DB connections and threads out of the workers
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) \
+        if workers > 1 else None
+    started = time.perf_counter()
+    timings = []
+    try:
+        if pool:
+            documents = pool.map(docx_forms.parse_archived_form, repeat(path), names,
+                                 chunksize=max(1, len(names) // (workers * 4)))
+        else:
+            documents = map(docx_forms.parse_archived_form, repeat(path), names)
+        for name in names:
+            try:
+                document = next(documents)
+            except Exception as e:
+                raise ValueError(f"{name}: {e}") from e
+            timings.append((document.seconds, name))
+            logger.debug(f"[IMPORT] {name}: {len(document.rows)} rows in {document.seconds * 1000:.1f} ms")
+            yield from document.rows
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    slowest, slowest_name = max(timings)
+    logger.info(f"[IMPORT] Parsed {len(names)} documents with {workers} worker(s), {time.perf_counter() - started:.2f}s "
+                f"including staging; per document mean {sum(seconds for seconds, _ in timings) / len(timings) * 1000:.1f} ms, "
+                f"slowest {slowest_name} {slowest * 1000:.1f} ms")
+
+
+def read_zip(path: str) -> Iterator[pd.DataFrame]:
+    """A batch of registration form documents, parsed in parallel and staged in name order"""
+    names = docx_forms.archived_forms(path)
+    if not names:
+        raise ValueError("the archive contains no .docx documents")
+    yield from _frames(_archived_form_rows(path, names), FORM_COLUMNS)
+
+
+READERS = {"csv": read_csv, "xlsx": read_xlsx, "xls": read_xls, "docx": read_docx, "zip": read_zip}
+
+
+# Row counts known before parsing, for progress estimates; only where cheap
+
+def count_csv_rows(path: str) -> int:
+    """Lines after the header (quoted line breaks count twice)"""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return max(lines + (last != b"\n") - 1, 0)
+
+
+def count_xlsx_rows(path: str) -> Optional[int]:
+    """Rows after the header, from the sheet's recorded dimensions"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        rows = workbook.active.max_row
+    finally:
+        workbook.close()
+    return max(rows - 1, 0) if rows else None
+
+
+ROW_COUNTERS = {"csv": count_csv_rows, "xlsx": count_xlsx_rows}
+
+
+# ==================== VALIDATION ====================
+
+def _key(name: Optional[str]) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def _text(column: pd.Series) -> pd.Series:
+    """A column as stripped strings, "" where the file has no value"""
+    typed = pd.api.types.infer_dtype(column, skipna=True) != "string"
+    if typed:
+        column = column.where(column.notna(), "").astype(str)
+    text = column.astype(TEXT_DTYPE).fillna("").str.strip()
+    if typed:
+        # Spreadsheet numbers arrive as floats: 977123456.0
+        text = text.str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+    return text
+
+
+def normalise_phones(phones: pd.Series) -> pd.Series:
+    """Zambian numbers in local 0XXXXXXXXX form, missing where not one"""
+    digits = phones.str.replace(r"\D", "", regex=True)
+    # 0XXXXXXXXX, 260XXXXXXXXX, or XXXXXXXXX with the zero dropped by a spreadsheet
+    national = digits.str[-9:].where(digits.str.fullmatch(r"(?:0|260)?\d{9}"))
+    return "0" + national
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Dates in any of DATE_FORMATS, or typed spreadsheet cells; NaT where unparseable"""
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS + ("%Y-%m-%d %H:%M:%S",):
+        parsed = parsed.fillna(pd.to_datetime(values, format=fmt, errors="coerce"))
+    return parsed
+
+
+class _WardLookup:
+    """Ward names -> ids, loaded once per job and narrowed by the parent names given"""
+
+    def __init__(self, db: Session):
+        self.by_name: Dict[str, List[Tuple]] = {}
+        for ward_id, ward, constituency, district, province in db.query(
+            Ward.id, Ward.name, Constituency.name, District.name, Province.name
+        ).join(Constituency, Constituency.id == Ward.constituency_id).join(
+            District, District.id == Constituency.district_id
+        ).join(Province, Province.id == District.province_id):
+            self.by_name.setdefault(_key(ward), []).append(
+                (ward_id, _key(constituency), _key(district), _key(province))
+            )
+
+    def resolve(self, ward: str, constituency: Optional[str], district: Optional[str],
+                province: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+        candidates = self.by_name.get(_key(ward), [])
+        for position, name in ((1, constituency), (2, district), (3, province)):
+            if len(candidates) > 1 and name:
+                candidates = [c for c in candidates if c[position] == _key(name)]
+        if len(candidates) == 1:
+            return candidates[0][0], None
+        if not candidates:
+            return None, f"Unknown ward '{ward}'"
+        return None, f"Ward '{ward}' is ambiguous; add its constituency"
+
+    def resolve_frame(self, locations: pd.DataFrame, default_ward_id: Optional[int]) -> pd.DataFrame:
+        """ward_id and ward_error per row, resolving each distinct location once"""
+        resolved = pd.DataFrame({"ward_id": default_ward_id, "ward_error": None}, index=locations.index)
+        named = locations[locations["ward"] != ""]
+        if named.empty:
+            return resolved
+        distinct = named.drop_duplicates()
+        lookup = pd.DataFrame(
+            [self.resolve(*location) for location in distinct.itertuples(index=False, name=None)],
+            columns=["ward_id", "ward_error"], index=pd.MultiIndex.from_frame(distinct)
+        )
+        matched = lookup.reindex(pd.MultiIndex.from_frame(named))
+        resolved.loc[named.index, "ward_id"] = matched["ward_id"].to_numpy()
+        resolved.loc[named.index, "ward_error"] = matched["ward_error"].to_numpy()
+        return resolved
+
+
+def validate_frame(frame: pd.DataFrame, wards: _WardLookup,
+                   default_ward_id: Optional[int]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Map a chunk of source rows to staging columns
+
+    Returns the mapped rows and, alongside them, one column per check
+    holding its error message where the row fails it and None elsewhere.
+    Blank source rows are dropped from both. Every check is a whole-column
+    string operation; only the distinct ward names of the chunk are looked
+    up one by one.
+    """
+    text = {field: _text(frame[field]) for field in COLUMN_ALIASES if field in frame}
+    present = np.zeros(len(frame), dtype=bool)
+    for values in text.values():
+        present |= (values != "").to_numpy()
+    frame = frame[present]
+    empty = pd.Series("", index=frame.index, dtype=TEXT_DTYPE)
+    text = {field: text[field][present] if field in text else empty for field in COLUMN_ALIASES}
+    given = {field: (values != "").to_numpy(dtype=bool) for field, values in text.items()}
+
+    full_name = (text["first_name"] + " " + text["last_name"]).str.strip()
+    name = text["name"].where(given["name"], full_name)
+
+    gender = text["gender"].str.upper().map({"M": "Male", "MALE": "Male", "F": "Female", "FEMALE": "Female"})
+    contact = normalise_phones(text["contact"])
+
+    age = pd.to_numeric(text["age"], errors="coerce")
+    age = pd.Series(age.to_numpy(dtype=float, na_value=np.nan), index=frame.index)
+    bad_age = given["age"] & ~age.between(18, 120)
+    age = np.trunc(age).where(~bad_age).astype("Int64")
+
+    if "date_of_birth" in frame:
+        date_of_birth = parse_dates(text["date_of_birth"])
+    else:
+        date_of_birth = pd.Series(pd.NaT, index=frame.index, dtype="datetime64[ns]")
+
+    locations = pd.DataFrame({field: text[field] for field in ("ward", "constituency", "district", "province")})
+    wards_found = wards.resolve_frame(locations, default_ward_id)
+
+    checks = {
+        "Missing name": (name == "").to_numpy(dtype=bool),
+        "Missing NRC": ~given["nrc"],
+        "Invalid NRC format": given["nrc"] & ~text["nrc"].str.fullmatch(NRC_PATTERN.pattern).to_numpy(dtype=bool),
+        "Missing voter ID": ~given["voters_id"],
+        "Missing gender": ~given["gender"],
+        "Invalid gender": given["gender"] & gender.isna(),
+        "Invalid phone number": given["contact"] & contact.isna().to_numpy(),
+        "Invalid age": bad_age,
+        "Invalid date of birth": given["date_of_birth"] & date_of_birth.isna(),
+    }
+    errors = pd.DataFrame({message: np.where(mask, message, None) for message, mask in checks.items()},
+                          index=frame.index)
+    errors["ward"] = wards_found["ward_error"].where(given["ward"] | wards_found["ward_id"].notna(), "Missing ward")
+
+    def optional(values):
+        return values.where(values != "", None)
+
+    rows = pd.DataFrame({
+        "name": optional(name),
+        "gender": gender,
+        # .dt.date of an all-NaT column stays datetime64, so build it as objects
+        "date_of_birth": pd.Series(np.where(date_of_birth.notna(), date_of_birth.dt.date, None),
+                                   index=frame.index, dtype=object),
+        "age": age,
+        "nrc": optional(text["nrc"]),
+        "voters_id": optional(text["voters_id"]),
+        "contact": contact,
+        "contact_e164": "+" + DEFAULT_COUNTRY_CODE + contact.str[1:],
+        "province": optional(text["province"]),
+        "district": optional(text["district"]),
+        "constituency": optional(text["constituency"]),
+        "ward": optional(text["ward"]),
+        "ward_id": wards_found["ward_id"].astype("Int64"),
+    })
+    return rows, errors
+
+
+# ==================== DUPLICATES ====================
+
+def _name_key(name: str) -> str:
+    """Name words lower-cased and sorted, so 'Banda John' matches 'John Banda'"""
+    return " ".join(sorted(name.lower().split()))
+
+
+def _similar(a: str, b: str) -> bool:
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.quick_ratio() >= IMPORT_SIMILAR_NAME_RATIO and matcher.ratio() >= IMPORT_SIMILAR_NAME_RATIO
+
+
+class _DuplicateIndex:
+    """
+    Identifiers seen so far in a job's file, and those already registered
+
+    Repeats within the file are found by hashing each value to the first row
+    that had it. Registered values are fetched with one batched IN query per
+    IMPORT_CHUNK_SIZE distinct values of a frame. With match_similar, rows
+    are also compared by name against rows and members born the same day;
+    the date of birth is the blocking key, so only those few are compared.
+    """
+
+    def __init__(self, db: Session, match_similar: bool = False):
+        self.db = db
+        self.match_similar = match_similar
+        self.first_row: Dict[str, Dict[str, int]] = {column: {} for column, _, _ in IDENTIFIERS}
+        self.born: Dict = {}  # date of birth -> [(row number, name key)]
+
+    def _registered(self, rows: pd.DataFrame) -> Dict[str, set]:
+        distinct = {column: rows[column].dropna().unique().tolist() for column, _, _ in IDENTIFIERS}
+        registered = {column: set() for column in distinct}
+        longest = max(len(values) for values in distinct.values())
+        for start in range(0, longest, IMPORT_CHUNK_SIZE):
+            batch = [getattr(Member, column).in_(values[start:start + IMPORT_CHUNK_SIZE])
+                     for column, values in distinct.items() if values[start:start + IMPORT_CHUNK_SIZE]]
+            for member in self.db.query(*[getattr(Member, column) for column in distinct]).filter(or_(*batch)):
+                for column, value in zip(distinct, member):
+                    registered[column].add(value)
+        return registered
+
+    def _repeats(self, column: str, values: pd.Series) -> pd.Series:
+        """Row number of the first row with the same value, for rows that are not it"""
+        seen = self.first_row[column]
+        earlier = pd.Series([seen.get(value) for value in values], index=values.index, dtype=float)
+        first_here = pd.Series(values.index, index=values.index).groupby(values.to_numpy()).transform("min")
+        first = earlier.fillna(first_here).astype(int)
+        new = first == values.index
+        seen.update(zip(values[new], values.index[new]))
+        return first[~new]
+
+    def _similar_rows(self, rows: pd.DataFrame) -> pd.Series:
+        """Message per row resembling an earlier row or a member with the same date of birth"""
+        candidates = rows[rows["date_of_birth"].notna() & rows["name"].notna()]
+        members: Dict = {}
+        dates = candidates["date_of_birth"].unique().tolist()
+        for start in range(0, len(dates), IMPORT_CHUNK_SIZE):
+            for name, born in self.db.query(Member.name, Member.date_of_birth).filter(
+                Member.date_of_birth.in_(dates[start:start + IMPORT_CHUNK_SIZE])
+            ):
+                members.setdefault(born, []).append((name, _name_key(name)))
+
+        messages = {}
+        for row_number, name, born in zip(candidates.index, candidates["name"], candidates["date_of_birth"]):
+            key = _name_key(name)
+            match = next((f"Similar to registered member '{other}'"
+                          for other, other_key in members.get(born, ()) if _similar(key, other_key)), None)
+            match = match or next((f"Similar to row {other}"
+                                   for other, other_key in self.born.get(born, ()) if _similar(key, other_key)), None)
+            if match:
+                messages[row_number] = match
+            self.born.setdefault(born, []).append((row_number, key))
+        return pd.Series(messages, index=rows.index, dtype=object)
+
+    def check(self, rows: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Blocking and non-blocking duplicate messages per row, None where clear"""
+        registered = self._registered(rows)
+        errors, warnings = {}, {}
+        for column, label, blocking in IDENTIFIERS:
+            values = rows[column].dropna()
+            messages = pd.Series(None, index=rows.index, dtype=object)
+            repeats = self._repeats(column, values)
+            messages[repeats.index] = f"{label} repeats row " + repeats.astype(str)
+            known = values[values.isin(registered[column])]
+            messages[known.index] = f"{label} already registered"
+            (errors if blocking else warnings)[column] = messages
+        if self.match_similar:
+            warnings["similar"] = self._similar_rows(rows)
+        return pd.DataFrame(errors, index=rows.index), pd.DataFrame(warnings, index=rows.index)
+
+
+def _join(messages: pd.DataFrame) -> pd.Series:
+    """"; "-joined messages per row in column order, missing where a row has none"""
+    flagged = messages[messages.notna().any(axis=1)]
+    joined = pd.Series("", index=flagged.index, dtype=object)
+    for column in flagged:
+        joined += (flagged[column] + "; ").fillna("")
+    return joined.str[:-2].reindex(messages.index)
+
+
+def stage_frame(frame: pd.DataFrame, wards: _WardLookup, duplicates: _DuplicateIndex,
+                default_ward_id: Optional[int]) -> List[Dict]:
+    """Staging row dicts for a chunk, blank source rows dropped"""
+    rows, errors = validate_frame(frame, wards, default_ward_id)
+    if rows.empty:
+        return []
+    # Malformed NRCs are already reported; don't also match them up
+    repeated, warnings = duplicates.check(rows.assign(nrc=rows["nrc"].where(errors["Invalid NRC format"].isna())))
+    errors = errors.join(repeated)
+
+    rows["row_number"] = rows.index
+    rows["is_valid"] = errors.isna().all(axis=1)
+    rows["errors"] = _join(errors)
+    rows["warnings"] = _join(warnings)
+    rows["status"] = ROW_STAGED
+
+    # Column by column: DataFrame.to_dict boxes every cell separately
+    names = list(rows.columns)
+    columns = [rows[name].to_numpy(dtype=object, na_value=None).tolist() for name in names]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+# ==================== JOBS ====================
+
+def _seconds_between(start: datetime, end: datetime) -> float:
+    """Seconds from start to end; stored times may come back timezone-aware (UTC) or naive"""
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    return max((end - start).total_seconds(), 0.0)
+
+
+def _stale(job: ImportJob) -> bool:
+    """Whether the job has gone IMPORT_STALE_SECONDS without an update"""
+    last = job.updated_at or job.started_at or job.created_at
+    return last is None or _seconds_between(last, datetime.utcnow()) > IMPORT_STALE_SECONDS
+
+
+class ImportJobService:
+    @staticmethod
+    def create_job(db: Session, filename: str, stream: BinaryIO, created_by: Optional[int] = None,
+                   default_ward_id: Optional[int] = None, match_similar: bool = False) -> ImportJob:
+        """Record a job and store its file; parsing happens in stage()"""
+        file_format = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        if file_format not in READERS:
+            raise HTTPException(status_code=400, detail="Unsupported file type. Allowed types: CSV, Excel, DOCX, ZIP of DOCX forms")
+
+        job = ImportJob(filename=filename, file_path="", file_format=file_format, status=UPLOADED,
+                        created_by=created_by, default_ward_id=default_ward_id, match_similar=match_similar)
+        db.add(job)
+        db.flush()
+
+        os.makedirs(IMPORT_STORAGE_DIR, exist_ok=True)
+        job.file_path = os.path.join(IMPORT_STORAGE_DIR, f"{job.id}.{file_format}")
+        with open(job.file_path, "wb") as target:
+            shutil.copyfileobj(stream, target)
+
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> ImportJob:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Import job {job_id} not found")
+        return job
+
+    @staticmethod
+    def get_jobs(db: Session, skip: int = 0, limit: int = 50) -> List[ImportJob]:
+        return db.query(ImportJob).order_by(ImportJob.id.desc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def stage(db: Session, job_id: int) -> ImportJob:
+        """
+        Parse the job's file into import_staging_rows
+
+        Rows are validated a frame at a time and written IMPORT_CHUNK_SIZE at
+        a time, one transaction per chunk, so the job's counts show progress
+        while it runs.
+        """
+        job = ImportJobService.get_job(db, job_id)
+        job.status = PARSING
+        job.total_rows = job.valid_rows = job.warning_rows = job.parsed_rows = job.validated_rows = 0
+        job.expected_rows = None
+        job.error = None
+        job.started_at = datetime.utcnow()
+        job.staged_at = None
+        db.query(ImportStagingRow).filter(ImportStagingRow.job_id == job.id).delete(synchronize_session=False)
+        db.commit()
+
+        try:
+            if job.file_format in ROW_COUNTERS:
+                job.expected_rows = ROW_COUNTERS[job.file_format](job.file_path)
+            wards = _WardLookup(db)
+            duplicates = _DuplicateIndex(db, job.match_similar)
+            for frame in READERS[job.file_format](job.file_path):
+                job.parsed_rows += len(frame)
+                db.commit()
+                rows = stage_frame(frame, wards, duplicates, job.default_ward_id)
+                job.validated_rows += len(rows)
+                for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+                    chunk = rows[start:start + IMPORT_CHUNK_SIZE]
+                    for row in chunk:
+                        row["job_id"] = job.id
+                    db.execute(insert(ImportStagingRow), chunk)
+                    job.total_rows += len(chunk)
+                    job.valid_rows += sum(row["is_valid"] for row in chunk)
+                    job.warning_rows += sum(row["is_valid"] and row["warnings"] is not None for row in chunk)
+                    db.commit()
+            job.status = STAGED
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[IMPORT] Parsing job {job.id} ({job.filename}) failed: {e}")
+            job.status = FAILED
+            job.error = f"Could not read file: {e}"
+        job.staged_at = datetime.utcnow()
+        db.commit()
+        return job
+
+    @staticmethod
+    def run_stage(job_id: int) -> None:
+        """stage() with its own session, for running after the upload response"""
+        db = SessionLocal()
+        try:
+            ImportJobService.stage(db, job_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def start_retry(db: Session, job_id: int) -> ImportJob:
+        """
+        Queue a failed job, or one whose parsing stalled, to be parsed again;
+        stage() then runs in the background
+        """
+        job = ImportJobService.get_job(db, job_id)
+        if job.status != FAILED and not (job.status in (UPLOADED, PARSING) and _stale(job)):
+            raise HTTPException(status_code=409, detail=f"Import job {job.id} is {job.status}, nothing to retry")
+        if not os.path.exists(job.file_path):
+            raise HTTPException(status_code=409, detail=f"The file of import job {job.id} is no longer stored; upload it again")
+        job.status = UPLOADED
+        job.error = None
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def recover_interrupted(db: Session) -> int:
+        """
+        Release jobs whose background task died with its process, at startup
+
+        An import runs in one transaction holding its job's row lock, so a job
+        left importing without the lock was rolled back and goes back to
+        staged, to be committed again. A job left uploaded or parsing that has
+        stopped updating is marked failed, to be retried. Returns how many jobs were released.
+        """
+        released = 0
+        # SKIP LOCKED passes over imports still running in other workers
+        for job in db.query(ImportJob).filter(ImportJob.status == IMPORTING).with_for_update(skip_locked=True):
+            job.status = STAGED
+            job.error = "Import was interrupted by a restart; nothing was imported, commit it again"
+            released += 1
+        for job in db.query(ImportJob).filter(
+            ImportJob.status.in_((UPLOADED, PARSING))
+        ).with_for_update(skip_locked=True):
+            if _stale(job):
+                job.status = FAILED
+                job.error = "Parsing was interrupted by a restart; retry the job"
+                job.staged_at = datetime.utcnow()
+                released += 1
+        db.commit()
+        if released:
+            logger.warning(f"[IMPORT] Released {released} import jobs interrupted by a restart")
+        return released
+
+    @staticmethod
+    def get_rows(db: Session, job_id: int, page: int = 1, per_page: int = 50,
+                 valid: Optional[bool] = None, flagged: Optional[bool] = None) -> Tuple[int, List[ImportStagingRow]]:
+        """One page of a job's staged rows in file order, with the matching total"""
+        query = db.query(ImportStagingRow).filter(ImportStagingRow.job_id == job_id)
+        if valid is not None:
+            query = query.filter(ImportStagingRow.is_valid == valid)
+        if flagged is not None:
+            query = query.filter(ImportStagingRow.warnings.isnot(None) if flagged else ImportStagingRow.warnings.is_(None))
+        total = query.count()
+        rows = query.order_by(ImportStagingRow.row_number).offset((page - 1) * per_page).limit(per_page).all()
+        return total, rows
+
+    @staticmethod
+    def get_progress(db: Session, job_id: int) -> dict:
+        """
+        Where a job has got to, for polling while it parses or imports
+
+        Rows per second count staged rows over the time since parsing began,
+        up to now while the job runs and to its end once it has finished.
+        The ETA is only given while parsing a file whose size was estimated.
+        Importing is a single transaction with no progress of its own: the
+        row counts stay those of staging, and imported and skipped rows are
+        set when it completes.
+        """
+        job = ImportJobService.get_job(db, job_id)
+        if job.status == COMPLETED:
+            ended = job.completed_at
+        elif job.status in (STAGED, FAILED):
+            ended = job.staged_at
+        else:
+            ended = None
+        elapsed = _seconds_between(job.started_at, ended or datetime.utcnow()) if job.started_at else 0.0
+        rate = job.total_rows / elapsed if elapsed > 0 else None
+
+        eta = None
+        if job.status == PARSING and job.expected_rows is not None and rate:
+            eta = max(job.expected_rows - job.total_rows, 0) / rate
+
+        return {
+            "id": job.id,
+            "status": job.status,
+            "expected_rows": job.expected_rows,
+            "parsed_rows": job.parsed_rows,
+            "validated_rows": job.validated_rows,
+            "inserted_rows": job.total_rows,
+            "failed_rows": job.invalid_rows,
+            "imported_rows": job.imported_rows,
+            "skipped_rows": job.skipped_rows,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(rate, 1) if rate else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": job.error,
+        }
+
+    @staticmethod
+    def start_commit(db: Session, job_id: int) -> ImportJob:
+        """Mark a staged job as importing; commit() then runs in the background"""
+        job = ImportJobService.get_job(db, job_id)
+        if job.status != STAGED:
+            raise HTTPException(status_code=409, detail=f"Import job {job.id} is {job.status}, not ready to import")
+        job.status = IMPORTING
+        job.error = None
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def run_commit(job_id: int) -> None:
+        """commit() with its own session, for running after the commit response"""
+        db = SessionLocal()
+        try:
+            ImportJobService.commit(db, job_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def commit(db: Session, job_id: int) -> ImportJob:
+        """
+        Copy the job's valid rows into members in one transaction
+
+        Staging already marks repeated and registered NRCs and voter IDs
+        invalid, so valid rows never repeat each other. Rows whose NRC or
+        voter ID has been registered since are marked skipped first so the
+        INSERT ... SELECT cannot hit the unique voter ID constraint. If the
+        import fails the job goes back to staged, with the error recorded.
+        """
+        # Held until the import commits or rolls back, telling recover_interrupted() it is running
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).with_for_update().first()
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Import job {job_id} not found")
+        if job.status not in (STAGED, IMPORTING):
+            raise HTTPException(status_code=409, detail=f"Import job {job.id} is {job.status}, not ready to import")
+
+        staged = ImportStagingRow
+        pending = and_(staged.job_id == job.id, staged.is_valid == True, staged.status == ROW_STAGED)
+
+        try:
+            registered = db.execute(update(staged).where(
+                pending,
+                or_(exists().where(Member.voters_id == staged.voters_id), exists().where(Member.nrc == staged.nrc))
+            ).values(status=ROW_SKIPPED, errors="Already registered")).rowcount
+
+            imported = db.execute(insert(Member).from_select(
+                MEMBER_COLUMNS,
+                select(*[getattr(staged, column) for column in MEMBER_COLUMNS]).where(pending).order_by(staged.row_number)
+            )).rowcount
+
+            # The bulk insert bypasses the member mapper events
+            MembershipCounterService.add_grouped(db, db.query(
+                staged.ward_id, staged.gender, extract("year", staged.date_of_birth), staged.age, func.count()
+            ).filter(pending).group_by(
+                staged.ward_id, staged.gender, extract("year", staged.date_of_birth), staged.age
+            ).all())
+
+            db.execute(update(staged).where(pending).values(status=ROW_IMPORTED))
+
+            job.imported_rows = imported
+            job.skipped_rows = registered
+            job.status = COMPLETED
+            job.completed_at = datetime.utcnow()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[IMPORT] Committing job {job.id} failed: {e}")
+            job.status = STAGED
+            job.error = f"Import failed: {e}"
+            db.commit()
+            db.refresh(job)
+            return job
+
+        if os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        logger.info(f"[IMPORT] Job {job.id} ({job.filename}): {imported} members imported, "
+                    f"{job.skipped_rows} skipped, {job.invalid_rows} invalid")
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def delete_job(db: Session, job_id: int) -> None:
+        """Discard a job, its staged rows and its stored file"""
+        job = ImportJobService.get_job(db, job_id)
+        if job.status in (PARSING, IMPORTING):
+            raise HTTPException(status_code=409, detail=f"Import job {job.id} is {job.status}, wait until it finishes")
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        db.query(ImportStagingRow).filter(ImportStagingRow.job_id == job.id).delete(synchronize_session=False)
+        db.delete(job)
+        db.commit()
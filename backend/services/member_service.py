@@ -1,11 +1,14 @@
 """
 Member service layer
 """
+from sqlalchemy import literal, select, union_all
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from backend.models.member import Member
+from backend.models.user import User
 from backend.schemas.member import MemberCreate, MemberUpdate
+from backend.utils.phone import to_e164
 from fastapi import HTTPException
 
 
@@ -60,6 +63,36 @@ class MemberService:
         """Get member by Voter's ID"""
         return db.query(Member).filter(Member.voters_id == voters_id).first()
 
+    @staticmethod
+    def recognise_phone(db: Session, phone_number: str) -> Tuple[bool, Optional[Member]]:
+        """
+        Look a caller up by phone across members and user accounts
+
+        Returns (registered, member). A member whose contact matches wins;
+        otherwise a user account with that phone counts as registered and
+        its linked member, if any, is returned. Both sides are probes on the
+        canonical E.164 columns, combined into one query.
+        """
+        e164 = to_e164(phone_number)
+        if e164 is None:
+            return False, None
+
+        hit = db.execute(MemberService.phone_lookup(e164)).first()
+        if hit is None:
+            return False, None
+        return True, hit[1]
+
+    @staticmethod
+    def phone_lookup(e164: str):
+        """Statement yielding (source, member) for a canonical number, member contacts first"""
+        hits = union_all(
+            select(Member.id.label("member_id"), literal(0).label("source")).where(Member.contact_e164 == e164),
+            select(User.member_id, literal(1)).where(User.phone_e164 == e164)
+        ).subquery()
+        return select(hits.c.source, Member).select_from(hits).outerjoin(
+            Member, Member.id == hits.c.member_id
+        ).order_by(hits.c.source, hits.c.member_id).limit(1)
+
     @staticmethod
     def search_members(db: Session, name: str) -> List[Member]:
         """Search members by name"""
@@ -0,0 +1,311 @@
+"""
+Membership counter service
+
+Keeps membership_counters in step with the members table through mapper
+events, so every insert, update or delete adjusts the matching counter row
+in the same transaction. Dashboards and analytics read the counters instead
+of counting members.
+"""
+import threading
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, extract, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.models.constituency import Constituency
+from backend.models.district import District
+from backend.models.member import Member
+from backend.models.membership_counter import MembershipCounter
+from backend.models.province import Province
+from backend.models.ward import Ward
+
+UNKNOWN_BIRTH_YEAR = 0
+
+# (label, min age, max age)
+AGE_BANDS = (
+    ("18-24", 18, 24),
+    ("25-35", 25, 35),
+    ("36-50", 36, 50),
+    ("51+", 51, None),
+)
+YOUTH_MAX_AGE = 35
+
+# Drill-down: the counter column grouped at each level and its label table
+LEVELS = (
+    ("province", MembershipCounter.province_id, Province),
+    ("district", MembershipCounter.district_id, District),
+    ("constituency", MembershipCounter.constituency_id, Constituency),
+    ("ward", MembershipCounter.ward_id, Ward),
+)
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class _WardPaths:
+    """ward_id -> (province_id, district_id, constituency_id), cached per process"""
+
+    def __init__(self):
+        self._paths: Dict[int, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, connection, ward_id: int) -> Optional[Tuple[int, int, int]]:
+        path = self._paths.get(ward_id)
+        if path is None:
+            row = connection.execute(
+                select(District.province_id, Constituency.district_id, Ward.constituency_id)
+                .select_from(Ward)
+                .join(Constituency, Constituency.id == Ward.constituency_id)
+                .join(District, District.id == Constituency.district_id)
+                .where(Ward.id == ward_id)
+            ).first()
+            if row is None:
+                return None
+            path = tuple(row)
+            with self._lock:
+                self._paths[ward_id] = path
+        return path
+
+    def clear(self) -> None:
+        with self._lock:
+            self._paths.clear()
+
+
+_ward_paths = _WardPaths()
+
+
+def _birth_year(date_of_birth, age) -> int:
+    if date_of_birth:
+        return date_of_birth.year
+    if age:
+        return date.today().year - age
+    return UNKNOWN_BIRTH_YEAR
+
+
+def _counter_key(connection, ward_id, gender, birth_year) -> Optional[dict]:
+    path = _ward_paths.get(connection, ward_id) if ward_id else None
+    if path is None:
+        return None
+    province_id, district_id, constituency_id = path
+    return {
+        "province_id": province_id,
+        "district_id": district_id,
+        "constituency_id": constituency_id,
+        "ward_id": ward_id,
+        "gender": gender,
+        "birth_year": birth_year
+    }
+
+
+def _adjust(connection, key: Optional[dict], delta: int) -> None:
+    if key is None:
+        return
+    insert = _INSERTS.get(connection.dialect.name)
+    if insert is None:
+        # No upsert support: fall back to update-or-insert
+        updated = connection.execute(
+            MembershipCounter.__table__.update()
+            .where(*[getattr(MembershipCounter, k) == v for k, v in key.items()])
+            .values(member_count=MembershipCounter.member_count + delta)
+        )
+        if not updated.rowcount:
+            connection.execute(MembershipCounter.__table__.insert().values(member_count=delta, **key))
+        return
+
+    stmt = insert(MembershipCounter.__table__).values(member_count=delta, **key)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={"member_count": MembershipCounter.__table__.c.member_count + delta}
+    ))
+
+
+def _adjust_many(connection, totals: Dict[tuple, int]) -> None:
+    """_adjust() for many counter keys, as one executemany upsert where supported"""
+    insert = _INSERTS.get(connection.dialect.name)
+    if insert is None or not totals:
+        for key, count in totals.items():
+            _adjust(connection, dict(key), count)
+        return
+
+    table = MembershipCounter.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[name for name, _ in next(iter(totals))],
+        set_={"member_count": table.c.member_count + stmt.excluded.member_count}
+    )
+    connection.execute(stmt, [dict(key, member_count=count) for key, count in totals.items()])
+
+
+def _member_key(connection, ward_id, gender, date_of_birth, age) -> Optional[dict]:
+    return _counter_key(connection, ward_id, gender, _birth_year(date_of_birth, age))
+
+
+def _previous(target, name):
+    """Value of an attribute before the pending flush"""
+    history = inspect(target).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(target, name)
+
+
+@event.listens_for(Member, "after_insert")
+def _member_inserted(mapper, connection, target):
+    _adjust(connection, _member_key(connection, target.ward_id, target.gender, target.date_of_birth, target.age), 1)
+
+
+@event.listens_for(Member, "after_update")
+def _member_updated(mapper, connection, target):
+    fields = ("ward_id", "gender", "date_of_birth", "age")
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in fields):
+        return
+    old = _member_key(connection, *(_previous(target, name) for name in fields))
+    new = _member_key(connection, target.ward_id, target.gender, target.date_of_birth, target.age)
+    if old != new:
+        _adjust(connection, old, -1)
+        _adjust(connection, new, 1)
+
+
+@event.listens_for(Member, "after_delete")
+def _member_deleted(mapper, connection, target):
+    _adjust(connection, _member_key(connection, target.ward_id, target.gender, target.date_of_birth, target.age), -1)
+
+
+@event.listens_for(Ward, "after_update")
+@event.listens_for(Constituency, "after_update")
+@event.listens_for(District, "after_update")
+def _location_moved(mapper, connection, target):
+    # A ward re-parented under another constituency/district changes its path;
+    # existing counters need MembershipCounterService.rebuild()
+    _ward_paths.clear()
+
+
+def _group_totals(connection, rows) -> Dict[tuple, int]:
+    """Sum (ward_id, gender, birth year, age, count) groups per counter key"""
+    current_year = date.today().year
+    totals: Dict[tuple, int] = {}
+    for ward_id, gender, year, age, count in rows:
+        if year:
+            birth_year = int(year)
+        else:
+            birth_year = current_year - age if age else UNKNOWN_BIRTH_YEAR
+        key = _counter_key(connection, ward_id, gender, birth_year)
+        if key is not None:
+            key = tuple(key.items())
+            totals[key] = totals.get(key, 0) + count
+    return totals
+
+
+class MembershipCounterService:
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recompute all counters from the members table; returns the member total"""
+        _ward_paths.clear()
+        db.query(MembershipCounter).delete(synchronize_session=False)
+
+        year_of_birth = extract("year", Member.date_of_birth)
+        rows = db.query(
+            Member.ward_id, Member.gender, year_of_birth, Member.age, func.count(Member.id)
+        ).group_by(Member.ward_id, Member.gender, year_of_birth, Member.age).all()
+
+        totals = _group_totals(db.connection(), rows)
+        db.bulk_insert_mappings(MembershipCounter, [
+            dict(key, member_count=count) for key, count in totals.items()
+        ])
+        db.commit()
+        return sum(totals.values())
+
+    @staticmethod
+    def add_grouped(db: Session, rows) -> int:
+        """
+        Count members inserted in bulk, bypassing the mapper events
+
+        `rows` are (ward_id, gender, birth year or None, age, count) groups of
+        the new members. Adjusts the counters in the caller's transaction and
+        returns the number of members counted.
+        """
+        connection = db.connection()
+        totals = _group_totals(connection, rows)
+        _adjust_many(connection, totals)
+        return sum(totals.values())
+
+    @staticmethod
+    def ensure_built(db: Session) -> None:
+        """Build the counters on first start against an existing members table"""
+        if db.query(MembershipCounter).first() is None and db.query(Member.id).first() is not None:
+            MembershipCounterService.rebuild(db)
+
+    @staticmethod
+    def breakdown(
+        db: Session,
+        province_id: Optional[int] = None,
+        district_id: Optional[int] = None,
+        constituency_id: Optional[int] = None
+    ) -> dict:
+        """
+        Member counts under a location, broken down by the next level down,
+        gender and age band. Each filter narrows a prefix of the counters'
+        primary key, so the read is one index range scan.
+        """
+        filters = []
+        depth = 0
+        for column, value in (
+            (MembershipCounter.province_id, province_id),
+            (MembershipCounter.district_id, district_id),
+            (MembershipCounter.constituency_id, constituency_id),
+        ):
+            if value is None:
+                break
+            filters.append(column == value)
+            depth += 1
+
+        level, column, model = LEVELS[depth]
+        rows = db.query(
+            column, MembershipCounter.gender, MembershipCounter.birth_year, func.sum(MembershipCounter.member_count)
+        ).filter(*filters).group_by(column, MembershipCounter.gender, MembershipCounter.birth_year).all()
+
+        current_year = date.today().year
+        total = 0
+        by_location: Dict[int, int] = {}
+        by_gender: Dict[str, int] = {}
+        by_age = {label: 0 for label, _, _ in AGE_BANDS}
+        by_age["under 18"] = 0
+        by_age["unknown"] = 0
+        youth = 0
+        for location_id, gender, birth_year, count in rows:
+            count = int(count)
+            total += count
+            by_location[location_id] = by_location.get(location_id, 0) + count
+            by_gender[gender] = by_gender.get(gender, 0) + count
+            if birth_year == UNKNOWN_BIRTH_YEAR:
+                by_age["unknown"] += count
+                continue
+            age = current_year - birth_year
+            if age <= YOUTH_MAX_AGE:
+                youth += count
+            for label, low, high in AGE_BANDS:
+                if age >= low and (high is None or age <= high):
+                    by_age[label] += count
+                    break
+            else:
+                by_age["under 18"] += count
+
+        names = dict(db.query(model.id, model.name).filter(model.id.in_(by_location)).all()) if by_location else {}
+        locations = sorted(
+            ({"id": location_id, "name": names.get(location_id), "member_count": count}
+             for location_id, count in by_location.items()),
+            key=lambda item: item["member_count"],
+            reverse=True
+        )
+
+        return {
+            "level": level,
+            "total_members": total,
+            "locations": locations,
+            "gender": by_gender,
+            "age_bands": by_age,
+            "youth_members": youth
+        }
@@ -0,0 +1,236 @@
+"""
+PIN hashing service
+
+PINs are hashed with argon2id. Hashing and verification run in a bounded
+process pool so the CPU/memory cost never lands on the web worker (async
+callers await the pool's futures rather than holding a thread), and legacy
+unsalted SHA-256 hashes are transparently upgraded on the next successful
+login. A small verification cache lets repeat logins (e.g. consecutive USSD
+sessions from the same handset) skip the argon2 cost within a short TTL.
+"""
+import asyncio
+import hashlib
+import hmac
+import multiprocessing
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+PIN_HASH_WORKERS = int(os.getenv("PIN_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PIN_HASH_MAX_PENDING = int(os.getenv("PIN_HASH_MAX_PENDING", "64"))
+PIN_HASH_QUEUE_TIMEOUT = float(os.getenv("PIN_HASH_QUEUE_TIMEOUT", "5"))
+PIN_VERIFY_CACHE_SIZE = int(os.getenv("PIN_VERIFY_CACHE_SIZE", "1024"))
+PIN_VERIFY_CACHE_TTL = int(os.getenv("PIN_VERIFY_CACHE_TTL", "300"))
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing pool queue is full"""
+
+
+def _password_hasher(time_cost: int, memory_cost: int, parallelism: int) -> PasswordHasher:
+    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+def _hash_in_worker(pin: str, params: Tuple[int, int, int]) -> str:
+    return _password_hasher(*params).hash(pin)
+
+
+def _verify_in_worker(pin: str, stored_hash: str, params: Tuple[int, int, int]) -> Tuple[bool, bool]:
+    """Return (valid, needs_rehash) for an argon2 hash"""
+    hasher = _password_hasher(*params)
+    try:
+        hasher.verify(stored_hash, pin)
+    except (VerificationError, InvalidHashError):
+        return False, False
+    return True, hasher.check_needs_rehash(stored_hash)
+
+
+def is_legacy_hash(stored_hash: str) -> bool:
+    """True for the unsalted SHA-256 hex digests written before argon2id"""
+    return bool(stored_hash) and _LEGACY_SHA256.match(stored_hash) is not None
+
+
+class PinHasher:
+    """Argon2id PIN hasher backed by a bounded process pool"""
+
+    def __init__(
+        self,
+        time_cost: int = ARGON2_TIME_COST,
+        memory_cost: int = ARGON2_MEMORY_COST,
+        parallelism: int = ARGON2_PARALLELISM,
+        max_workers: int = PIN_HASH_WORKERS,
+        max_pending: int = PIN_HASH_MAX_PENDING,
+        queue_timeout: float = PIN_HASH_QUEUE_TIMEOUT,
+        cache_size: int = PIN_VERIFY_CACHE_SIZE,
+        cache_ttl: int = PIN_VERIFY_CACHE_TTL
+    ):
+        self.params = (time_cost, memory_cost, parallelism)
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._cache_key = secrets.token_bytes(32)
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def hash(self, pin: str) -> str:
+        """Hash a PIN with argon2id"""
+        return self._run(_hash_in_worker, pin, self.params)
+
+    def verify(self, pin: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a PIN against a stored hash
+
+        Returns (valid, new_hash). new_hash is set when the stored hash is a
+        legacy SHA-256 digest or uses outdated argon2 parameters, and should
+        be written back by the caller.
+        """
+        if not stored_hash:
+            return False, None
+
+        if is_legacy_hash(stored_hash):
+            if not self._legacy_matches(pin, stored_hash):
+                return False, None
+            return True, self.hash(pin)
+
+        cache_key = self._verification_key(pin, stored_hash)
+        if self._cache_hit(cache_key):
+            return True, None
+
+        valid, needs_rehash = self._run(_verify_in_worker, pin, stored_hash, self.params)
+        if not valid:
+            return False, None
+        if needs_rehash:
+            return True, self.hash(pin)
+
+        self._cache_store(cache_key)
+        return True, None
+
+    async def hash_async(self, pin: str) -> str:
+        """hash() for async callers"""
+        return await self._run_async(_hash_in_worker, pin, self.params)
+
+    async def verify_async(self, pin: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+        """verify() for async callers: the event loop awaits the worker instead of a thread blocking on it"""
+        if not stored_hash:
+            return False, None
+
+        if is_legacy_hash(stored_hash):
+            if not self._legacy_matches(pin, stored_hash):
+                return False, None
+            return True, await self.hash_async(pin)
+
+        cache_key = self._verification_key(pin, stored_hash)
+        if self._cache_hit(cache_key):
+            return True, None
+
+        valid, needs_rehash = await self._run_async(_verify_in_worker, pin, stored_hash, self.params)
+        if not valid:
+            return False, None
+        if needs_rehash:
+            return True, await self.hash_async(pin)
+
+        self._cache_store(cache_key)
+        return True, None
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # spawn keeps DB connections and threads out of the workers
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusyError("PIN hashing queue is full")
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    async def _run_async(self, fn, *args):
+        # Wait for a slot by polling, so neither the loop nor a thread blocks on the semaphore
+        deadline = time.monotonic() + self.queue_timeout
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                raise HasherBusyError("PIN hashing queue is full")
+            await asyncio.sleep(0.01)
+        try:
+            return await asyncio.wrap_future(self._executor().submit(fn, *args))
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _legacy_matches(pin: str, stored_hash: str) -> bool:
+        return hmac.compare_digest(hashlib.sha256(pin.encode()).hexdigest(), stored_hash)
+
+    def _verification_key(self, pin: str, stored_hash: str) -> bytes:
+        return hmac.new(self._cache_key, f"{stored_hash}\0{pin}".encode(), hashlib.sha256).digest()
+
+    def _cache_hit(self, key: bytes) -> bool:
+        if not self.cache_size:
+            return False
+        with self._cache_lock:
+            expires_at = self._cache.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return False
+            self._cache.move_to_end(key)
+            return True
+
+    def _cache_store(self, key: bytes) -> None:
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = time.monotonic() + self.cache_ttl
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+# Process-wide PIN hasher
+pin_hasher = PinHasher()
+
+
+def hash_pin(pin: str) -> str:
+    """Hash a PIN using argon2id"""
+    return pin_hasher.hash(pin)
+
+
+def verify_pin(plain_pin: str, hashed_pin: str) -> Tuple[bool, Optional[str]]:
+    """Verify a PIN; returns (valid, replacement hash or None)"""
+    return pin_hasher.verify(plain_pin, hashed_pin)
+
+
+async def verify_pin_async(plain_pin: str, hashed_pin: str) -> Tuple[bool, Optional[str]]:
+    """verify_pin() for async routes"""
+    return await pin_hasher.verify_async(plain_pin, hashed_pin)
@@ -0,0 +1,148 @@
+"""
+RBAC permission resolution service
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.models.rbac import Permission, Role, RolePermission, UserRole
+
+PermissionKey = Tuple[str, str]  # (resource, action)
+EMPTY_PERMISSIONS: FrozenSet[PermissionKey] = frozenset()
+
+# System role (seeded by migration 008) held by every user with the account role
+ACCOUNT_ROLES = {
+    "admin": "Administrator",
+    "coordinator": "Ward Coordinator",
+}
+
+
+class PermissionResolver:
+    """
+    Resolves effective (resource, action) permissions for a user.
+
+    Each role's permissions are compiled once into a frozenset, and the union
+    for every (user_id, user_type) is cached with the version stamp it was
+    computed under. Write endpoints on roles, permissions and user roles call
+    bump_version(), which makes every cached entry stale at once.
+    """
+
+    def __init__(self, max_users: int = 10000):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._version = 0
+        self._role_version = -1
+        self._role_permissions: Dict[int, FrozenSet[PermissionKey]] = {}
+        self._effective: "OrderedDict[Tuple[int, str], Tuple[int, FrozenSet[PermissionKey]]]" = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        """Current permission version stamp"""
+        return self._version
+
+    def bump_version(self) -> int:
+        """Invalidate all compiled role sets and cached user permissions"""
+        with self._lock:
+            self._version += 1
+            self._role_permissions = {}
+            self._effective.clear()
+            return self._version
+
+    def get_cached(self, user_id: int, user_type: str) -> Optional[FrozenSet[PermissionKey]]:
+        """Return the cached effective set if it is current, without touching the DB"""
+        key = (user_id, user_type)
+        with self._lock:
+            entry = self._effective.get(key)
+            if entry is None or entry[0] != self._version:
+                return None
+            self._effective.move_to_end(key)
+            return entry[1]
+
+    def get_permissions(self, db: Session, user_id: int, user_type: str) -> FrozenSet[PermissionKey]:
+        """Return the effective permission set, loading it from the DB on a cache miss"""
+        cached = self.get_cached(user_id, user_type)
+        if cached is not None:
+            return cached
+
+        version = self._version
+        role_permissions = self._compiled_roles(db, version)
+
+        role_ids = db.query(UserRole.role_id).filter(
+            UserRole.user_id == user_id,
+            UserRole.user_type == user_type
+        ).all()
+        effective = EMPTY_PERMISSIONS.union(
+            *(role_permissions.get(role_id, EMPTY_PERMISSIONS) for (role_id,) in role_ids)
+        )
+
+        with self._lock:
+            # Don't cache a set computed before a concurrent bump
+            if self._version == version:
+                self._effective[(user_id, user_type)] = (version, effective)
+                self._effective.move_to_end((user_id, user_type))
+                while len(self._effective) > self.max_users:
+                    self._effective.popitem(last=False)
+
+        return effective
+
+    def has_permission(self, db: Session, user_id: int, user_type: str, resource: str, action: str) -> bool:
+        """Check a single (resource, action) pair for a user"""
+        return (resource, action) in self.get_permissions(db, user_id, user_type)
+
+    def _compiled_roles(self, db: Session, version: int) -> Dict[int, FrozenSet[PermissionKey]]:
+        """Compile every role's permissions into frozensets, once per version"""
+        with self._lock:
+            if self._role_version == version:
+                return self._role_permissions
+
+        rows = db.query(RolePermission.role_id, Permission.resource, Permission.action).join(
+            Permission, Permission.id == RolePermission.permission_id
+        ).all()
+
+        grouped: Dict[int, set] = {}
+        for role_id, resource, action in rows:
+            grouped.setdefault(role_id, set()).add((resource, action))
+        compiled = {role_id: frozenset(perms) for role_id, perms in grouped.items()}
+
+        with self._lock:
+            if self._version == version:
+                self._role_permissions = compiled
+                self._role_version = version
+
+        return compiled
+
+
+# Process-wide resolver shared by the routes and dependencies
+permission_resolver = PermissionResolver()
+
+
+def sync_account_role(db: Session, user) -> None:
+    """
+    Give a user the system role that goes with their account role, and take
+    away the ones that go with other account roles. Commits when anything changed.
+    """
+    roles = dict(db.query(Role.name, Role.id).filter(
+        Role.name.in_(ACCOUNT_ROLES.values()), Role.is_system_role == True
+    ).all())
+    wanted = roles.get(ACCOUNT_ROLES.get(user.role))
+    held = {role_id for (role_id,) in db.query(UserRole.role_id).filter(
+        UserRole.user_id == user.id,
+        UserRole.user_type == "admin",
+        UserRole.role_id.in_(roles.values())
+    )}
+
+    stale = held - {wanted}
+    if stale:
+        db.query(UserRole).filter(
+            UserRole.user_id == user.id,
+            UserRole.user_type == "admin",
+            UserRole.role_id.in_(stale)
+        ).delete(synchronize_session=False)
+    if wanted is not None and wanted not in held:
+        db.add(UserRole(user_id=user.id, user_type="admin", role_id=wanted))
+
+    if stale or (wanted is not None and wanted not in held):
+        db.commit()
+        permission_resolver.bump_version()
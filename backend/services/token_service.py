@@ -0,0 +1,135 @@
+"""
+Signed access/refresh token service
+
+Tokens are compact HS256 JWTs built with the standard library so the backend
+can verify them in-process without a users table lookup.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict
+
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", os.getenv("SECRET_KEY", "dev-jwt-secret-change-in-production"))
+ACCESS_TOKEN_EXPIRE_SECONDS = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")) * 60
+REFRESH_TOKEN_EXPIRE_SECONDS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7")) * 86400
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is malformed, tampered with, expired or revoked"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class RevocationList:
+    """
+    Small in-memory deny list of token IDs
+
+    Entries are kept only until the revoked token would have expired anyway,
+    so the list stays proportional to recent logouts rather than all tokens.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked: Dict[str, int] = {}
+
+    def revoke(self, jti: str, expires_at: int) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+            self._prune(int(time.time()))
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def _prune(self, now: int) -> None:
+        expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+        for jti in expired:
+            del self._revoked[jti]
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+class TokenService:
+    """Issue and verify signed access and refresh tokens"""
+
+    def __init__(
+        self,
+        secret_key: str = JWT_SECRET_KEY,
+        access_ttl: int = ACCESS_TOKEN_EXPIRE_SECONDS,
+        refresh_ttl: int = REFRESH_TOKEN_EXPIRE_SECONDS
+    ):
+        self._key = secret_key.encode()
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.revocations = RevocationList()
+        self._header = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+    def create_token_pair(self, user_id: int, role: str, permission_version: int) -> Dict[str, Any]:
+        """Issue a new access + refresh token pair for a user"""
+        return {
+            "access_token": self._encode(user_id, role, permission_version, ACCESS_TOKEN, self.access_ttl),
+            "refresh_token": self._encode(user_id, role, permission_version, REFRESH_TOKEN, self.refresh_ttl),
+            "expires_in": self.access_ttl
+        }
+
+    def decode(self, token: str, expected_type: str = ACCESS_TOKEN) -> Dict[str, Any]:
+        """Verify signature, expiry, type and revocation; return the claims"""
+        try:
+            header, payload, signature = token.split(".")
+            expected = self._sign(f"{header}.{payload}")
+            if not hmac.compare_digest(signature, expected):
+                raise InvalidTokenError("Invalid token signature")
+            claims = json.loads(_b64decode(payload))
+        except InvalidTokenError:
+            raise
+        except (AttributeError, ValueError, TypeError):
+            raise InvalidTokenError("Malformed token")
+
+        if claims.get("typ") != expected_type:
+            raise InvalidTokenError("Wrong token type")
+        if claims.get("exp", 0) <= time.time():
+            raise InvalidTokenError("Token has expired")
+        if self.revocations.is_revoked(claims.get("jti", "")):
+            raise InvalidTokenError("Token has been revoked")
+
+        return claims
+
+    def revoke(self, claims: Dict[str, Any]) -> None:
+        """Revoke a decoded token until its natural expiry"""
+        self.revocations.revoke(claims["jti"], int(claims["exp"]))
+
+    def _encode(self, user_id: int, role: str, permission_version: int, token_type: str, ttl: int) -> str:
+        now = int(time.time())
+        claims = {
+            "sub": str(user_id),
+            "role": role,
+            "pv": permission_version,
+            "typ": token_type,
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+            "exp": now + ttl
+        }
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = f"{self._header}.{payload}"
+        return f"{signing_input}.{self._sign(signing_input)}"
+
+    def _sign(self, signing_input: str) -> str:
+        return _b64encode(hmac.new(self._key, signing_input.encode(), hashlib.sha256).digest())
+
+
+# Process-wide token service
+token_service = TokenService()
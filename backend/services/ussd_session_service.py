@@ -0,0 +1,136 @@
+"""
+USSD session lifecycle
+
+ussd_sessions is a rolling hot table: it only holds sessions that are still
+in progress. A session that ends is moved to ussd_session_archive in the same
+transaction as its last hop, and a background reaper moves sessions that have
+been idle past the network timeout. The hot table therefore stays the size of
+current traffic, and session lookups cost the same after a year as on day one.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from backend.config.database import SessionLocal
+from backend.models.ussd_session import USSDSession, USSDSessionArchive
+
+logger = logging.getLogger(__name__)
+
+# Mobile networks drop a USSD dialogue after about three minutes of silence
+USSD_SESSION_TIMEOUT = int(os.getenv("USSD_SESSION_TIMEOUT", "180"))
+USSD_REAPER_INTERVAL = int(os.getenv("USSD_REAPER_INTERVAL", "60"))
+USSD_REAPER_BATCH_SIZE = int(os.getenv("USSD_REAPER_BATCH_SIZE", "1000"))
+
+COMPLETED = "completed"
+EXPIRED = "expired"
+
+
+def _archive_row(session: USSDSession, outcome: str, ended_at: datetime) -> Dict:
+    member_id = (session.session_data or {}).get("member_id")
+    return {
+        "session_id": session.session_id,
+        "phone_number": session.phone_number,
+        "member_id": int(member_id) if member_id else None,
+        "final_step": session.current_step,
+        "outcome": outcome,
+        "started_at": session.created_at,
+        "ended_at": ended_at
+    }
+
+
+class USSDSessionLifecycle:
+    @staticmethod
+    def finish(db: Session, session: USSDSession, outcome: str = COMPLETED) -> None:
+        """Move a session to the archive; committed with the caller's transaction"""
+        db.add(USSDSessionArchive(**_archive_row(session, outcome, datetime.utcnow())))
+        if inspect(session).pending:
+            # Created and ended within the same hop: never written
+            db.expunge(session)
+        else:
+            db.delete(session)
+
+    @staticmethod
+    def reap(db: Session, now: Optional[datetime] = None,
+             timeout: int = USSD_SESSION_TIMEOUT, batch_size: int = USSD_REAPER_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Archive sessions idle past the timeout as expired, and any ended
+        sessions left in the hot table by older versions as completed
+
+        Works in batches, one transaction each, so a large backlog never holds
+        locks for long. Returns the number of sessions archived per outcome.
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(seconds=timeout)
+        archived = {EXPIRED: 0, COMPLETED: 0}
+
+        for outcome, condition in (
+            (EXPIRED, (USSDSession.is_active == True) & (USSDSession.updated_at < cutoff)),
+            (COMPLETED, USSDSession.is_active == False),
+        ):
+            while True:
+                # SKIP LOCKED: a session whose hop is committing right now is
+                # left for the next pass (ignored where unsupported, e.g. SQLite)
+                batch: List[USSDSession] = db.query(USSDSession).filter(condition).order_by(
+                    USSDSession.updated_at
+                ).limit(batch_size).with_for_update(skip_locked=True).all()
+                if not batch:
+                    break
+
+                db.bulk_insert_mappings(USSDSessionArchive, [
+                    _archive_row(session, outcome, session.updated_at if outcome == COMPLETED else now)
+                    for session in batch
+                ])
+                db.query(USSDSession).filter(
+                    USSDSession.id.in_([session.id for session in batch])
+                ).delete(synchronize_session=False)
+                db.commit()
+                archived[outcome] += len(batch)
+
+                if len(batch) < batch_size:
+                    break
+
+        return archived
+
+
+class USSDSessionReaper:
+    """Background thread that expires idle USSD sessions on an interval"""
+
+    def __init__(self, interval_seconds: int = USSD_REAPER_INTERVAL):
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ussd-session-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> None:
+        db = SessionLocal()
+        try:
+            archived = USSDSessionLifecycle.reap(db)
+            if any(archived.values()):
+                logger.info(f"[USSD] Archived {archived[EXPIRED]} expired and {archived[COMPLETED]} completed sessions")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[USSD] Session reaper failed: {e}")
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        self.run_once()
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+
+ussd_session_reaper = USSDSessionReaper()
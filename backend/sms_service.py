@@ -12,6 +12,12 @@ import logging
 import os
 import requests
 import json
+try:
+    from backend.utils.metrics import NOTIFICATION_QUEUE_DEPTH, time_provider_call
+except ImportError:
+    # Vendored as services.sms_service without the backend's metrics: the metrics_noop.py
+    # copied next to it records nothing
+    from .metrics_noop import NOTIFICATION_QUEUE_DEPTH, time_provider_call
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -175,6 +181,8 @@ class SMSService:
                 logger.error(f"❌ Failed to send async SMS to {phone_numbers}: {str(e)}")
                 import traceback
                 traceback.print_exc()
+            finally:
+                NOTIFICATION_QUEUE_DEPTH.labels('sms').dec()
     
     def _send_sms_sync(self, phone_numbers: List[str], message: str):
         """Send SMS synchronously based on provider"""
@@ -193,17 +201,18 @@ class SMSService:
                     continue
                 
                 # Send based on provider
-                if self.provider == 'twilio':
-                    result = self._send_twilio_sms(clean_number, message)
-                elif self.provider == 'africas_talking':
-                    result = self._send_africas_talking_sms(clean_number, message)
-                elif self.provider == 'nexmo':
-                    result = self._send_nexmo_sms(clean_number, message)
-                elif self.provider == 'cloudservicezm':
-                    result = self._send_cloudservicezm_sms(clean_number, message)
-                else:
+                senders = {
+                    'twilio': self._send_twilio_sms,
+                    'africas_talking': self._send_africas_talking_sms,
+                    'nexmo': self._send_nexmo_sms,
+                    'cloudservicezm': self._send_cloudservicezm_sms,
+                }
+                if self.provider not in senders:
                     logger.error(f"Unknown provider: {self.provider}")
                     continue
+                with time_provider_call('sms', self.provider) as call:
+                    result = senders[self.provider](clean_number, message)
+                    call['ok'] = bool(result)
                 
                 if result:
                     success_count += 1
@@ -380,6 +389,7 @@ class SMSService:
                 # Send asynchronously
                 logger.info("📱 Sending SMS asynchronously...")
                 thread = Thread(target=self._send_async_sms, args=(self.app, valid_numbers, message))
+                NOTIFICATION_QUEUE_DEPTH.labels('sms').inc()
                 thread.start()
                 return True
             else:
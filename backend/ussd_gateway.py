@@ -3,6 +3,9 @@
 USSD Gateway Service for Political Party Membership System
 Following BYouth USSD flow structure for ADD membership
 Compatible with standard USSD gateways using sessionId, msisdn, text format
+
+The dialogue is the GATEWAY_FLOW table, run by backend.ussd_menu.MenuEngine
+like the backend's USSD service.
 """
 
 from flask import Flask, request, jsonify, render_template
@@ -14,6 +17,13 @@ from typing import Dict, Optional, Any
 import os
 import re
 import requests
+try:
+    from backend.ussd_menu import MenuEngine, fit_screen
+    from backend.utils.metrics import USSD_ACTIVE_SESSIONS, USSD_HOP_SECONDS, USSD_HOPS, instrument_flask
+except ImportError:
+    # Run as a script from backend/ (python ussd_gateway.py)
+    from ussd_menu import MenuEngine, fit_screen
+    from utils.metrics import USSD_ACTIVE_SESSIONS, USSD_HOP_SECONDS, USSD_HOPS, instrument_flask
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +32,7 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
+instrument_flask(app, "ussd_gateway", database=False)
 
 # Configuration
 USSD_CODE = "*388*3#"  # ADD membership USSD code
@@ -30,6 +41,7 @@ SESSION_TIMEOUT = 180  # 3 minutes
 
 # In-memory session storage
 sessions = {}
+USSD_ACTIVE_SESSIONS.set_function(lambda: len(sessions))
 
 # ============= ZAMBIAN DATA =============
 
@@ -65,6 +77,14 @@ MEMBERSHIP_TYPES = {
     '5': 'Diaspora Member'
 }
 
+# Static menu bodies, rendered once at import instead of on every hop
+LANGUAGE_MENU = "".join(f"{key}. {lang}\n" for key, lang in LANGUAGES.items())
+PROVINCE_MENU = "".join(
+    f"{key}. {province['name']}\n" for key, province in ZAMBIAN_PROVINCES.items() if len(key) == 1
+) + "0. Muchinga"
+DISTRICTS = {province['name']: province['districts'] for province in ZAMBIAN_PROVINCES.values()}
+MEMBERSHIP_TYPE_MENU = "".join(f"{key}. {mtype}\n" for key, mtype in MEMBERSHIP_TYPES.items())
+
 # ============= SESSION MANAGEMENT =============
 
 class USSDSession:
@@ -75,10 +95,26 @@ class USSDSession:
         self.msisdn = msisdn
         self.state = 'start'
         self.data = {}
-        self.registration_data = {}
         self.created_at = datetime.now()
         self.last_activity = datetime.now()
-        self.language = 'en'
+
+    # The names the menu engine reads a session by
+    @property
+    def current_step(self) -> str:
+        return self.state
+
+    @property
+    def session_data(self) -> Dict:
+        return self.data
+
+    @property
+    def language(self) -> str:
+        return self.data.get('language', 'en')
+
+    @property
+    def registration_data(self) -> Dict:
+        """The registration answers given so far"""
+        return {field: self.data[field] for field in REGISTRATION_FIELDS if self.data.get(field) is not None}
 
     def update_activity(self):
         self.last_activity = datetime.now()
@@ -114,22 +150,167 @@ def create_session(session_id: str, msisdn: str) -> USSDSession:
     logger.info(f"Created session: {session_id} for {msisdn}")
     return session
 
-def update_session(session_id: str, state: str = None, data: Dict = None):
-    """Update session state and data"""
-    session = get_session(session_id)
-    if session:
-        if state:
-            session.state = state
-        if data:
-            session.data.update(data)
-        logger.info(f"Updated session {session_id}: state={state}")
-
 def delete_session(session_id: str):
     """Delete session"""
     if session_id in sessions:
         del sessions[session_id]
         logger.info(f"Deleted session: {session_id}")
 
+# ============= DIALOGUE =============
+
+# Session data sent to the backend on registration
+REGISTRATION_FIELDS = (
+    'first_name', 'last_name', 'gender', 'nrc', 'province', 'district', 'constituency',
+    'membership_type', 'pin', 'payment_method', 'mobile_provider', 'mobile_number',
+)
+
+REGISTRATION_CANCELLED = "Registration cancelled.\nThank you!"
+
+# One entry per session state; see backend.ussd_menu for the state types.
+# Handler names refer to RegistrationDialogue methods.
+GATEWAY_FLOW: Dict[str, Dict] = {
+    'terms': {
+        'type': 'menu',
+        # Ultra-compact terms under 140 characters - BYouth style
+        'prompt': "Welcome to ADD!\nAlliance for Democracy\n& Development\nUPND Partner\n"
+                  "K50/year membership\n1. Accept\n2. Decline",
+        'invalid': "Please choose 1 or 2.",
+        'options': {
+            '1': {'goto': 'language'},
+            '2': {'end': REGISTRATION_CANCELLED},
+        },
+    },
+    'language': {
+        'type': 'choice',
+        'prompt': "Select Language:\n" + LANGUAGE_MENU,
+        'field': 'language',
+        'options': LANGUAGES,
+        'invalid': "Invalid. Select Language:\n" + LANGUAGE_MENU,
+        'next': 'first_name',
+    },
+    'first_name': {
+        'type': 'input',
+        'prompt': "First name:",
+        'field': 'first_name',
+        'validate': 'validate_name',
+        'invalid': "Letters only please.\nFirst name:",
+        'next': 'last_name',
+    },
+    'last_name': {
+        'type': 'input',
+        'prompt': "Hi {first_name}!\nLast name:",
+        'field': 'last_name',
+        'validate': 'validate_name',
+        'invalid': "Letters only please.\nLast name:",
+        'next': 'gender',
+    },
+    'gender': {
+        'type': 'choice',
+        'prompt': "Gender:\n1. Male\n2. Female",
+        'field': 'gender',
+        'options': {'1': 'Male', '2': 'Female'},
+        'invalid': "Invalid selection.\nGender:\n1. Male\n2. Female",
+        'next': 'nrc',
+    },
+    'nrc': {
+        'type': 'input',
+        'prompt': "NRC Number:\n(Format: 123456/12/1)\n(or 0 to skip)",
+        'field': 'nrc',
+        'validate': 'validate_nrc',
+        'invalid': "Format: 123456/12/1\nNRC (0=skip):",
+        'next': 'province',
+    },
+    'province': {
+        'type': 'choice',
+        'prompt': "Province:\n" + PROVINCE_MENU,
+        'field': 'province',
+        # Muchinga is listed as 0 to keep the menu to single keys
+        'options': {**{key: province['name'] for key, province in ZAMBIAN_PROVINCES.items()}, '0': 'Muchinga'},
+        'invalid': "Invalid. Select Province:\n" + PROVINCE_MENU,
+        'next': 'district',
+    },
+    'district': {
+        'type': 'list',
+        'prompt': "District:\n{menu}",
+        'source': 'get_districts',
+        'parent': 'province',
+        'field': 'district',
+        'invalid': "Invalid. Select District.",
+        'next': 'constituency',
+    },
+    'constituency': {
+        'type': 'input',
+        'prompt': "Constituency/Ward in {district}:",
+        'field': 'constituency',
+        'validate': 'validate_constituency',
+        'invalid': "Enter constituency/ward:",
+        'next': 'membership_type',
+    },
+    'membership_type': {
+        'type': 'choice',
+        'prompt': "Membership Type:\n" + MEMBERSHIP_TYPE_MENU,
+        'field': 'membership_type',
+        'options': MEMBERSHIP_TYPES,
+        'invalid': "Invalid. Membership Type:\n" + MEMBERSHIP_TYPE_MENU,
+        'next': 'pin',
+    },
+    'pin': {
+        'type': 'input',
+        'prompt': "Create 4-digit PIN:",
+        'field': 'pin',
+        'validate': 'validate_pin',
+        'invalid': "4 digits only.\nCreate PIN:",
+        'next': 'pin_confirm',
+    },
+    'pin_confirm': {
+        'type': 'input',
+        'prompt': "Confirm PIN:",
+        'guard': 'pins_match',
+        'next': 'payment_method',
+    },
+    'payment_method': {
+        'type': 'choice',
+        'prompt': "Payment Method:\n1. Mobile Money\n2. Bank Transfer\n3. Pay Later",
+        'field': 'payment_method',
+        'options': {'1': 'mobile_money', '2': 'bank_transfer', '3': 'pay_later'},
+        'invalid': "Invalid.\nPayment Method:\n1. Mobile Money\n2. Bank Transfer\n3. Pay Later",
+        'action': 'after_payment_method',
+    },
+    'mobile_provider': {
+        'type': 'choice',
+        'prompt': "Select Provider:\n1. MTN\n2. Airtel\n3. Zamtel\n4. Zanaco",
+        'field': 'mobile_provider',
+        'options': {'1': 'MTN', '2': 'Airtel', '3': 'Zamtel', '4': 'Zanaco'},
+        'invalid': "Invalid.\n1. MTN\n2. Airtel\n3. Zamtel\n4. Zanaco",
+        'next': 'mobile_number',
+    },
+    'mobile_number': {
+        'type': 'input',
+        'prompt': "Mobile Money Number:\n(e.g. 0977123456)",
+        'field': 'mobile_number',
+        'validate': 'validate_mobile_number',
+        'invalid': "Invalid number.\nMobile Money Number:",
+        'next': 'confirm',
+    },
+    'confirm': {
+        'type': 'menu',
+        'prompt': "Confirm Registration:\n{full_name}\nNRC: {nrc}\n{province}\n"
+                  "Type: {membership_type}\n1. Confirm\n2. Cancel",
+        'invalid': "Invalid choice.",
+        'options': {
+            '1': {'action': 'register'},
+            '2': {'end': REGISTRATION_CANCELLED},
+        },
+    },
+    'login_pin': {
+        'type': 'input',
+        'prompt': "Welcome back!\nEnter your PIN:",
+        'validate': 'validate_pin',
+        'invalid': "Invalid PIN.\nEnter 4-digit PIN:",
+        'end': "Welcome back!\nServices coming soon.\nThank you!",
+    },
+}
+
 # ============= USSD HANDLERS =============
 
 def format_phone_number(msisdn: str) -> str:
@@ -162,299 +343,112 @@ def check_member_exists(phone: str) -> Dict:
         logger.error(f"Backend check failed: {e}")
         return {'exists': False}
 
-def start_welcome(session_id: str) -> str:
-    """Show initial welcome with terms"""
-    update_session(session_id, state='terms')
-
-    # Ultra-compact terms under 140 characters - BYouth style
-    terms = "Welcome to ADD!\n"
-    terms += "Alliance for Democracy\n"
-    terms += "& Development\n"
-    terms += "UPND Partner\n"
-    terms += "K50/year membership\n"
-    terms += "1. Accept\n"
-    terms += "2. Decline"
-
-    return terms
-
-def handle_terms(session_id: str, user_input: str) -> tuple:
-    """Handle terms acceptance"""
-    if user_input == '1':
-        update_session(session_id, state='language')
-        menu = "Select Language:\n"
-        for key, lang in LANGUAGES.items():
-            menu += f"{key}. {lang}\n"
-        return menu, True
-    elif user_input == '2':
-        delete_session(session_id)
-        return "Registration cancelled.\nThank you!", False
-    else:
-        return start_welcome(session_id), True
-
-def handle_language(session_id: str, user_input: str) -> tuple:
-    """Handle language selection"""
-    if user_input in LANGUAGES:
-        session = get_session(session_id)
-        session.language = LANGUAGES[user_input]
-        update_session(session_id, state='first_name')
-        return "First name:", True
-    else:
-        menu = "Invalid. Select Language:\n"
-        for key, lang in LANGUAGES.items():
-            menu += f"{key}. {lang}\n"
-        return menu, True
-
-def handle_first_name(session_id: str, user_input: str) -> tuple:
-    """Handle first name input"""
-    first_name = user_input.strip()
-
-    if not first_name:
-        return "Enter your first name:", True
-
-    # Allow letters, spaces, hyphens, apostrophes
-    allowed_chars = first_name.replace(' ', '').replace('-', '').replace("'", '').replace('.', '')
-    if not allowed_chars.isalpha():
-        return "Letters only please.\nFirst name:", True
-
-    session = get_session(session_id)
-    session.registration_data['first_name'] = first_name.title()
-    update_session(session_id, state='last_name')
-
-    return f"Hi {first_name.title()}!\nLast name:", True
-
-def handle_last_name(session_id: str, user_input: str) -> tuple:
-    """Handle last name input"""
-    last_name = user_input.strip()
-
-    if not last_name:
-        return "Enter your last name:", True
-
-    allowed_chars = last_name.replace(' ', '').replace('-', '').replace("'", '').replace('.', '')
-    if not allowed_chars.isalpha():
-        return "Letters only please.\nLast name:", True
-
-    session = get_session(session_id)
-    session.registration_data['last_name'] = last_name.title()
-    update_session(session_id, state='gender')
-
-    return "Gender:\n1. Male\n2. Female", True
-
-def handle_gender(session_id: str, user_input: str) -> tuple:
-    """Handle gender selection"""
-    genders = {'1': 'Male', '2': 'Female'}
-
-    if user_input not in genders:
-        return "Invalid selection.\nGender:\n1. Male\n2. Female", True
-
-    session = get_session(session_id)
-    session.registration_data['gender'] = genders[user_input]
-    update_session(session_id, state='nrc')
-
-    return "NRC Number:\n(Format: 123456/12/1)\n(or 0 to skip)", True
-
-def handle_nrc(session_id: str, user_input: str) -> tuple:
-    """Handle NRC input"""
-    nrc = user_input.strip().upper()
-
-    if nrc != '0' and not re.match(r'^\d{6}/\d{2}/\d$', nrc):
-        return "Format: 123456/12/1\nNRC (0=skip):", True
-
-    session = get_session(session_id)
-    if nrc != '0':
-        session.registration_data['nrc'] = nrc
-
-    update_session(session_id, state='province')
-
-    menu = "Province:\n"
-    for key, province in ZAMBIAN_PROVINCES.items():
-        if len(key) == 1:
-            menu += f"{key}. {province['name']}\n"
-    menu += "0. Muchinga"
-
-    return menu, True
-
-def handle_province(session_id: str, user_input: str) -> tuple:
-    """Handle province selection"""
-    # Map '0' to '10' for Muchinga
-    if user_input == '0':
-        user_input = '10'
-
-    if user_input not in ZAMBIAN_PROVINCES:
-        menu = "Invalid. Select Province:\n"
-        for key, province in ZAMBIAN_PROVINCES.items():
-            if len(key) == 1:
-                menu += f"{key}. {province['name']}\n"
-        menu += "0. Muchinga"
-        return menu, True
-
-    session = get_session(session_id)
-    selected_province = ZAMBIAN_PROVINCES[user_input]
-    session.registration_data['province'] = selected_province['name']
-    session.data['province_key'] = user_input
-    update_session(session_id, state='district')
-
-    menu = f"District in {selected_province['name']}:\n"
-    for i, district in enumerate(selected_province['districts'][:6], 1):
-        menu += f"{i}. {district}\n"
-
-    return menu, True
-
-def handle_district(session_id: str, user_input: str) -> tuple:
-    """Handle district selection"""
-    session = get_session(session_id)
-    province_key = session.data.get('province_key')
-    districts = ZAMBIAN_PROVINCES[province_key]['districts']
-
-    try:
-        district_index = int(user_input) - 1
-        if 0 <= district_index < len(districts):
-            selected_district = districts[district_index]
-            session.registration_data['district'] = selected_district
-            update_session(session_id, state='constituency')
-
-            return f"Constituency/Ward in {selected_district}:", True
-    except (ValueError, IndexError):
-        pass
-
-    province = ZAMBIAN_PROVINCES[province_key]
-    menu = f"Invalid. District in {province['name']}:\n"
-    for i, district in enumerate(districts[:6], 1):
-        menu += f"{i}. {district}\n"
-
-    return menu, True
-
-def handle_constituency(session_id: str, user_input: str) -> tuple:
-    """Handle constituency input"""
-    constituency = user_input.strip()
-
-    if len(constituency) < 2:
-        return "Enter constituency/ward:", True
-
-    session = get_session(session_id)
-    session.registration_data['constituency'] = constituency
-    update_session(session_id, state='membership_type')
-
-    menu = "Membership Type:\n"
-    for key, mtype in MEMBERSHIP_TYPES.items():
-        menu += f"{key}. {mtype}\n"
-
-    return menu, True
-
-def handle_membership_type(session_id: str, user_input: str) -> tuple:
-    """Handle membership type selection"""
-    if user_input not in MEMBERSHIP_TYPES:
-        menu = "Invalid. Membership Type:\n"
-        for key, mtype in MEMBERSHIP_TYPES.items():
-            menu += f"{key}. {mtype}\n"
-        return menu, True
-
-    session = get_session(session_id)
-    session.registration_data['membership_type'] = MEMBERSHIP_TYPES[user_input]
-    update_session(session_id, state='pin')
-
-    return "Create 4-digit PIN:", True
-
-def handle_pin(session_id: str, user_input: str) -> tuple:
-    """Handle PIN creation"""
-    pin = user_input.strip()
-
-    if not re.match(r'^\d{4}$', pin):
-        return "4 digits only.\nCreate PIN:", True
-
-    session = get_session(session_id)
-    session.registration_data['pin'] = pin
-    update_session(session_id, state='pin_confirm')
-
-    return "Confirm PIN:", True
-
-def handle_pin_confirm(session_id: str, user_input: str) -> tuple:
-    """Handle PIN confirmation"""
-    session = get_session(session_id)
-    original_pin = session.registration_data.get('pin')
-
-    if user_input.strip() != original_pin:
-        update_session(session_id, state='pin')
-        return "PINs don't match.\nCreate 4-digit PIN:", True
-
-    update_session(session_id, state='payment_method')
+class RegistrationDialogue:
+    """Validators, data sources, slots and actions of GATEWAY_FLOW"""
+
+    def __init__(self, flow: Dict[str, Dict] = None):
+        self.menu = MenuEngine(flow or GATEWAY_FLOW, self)
+
+    def advance(self, session: USSDSession, step: str, **data) -> None:
+        session.state = step
+        session.data.update(data)
+        logger.info(f"Updated session {session.session_id}: state={step}")
+
+    def start(self, session: USSDSession) -> str:
+        """First screen: login for members, otherwise the registration terms"""
+        member_check = check_member_exists(session.msisdn)
+        return self.menu.enter('login_pin' if member_check.get('exists') else 'terms', session, None)
+
+    # Validators
+
+    @staticmethod
+    def validate_name(value: str) -> str:
+        name = value.strip()
+        # Allow letters, spaces, hyphens, apostrophes
+        if not name.replace(' ', '').replace('-', '').replace("'", '').replace('.', '').isalpha():
+            raise ValueError(value)
+        return name.title()
+
+    @staticmethod
+    def validate_nrc(value: str) -> Optional[str]:
+        """The NRC, or None when skipped with 0"""
+        nrc = value.strip().upper()
+        if nrc == '0':
+            return None
+        if not re.match(r'^\d{6}/\d{2}/\d$', nrc):
+            raise ValueError(value)
+        return nrc
 
-    return "Payment Method:\n1. Mobile Money\n2. Bank Transfer\n3. Pay Later", True
+    @staticmethod
+    def validate_constituency(value: str) -> str:
+        if len(value.strip()) < 2:
+            raise ValueError(value)
+        return value.strip()
 
-def handle_payment_method(session_id: str, user_input: str) -> tuple:
-    """Handle payment method selection"""
-    if user_input == '1':  # Mobile Money
-        session = get_session(session_id)
-        session.registration_data['payment_method'] = 'mobile_money'
-        update_session(session_id, state='mobile_provider')
+    @staticmethod
+    def validate_pin(value: str) -> str:
+        if not re.match(r'^\d{4}$', value.strip()):
+            raise ValueError(value)
+        return value.strip()
 
-        return "Select Provider:\n1. MTN\n2. Airtel\n3. Zamtel\n4. Zanaco", True
+    @staticmethod
+    def validate_mobile_number(value: str) -> str:
+        clean = ''.join(filter(str.isdigit, value))
+        if len(clean) < 9:
+            raise ValueError(value)
+        return clean
 
-    elif user_input == '2':  # Bank Transfer
-        session = get_session(session_id)
-        session.registration_data['payment_method'] = 'bank_transfer'
-        update_session(session_id, state='confirm')
-        return show_confirmation(session_id), True
+    # Guards
 
-    elif user_input == '3':  # Pay Later
-        session = get_session(session_id)
-        session.registration_data['payment_method'] = 'pay_later'
-        update_session(session_id, state='confirm')
-        return show_confirmation(session_id), True
+    def pins_match(self, session: USSDSession, value: str, db) -> Optional[tuple]:
+        if value.strip() != session.data.get('pin'):
+            self.advance(session, 'pin')
+            return "PINs don't match.\nCreate 4-digit PIN:", False
+        return None
 
-    else:
-        return "Invalid.\nPayment Method:\n1. Mobile Money\n2. Bank Transfer\n3. Pay Later", True
+    # Data sources
 
-def handle_mobile_provider(session_id: str, user_input: str) -> tuple:
-    """Handle mobile provider selection"""
-    providers = {'1': 'MTN', '2': 'Airtel', '3': 'Zamtel', '4': 'Zanaco'}
+    @staticmethod
+    def get_districts(province: str, db) -> list:
+        return [{'id': district, 'name': district} for district in DISTRICTS.get(province, [])]
 
-    if user_input not in providers:
-        return "Invalid.\n1. MTN\n2. Airtel\n3. Zamtel\n4. Zanaco", True
+    # Slots
 
-    session = get_session(session_id)
-    session.registration_data['mobile_provider'] = providers[user_input]
-    update_session(session_id, state='mobile_number')
+    @staticmethod
+    def slot_first_name(session: USSDSession, db) -> str:
+        return session.data.get('first_name', '')
 
-    return "Mobile Money Number:\n(e.g. 0977123456)", True
+    @staticmethod
+    def slot_district(session: USSDSession, db) -> str:
+        return session.data.get('district', '')
 
-def handle_mobile_number(session_id: str, user_input: str) -> tuple:
-    """Handle mobile money number input"""
-    mobile = user_input.strip()
+    @staticmethod
+    def slot_full_name(session: USSDSession, db) -> str:
+        return f"{session.data.get('first_name', '')} {session.data.get('last_name', '')}"
 
-    # Basic validation
-    clean = ''.join(filter(str.isdigit, mobile))
-    if len(clean) < 9:
-        return "Invalid number.\nMobile Money Number:", True
+    @staticmethod
+    def slot_nrc(session: USSDSession, db) -> str:
+        return session.data.get('nrc') or 'Not provided'
 
-    session = get_session(session_id)
-    session.registration_data['mobile_number'] = clean
-    update_session(session_id, state='confirm')
+    @staticmethod
+    def slot_province(session: USSDSession, db) -> str:
+        return session.data.get('province', '')
 
-    return show_confirmation(session_id), True
+    @staticmethod
+    def slot_membership_type(session: USSDSession, db) -> str:
+        return session.data.get('membership_type', '')
 
-def show_confirmation(session_id: str) -> str:
-    """Show registration confirmation"""
-    session = get_session(session_id)
-    reg_data = session.registration_data
+    # Actions
 
-    confirm = "Confirm Registration:\n"
-    confirm += f"{reg_data.get('first_name', '')} {reg_data.get('last_name', '')}\n"
-    confirm += f"NRC: {reg_data.get('nrc', 'Not provided')}\n"
-    confirm += f"{reg_data.get('province', '')}\n"
-    confirm += f"Type: {reg_data.get('membership_type', '')}\n"
-    confirm += "1. Confirm\n"
-    confirm += "2. Cancel"
+    def after_payment_method(self, session: USSDSession, db) -> tuple:
+        if session.data['payment_method'] == 'mobile_money':
+            return self.menu.enter('mobile_provider', session, db), False
+        return self.menu.enter('confirm', session, db), False
 
-    return confirm
-
-def handle_confirmation(session_id: str, user_input: str) -> tuple:
-    """Handle registration confirmation"""
-    if user_input == '1':
-        session = get_session(session_id)
+    def register(self, session: USSDSession, db) -> tuple:
         reg_data = session.registration_data
         reg_data['phone'] = format_phone_number(session.msisdn)
 
-        # Here you would save to backend
         try:
             # Save to backend
             response = requests.post(
@@ -468,25 +462,19 @@ def handle_confirmation(session_id: str, user_input: str) -> tuple:
                 member_id = result.get('member_id', 'ADD' + str(datetime.now().timestamp())[:8])
             else:
                 member_id = 'ADD' + str(datetime.now().timestamp())[:8]
-        except:
+        except Exception:
             # Generate local member ID if backend fails
             member_id = 'ADD' + str(datetime.now().timestamp())[:8]
 
-        delete_session(session_id)
-
         success = f"Welcome to ADD!\n"
         success += f"Member ID: {member_id}\n"
         success += f"Thank you for joining\n"
         success += f"the movement!"
 
-        return success, False
+        return success, True
 
-    elif user_input == '2':
-        delete_session(session_id)
-        return "Registration cancelled.\nThank you!", False
 
-    else:
-        return show_confirmation(session_id) + "\n1. Confirm\n2. Cancel", True
+dialogue = RegistrationDialogue()
 
 def process_ussd_request(session_id: str, msisdn: str, user_input: str, is_new: bool) -> Dict:
     """Main USSD request processor"""
@@ -494,92 +482,22 @@ def process_ussd_request(session_id: str, msisdn: str, user_input: str, is_new:
     # Clean phone number
     msisdn = format_phone_number(msisdn)
 
-    if is_new:
-        # Check if member exists
-        member_check = check_member_exists(msisdn)
-        if member_check.get('exists'):
-            # Member exists - go to login
-            session = create_session(session_id, msisdn)
-            session.state = 'login_pin'
-            return {
-                'response': 'Welcome back!\nEnter your PIN:',
-                'continue': True
-            }
-        else:
-            # New member - start registration
-            session = create_session(session_id, msisdn)
-            return {
-                'response': start_welcome(session_id),
-                'continue': True
-            }
-
-    # Get existing session
-    session = get_session(session_id)
-    if not session:
-        # Session expired - restart
+    session = None if is_new else get_session(session_id)
+    if session is None:
+        # New or expired session: members log in, others start registration
         session = create_session(session_id, msisdn)
         return {
-            'response': start_welcome(session_id),
+            'response': dialogue.start(session),
             'continue': True
         }
 
-    # Route based on state
-    state = session.state
-    response_text = ""
-    continue_session = True
-
-    if state == 'terms':
-        response_text, continue_session = handle_terms(session_id, user_input)
-    elif state == 'language':
-        response_text, continue_session = handle_language(session_id, user_input)
-    elif state == 'first_name':
-        response_text, continue_session = handle_first_name(session_id, user_input)
-    elif state == 'last_name':
-        response_text, continue_session = handle_last_name(session_id, user_input)
-    elif state == 'gender':
-        response_text, continue_session = handle_gender(session_id, user_input)
-    elif state == 'nrc':
-        response_text, continue_session = handle_nrc(session_id, user_input)
-    elif state == 'province':
-        response_text, continue_session = handle_province(session_id, user_input)
-    elif state == 'district':
-        response_text, continue_session = handle_district(session_id, user_input)
-    elif state == 'constituency':
-        response_text, continue_session = handle_constituency(session_id, user_input)
-    elif state == 'membership_type':
-        response_text, continue_session = handle_membership_type(session_id, user_input)
-    elif state == 'pin':
-        response_text, continue_session = handle_pin(session_id, user_input)
-    elif state == 'pin_confirm':
-        response_text, continue_session = handle_pin_confirm(session_id, user_input)
-    elif state == 'payment_method':
-        response_text, continue_session = handle_payment_method(session_id, user_input)
-    elif state == 'mobile_provider':
-        response_text, continue_session = handle_mobile_provider(session_id, user_input)
-    elif state == 'mobile_number':
-        response_text, continue_session = handle_mobile_number(session_id, user_input)
-    elif state == 'confirm':
-        response_text, continue_session = handle_confirmation(session_id, user_input)
-    elif state == 'login_pin':
-        # Handle existing member login
-        if len(user_input) == 4 and user_input.isdigit():
-            delete_session(session_id)
-            response_text = f"Welcome back!\nServices coming soon.\nThank you!"
-            continue_session = False
-        else:
-            response_text = "Invalid PIN.\nEnter 4-digit PIN:"
-            continue_session = True
-    else:
-        response_text = start_welcome(session_id)
-        continue_session = True
-
-    # Ensure response is under 160 characters
-    if len(response_text) > 160:
-        response_text = response_text[:157] + "..."
+    response_text, end_session = dialogue.menu.handle(session, user_input, None)
+    if end_session:
+        delete_session(session_id)
 
     return {
-        'response': response_text,
-        'continue': continue_session
+        'response': fit_screen(response_text),
+        'continue': not end_session
     }
 
 # ============= API ENDPOINTS =============
@@ -601,8 +519,12 @@ def ussd_handler():
 
         logger.info(f"USSD Request - Session: {session_id}, Phone: {msisdn}, Input: '{user_input}', New: {is_new}")
 
-        # Process request
-        result = process_ussd_request(session_id, msisdn, user_input, is_new)
+        # Process request, timed by the state the session was in
+        current = None if is_new else sessions.get(session_id)
+        state = current.state if current else 'start'
+        with USSD_HOP_SECONDS.labels(state).time():
+            result = process_ussd_request(session_id, msisdn, user_input, is_new)
+        USSD_HOPS.labels(state).inc()
 
         # Return response in expected format
         response = {
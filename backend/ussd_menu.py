@@ -0,0 +1,339 @@
+"""
+Declarative USSD menu engine
+
+A flow is a dict of states keyed by the step name stored on the session.
+MenuEngine compiles it once at startup: the names of validators, guards,
+actions, data sources and template slots are resolved to bound methods of a
+handler object, prompts without slots are kept as ready strings, and
+templated prompts keep their parsed slot list. A hop is then one dict lookup
+and one call, and a new flow (payments, polls, ...) is a new set of states
+and handler methods, with no change to the router.
+
+State types:
+
+    menu    numbered options; each option is {"goto": state},
+            {"action": name} or {"end": text}
+    input   free text stored in session_data[field]; optional "validate"
+            (returns the cleaned value or raises ValueError) and "guard"
+            (returns a response to stop the flow, or None)
+    choice  fixed options mapped to stored values
+    list    items from a data source (optionally keyed by a parent field),
+            paged to fit one screen and stored as the chosen item's id
+
+input, choice and list states continue to "next" (a state) or "action"
+(a handler returning (text, end)). Prompts may contain {slots}: a list
+state fills {menu} itself, any other slot is read from slot_<name>().
+
+The handler object also provides advance(session, step, **data), and a
+session exposes current_step and session_data.
+
+Flows: backend.ussd_service (USSD_FLOW) and the Flask gateway
+(backend/ussd_gateway.py, GATEWAY_FLOW). api/api/ussd_service.py is a
+vendored copy of another application's service, whose app package is not in
+this tree, and keeps its own router.
+"""
+import os
+import string
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+Response = Tuple[str, bool]
+
+SESSION_ERROR = "Session error. Please try again."
+
+# Longest screen the operator delivers, in bytes
+USSD_MAX_RESPONSE_LENGTH = int(os.getenv("USSD_MAX_RESPONSE_LENGTH", "182"))
+# How long a list's items and page layout are reused before re-querying
+USSD_MENU_CACHE_TTL = int(os.getenv("USSD_MENU_CACHE_TTL", "300"))
+# Most page layouts kept per list state (one per parent and language)
+USSD_MENU_CACHE_SIZE = int(os.getenv("USSD_MENU_CACHE_SIZE", "512"))
+
+DEFAULT_LANGUAGE = "en"
+MORE, BACK = "98", "0"
+NAV_LABELS = {
+    "en": {"more": "More", "back": "Back"},
+}
+
+
+def screen_size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def fit_screen(text: str, limit: int = USSD_MAX_RESPONSE_LENGTH) -> str:
+    """Shorten a response to one screen, cutting at a line or word break rather than mid-word"""
+    if screen_size(text) <= limit:
+        return text
+    cut = text.encode("utf-8")[:limit - 3].decode("utf-8", "ignore")
+    # Prefer dropping whole menu lines, then whole words
+    for separator in ("\n", " "):
+        end = cut.rfind(separator)
+        if end > 0:
+            return cut[:end].rstrip() + "..."
+    return cut + "..."
+
+
+class MenuSessionError(Exception):
+    """Raised by handlers when the session cannot continue; ends the dialogue"""
+
+
+class FlowDefinitionError(Exception):
+    """Raised when a flow refers to a missing state or handler"""
+
+
+class Screen:
+    """A prompt: a ready string when static, otherwise a template and its slots"""
+
+    def __init__(self, template: str, resolve: Callable[[str], Callable]):
+        self.template = template
+        self.slots = [name for _, name, _, _ in string.Formatter().parse(template) if name]
+        self.static = None if self.slots else template
+        self.providers = {name: resolve(f"slot_{name}") for name in self.slots if name != "menu"}
+
+    def render(self, session, db, **values) -> str:
+        if self.static is not None:
+            return self.static
+        for name, provider in self.providers.items():
+            if name not in values:
+                values[name] = provider(session, db)
+        return self.template.format(**values)
+
+
+class Node(ABC):
+    def __init__(self, engine: "MenuEngine", name: str, spec: Dict):
+        self.engine = engine
+        self.name = name
+        self.spec = spec
+        self.prompt = Screen(spec.get("prompt", ""), engine.resolve)
+        self.invalid = spec.get("invalid", "Invalid choice. Please try again.")
+
+    def link(self) -> None:
+        """Resolve transitions once every state exists"""
+        self.proceed = self.engine.transition(self.spec, self.name)
+
+    def enter(self, session, db, **slots) -> str:
+        return self.prompt.render(session, db, **slots)
+
+    @abstractmethod
+    def handle(self, session, user_input: str, db) -> Response:
+        """Answer the user's input while the session is in this state"""
+
+
+class MenuNode(Node):
+    def link(self) -> None:
+        self.options = {
+            key: self.engine.transition(option, f"{self.name}[{key}]")
+            for key, option in self.spec["options"].items()
+        }
+
+    def handle(self, session, user_input, db):
+        option = self.options.get(user_input)
+        if option is None:
+            return self.invalid + "\n\n" + self.enter(session, db), False
+        return option(session, db)
+
+
+class InputNode(Node):
+    def link(self) -> None:
+        super().link()
+        self.field = self.spec.get("field")
+        self.validate = self.engine.resolve(self.spec["validate"]) if "validate" in self.spec else None
+        self.guard = self.engine.resolve(self.spec["guard"]) if "guard" in self.spec else None
+
+    def handle(self, session, user_input, db):
+        value = user_input
+        if self.validate:
+            try:
+                value = self.validate(user_input)
+            except ValueError:
+                return self.invalid, False
+        if self.guard:
+            stop = self.guard(session, value, db)
+            if stop is not None:
+                return stop
+        return self.proceed(session, db, **({self.field: value} if self.field else {}))
+
+
+class ChoiceNode(Node):
+    def link(self) -> None:
+        super().link()
+        self.field = self.spec["field"]
+        self.values = dict(self.spec["options"])
+
+    def handle(self, session, user_input, db):
+        if user_input not in self.values:
+            return self.invalid, False
+        return self.proceed(session, db, **{self.field: self.values[user_input]})
+
+
+class Page(NamedTuple):
+    """One screen of a list and the items it numbers from 1"""
+    screen: str
+    items: List[Dict]
+
+
+class ListNode(Node):
+    """
+    A numbered pick list split into pages that fit one USSD screen
+
+    Items are numbered from 1 on every page, so their numbers never reach
+    the navigation keys: "98" moves to the next page and "0" to the previous
+    one. Page breaks are computed once per list (a parent and a language)
+    and cached with the items, so paging and choosing cost no database work;
+    the least recently used layouts are dropped past USSD_MENU_CACHE_SIZE.
+    """
+
+    def link(self) -> None:
+        super().link()
+        self.field = self.spec["field"]
+        self.parent = self.spec.get("parent")
+        self.source = self.engine.resolve(self.spec["source"])
+        self.empty = self.spec.get("empty", "Nothing to choose from")
+        self.not_number = self.spec.get("not_number", "Invalid choice. Enter number only.")
+        if set(self.prompt.slots) - {"menu"}:
+            raise FlowDefinitionError(f"List state '{self.name}' can only use the {{menu}} slot")
+        self.head, _, self.tail = self.prompt.template.partition("{menu}")
+        self._lock = threading.Lock()
+        self.layouts: "OrderedDict[Tuple, Tuple[float, List[Page]]]" = OrderedDict()
+
+    def layout(self, session, db) -> List[Page]:
+        """The rendered pages of the list this session is choosing from"""
+        session_data = session.session_data or {}
+        parent_id = session_data.get(self.parent) if self.parent else None
+        key = (parent_id, session_data.get("language", DEFAULT_LANGUAGE))
+        with self._lock:
+            cached = self.layouts.get(key)
+            if cached and cached[0] > time.monotonic():
+                self.layouts.move_to_end(key)
+                return cached[1]
+
+        items = self.source(parent_id, db) if self.parent else self.source(db)
+        pages = self.paginate(items, key[1])
+        if items:
+            # Empty results are not cached: they are usually a failed query
+            with self._lock:
+                self.layouts[key] = (time.monotonic() + USSD_MENU_CACHE_TTL, pages)
+                self.layouts.move_to_end(key)
+                while len(self.layouts) > USSD_MENU_CACHE_SIZE:
+                    self.layouts.popitem(last=False)
+        return pages
+
+    def paginate(self, items: List[Dict], language: str) -> List[Page]:
+        if not items:
+            return [Page(self.head + self.empty + self.tail, [])]
+
+        labels = NAV_LABELS.get(language, NAV_LABELS[DEFAULT_LANGUAGE])
+        more, back = f"{MORE}. {labels['more']}\n", f"{BACK}. {labels['back']}\n"
+        fixed = screen_size(self.head + self.tail)
+        pages = []
+        start = 0
+        while start < len(items):
+            body, size, end = "", fixed + (screen_size(back) if pages else 0), start
+            while end < len(items) and end - start + 1 < int(MORE):
+                line = f"{end - start + 1}. {items[end]['name']}\n"
+                # Room for "More" is kept unless this is the last item
+                reserve = screen_size(more) if end + 1 < len(items) else 0
+                if body and size + screen_size(line) + reserve > USSD_MAX_RESPONSE_LENGTH:
+                    break
+                body += line
+                size += screen_size(line)
+                end += 1
+            nav = (more if end < len(items) else "") + (back if pages else "")
+            pages.append(Page(self.head + (body + nav).rstrip("\n") + self.tail, items[start:end]))
+            start = end
+        return pages
+
+    def enter(self, session, db, **slots):
+        if (session.session_data or {}).get("menu_page"):
+            self.engine.handlers.advance(session, self.name, menu_page=0)
+        return self.layout(session, db)[0].screen
+
+    def handle(self, session, user_input, db):
+        pages = self.layout(session, db)
+        page = min((session.session_data or {}).get("menu_page", 0), len(pages) - 1)
+        if user_input == MORE and page + 1 < len(pages):
+            self.engine.handlers.advance(session, self.name, menu_page=page + 1)
+            return pages[page + 1].screen, False
+        if user_input == BACK and page > 0:
+            self.engine.handlers.advance(session, self.name, menu_page=page - 1)
+            return pages[page - 1].screen, False
+
+        try:
+            index = int(user_input) - 1
+        except ValueError:
+            return self.not_number, False
+        items = pages[page].items
+        if not 0 <= index < len(items):
+            return self.invalid, False
+        return self.proceed(session, db, **{self.field: items[index]["id"]})
+
+
+NODE_TYPES = {"menu": MenuNode, "input": InputNode, "choice": ChoiceNode, "list": ListNode}
+
+
+class MenuEngine:
+    def __init__(self, flow: Dict[str, Dict], handlers):
+        self.handlers = handlers
+        self.nodes: Dict[str, Node] = {}
+        for name, spec in flow.items():
+            node_type = NODE_TYPES.get(spec.get("type"))
+            if node_type is None:
+                raise FlowDefinitionError(f"State '{name}' has unknown type {spec.get('type')!r}")
+            self.nodes[name] = node_type(self, name, spec)
+        for node in self.nodes.values():
+            node.link()
+
+    def resolve(self, name: str) -> Callable:
+        handler = getattr(self.handlers, name, None)
+        if not callable(handler):
+            raise FlowDefinitionError(f"Flow handler '{name}' is not defined")
+        return handler
+
+    def transition(self, spec: Dict, where: str) -> Callable[..., Response]:
+        """Compile a next/action/end/goto spec into fn(session, db, **data) -> response"""
+        if "next" in spec or "goto" in spec:
+            target = spec.get("next") or spec.get("goto")
+            if target not in self.nodes:
+                raise FlowDefinitionError(f"{where} continues to unknown state '{target}'")
+            node = self.nodes[target]
+            advance = self.handlers.advance
+            if node.prompt.static is not None and type(node).enter is Node.enter:
+                # Static screen: the response is fixed when the flow is compiled
+                screen = (node.prompt.static, False)
+
+                def go(session, db, **data):
+                    advance(session, target, **data)
+                    return screen
+            else:
+                def go(session, db, **data):
+                    advance(session, target, **data)
+                    return node.enter(session, db), False
+            return go
+        if "action" in spec:
+            action = self.resolve(spec["action"])
+
+            def run(session, db, **data):
+                if data:
+                    self.handlers.advance(session, session.current_step, **data)
+                return action(session, db)
+            return run
+        if "end" in spec:
+            text = spec["end"]
+            return lambda session, db, **data: (text, True)
+        raise FlowDefinitionError(f"{where} has no next, goto, action or end")
+
+    def enter(self, step: str, session, db, slots: Optional[Dict] = None, **data) -> str:
+        """Move the session to `step` (storing `data`) and render its prompt; `slots` prefills template slots"""
+        self.handlers.advance(session, step, **data)
+        return self.nodes[step].enter(session, db, **(slots or {}))
+
+    def handle(self, session, user_input: str, db) -> Response:
+        node = self.nodes.get(session.current_step)
+        if node is None:
+            return SESSION_ERROR, True
+        try:
+            return node.handle(session, user_input, db)
+        except MenuSessionError:
+            return SESSION_ERROR, True
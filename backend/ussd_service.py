@@ -8,17 +8,133 @@ import logging
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from backend.models import Member, USSDSession, Province, District, Constituency, Ward, User
-import hashlib
+from backend.models import Member, USSDSession, Province, District, Constituency, Ward
+from backend.services.member_service import MemberService
+from backend.services.ussd_session_service import USSDSessionLifecycle
+from backend.ussd_menu import MenuEngine, MenuSessionError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Dialogue definition: one entry per session step; see backend.ussd_menu for
+# the state types. Handler names refer to USSDService methods.
+USSD_FLOW: Dict[str, Dict] = {
+    "main_menu": {
+        "type": "menu",
+        "prompt": "Welcome {name}!\n\nADD Zambia Menu\n\n1. Check my details\n2. Update contact\n0. Exit",
+        "options": {
+            "1": {"action": "show_own_details"},
+            "2": {"goto": "update_contact"},
+            "0": {"end": "Thank you for using ADD Zambia USSD service"},
+        },
+    },
+
+    # Registration
+    "register_nrc": {
+        "type": "input",
+        "prompt": "Enter your NRC number:\n(Format: 123456/78/9)",
+        "field": "nrc",
+        "validate": "validate_nrc",
+        "invalid": "Invalid NRC format.\nPlease enter your NRC:\n(Format: 123456/78/9)",
+        "guard": "nrc_not_registered",
+        "next": "register_voter_id",
+    },
+    "register_voter_id": {
+        "type": "input",
+        "prompt": "Enter your Voter ID Number:",
+        "field": "voters_id",
+        "validate": "validate_voters_id",
+        "invalid": "Invalid Voter ID.\nPlease enter your Voter ID Number:",
+        "guard": "voters_id_not_registered",
+        "next": "register_name",
+    },
+    "register_name": {
+        "type": "input",
+        "prompt": "Enter your full name:",
+        "field": "name",
+        "next": "register_gender",
+    },
+    "register_gender": {
+        "type": "choice",
+        "prompt": "Select gender:\n1. Male\n2. Female",
+        "field": "gender",
+        "options": {"1": "Male", "2": "Female"},
+        "invalid": "Invalid choice.\nSelect gender:\n1. Male\n2. Female",
+        "next": "register_dob",
+    },
+    "register_dob": {
+        "type": "input",
+        "prompt": "Enter date of birth:\n(Format: DD/MM/YYYY)\nExample: 15/05/1990",
+        "field": "date_of_birth",
+        "validate": "validate_date_of_birth",
+        "invalid": "Invalid date format.\nEnter date of birth:\n(DD/MM/YYYY)\nExample: 15/05/1990",
+        "next": "register_province",
+    },
+    "register_province": {
+        "type": "list",
+        "prompt": "Select your province:\n{menu}",
+        "source": "get_provinces",
+        "field": "province_id",
+        "empty": "Error loading provinces",
+        "invalid": "Invalid choice. Try again.",
+        "next": "register_district",
+    },
+    "register_district": {
+        "type": "list",
+        "prompt": "Select your district:\n{menu}",
+        "source": "get_districts",
+        "parent": "province_id",
+        "field": "district_id",
+        "empty": "Error loading districts",
+        "invalid": "Invalid choice. Try again.",
+        "next": "register_constituency",
+    },
+    "register_constituency": {
+        "type": "list",
+        "prompt": "Select your constituency:\n{menu}",
+        "source": "get_constituencies",
+        "parent": "district_id",
+        "field": "constituency_id",
+        "empty": "Error loading constituencies",
+        "invalid": "Invalid choice. Try again.",
+        "next": "register_ward",
+    },
+    "register_ward": {
+        "type": "list",
+        "prompt": "Select your ward:\n{menu}",
+        "source": "get_wards",
+        "parent": "constituency_id",
+        "field": "ward_id",
+        "empty": "Error loading wards",
+        "invalid": "Invalid choice. Try again.",
+        "action": "create_member",
+    },
+
+    # Status check
+    "check_nrc": {
+        "type": "input",
+        "prompt": "Enter NRC number:",
+        "field": "check_nrc",
+        "action": "check_status",
+    },
+
+    # Update information
+    "update_contact": {
+        "type": "input",
+        "prompt": "Current contact: {contact}\n\nEnter new contact number:\n(Format: 0971234567)",
+        "field": "new_contact",
+        "validate": "validate_phone",
+        "invalid": "Invalid phone number.\nEnter phone number:\n(Format: 0971234567)",
+        "action": "update_contact",
+    },
+}
+
 
 class USSDService:
     """USSD Service Handler for ADD Zambia"""
 
-    def __init__(self):
+    def __init__(self, flow: Dict[str, Dict] = None):
+        self.menu = MenuEngine(flow or USSD_FLOW, self)
         logger.info("USSD Service initialized")
 
     def get_or_create_session(self, session_id: str, phone_number: str, db: Session) -> USSDSession:
@@ -36,13 +152,18 @@ class USSDService:
                 session_data={}
             )
             db.add(session)
-            db.commit()
             logger.info(f"[USSD] New session created: {session_id}")
 
         return session
 
     def handle_request(self, session_id: str, phone_number: str, text: str, db: Session) -> Tuple[str, bool]:
-        """Main USSD request handler"""
+        """
+        Main USSD request handler
+
+        Each hop is one transaction: handlers only change the session (and a
+        member they create or update) in memory, and the commit below writes
+        the session row once with its new step and data.
+        """
         session = self.get_or_create_session(session_id, phone_number, db)
 
         # Parse user input (last part after *)
@@ -54,251 +175,102 @@ class USSDService:
                           not session.session_data)
 
         if is_new_session:
-            # Check if phone number is registered (by contact field)
-            existing_member = db.query(Member).filter(Member.contact == phone_number).first()
-
-            # Also check in users table
-            existing_user = db.query(User).filter(User.phone == phone_number).first()
-
-            if existing_member or existing_user:
-                # User is registered
-                member = existing_member if existing_member else (
-                    db.query(Member).filter(Member.id == existing_user.member_id).first() if existing_user and existing_user.member_id else None
-                )
-
-                if member:
-                    session.session_data = {"member_id": str(member.id)}
-                    db.commit()
-                    return self.show_main_menu(session, member, db)
-                else:
-                    # User exists but no member record
-                    session.current_step = "register_nrc"
-                    session.session_data = {}
-                    db.commit()
-                    response_text = "Welcome to ADD Zambia!\n\nLet's complete your registration.\n\nEnter your NRC number:\n(Format: 123456/78/9)"
-                    return response_text, False
-            else:
-                # User is not registered - start registration
-                session.current_step = "register_nrc"
-                session.session_data = {}
-                db.commit()
-                response_text = "Welcome to ADD Zambia!\n\nYou are not registered.\nLet's register you.\n\nEnter your NRC number:\n(Format: 123456/78/9)"
-                return response_text, False
-
-        # Route to appropriate handler based on current step
-        if session.current_step == "main_menu":
-            response_text, end_session = self.handle_main_menu(session, user_input, db)
-        elif session.current_step.startswith("register_"):
-            response_text, end_session = self.handle_registration(session, user_input, db)
-        elif session.current_step.startswith("check_"):
-            response_text, end_session = self.handle_status_check(session, user_input, db)
-        elif session.current_step.startswith("update_"):
-            response_text, end_session = self.handle_update_info(session, user_input, db)
+            response_text, end_session = self.start_session(session, phone_number, db)
         else:
-            response_text = "Session error. Please try again."
-            end_session = True
+            response_text, end_session = self.menu.handle(session, user_input, db)
 
-        # Update session
+        # Update session; a finished session leaves the hot table
         session.updated_at = datetime.utcnow()
         if end_session:
-            session.is_active = False
+            USSDSessionLifecycle.finish(db, session)
         db.commit()
 
         return response_text, end_session
 
-    def show_main_menu(self, session: USSDSession, member: Member, db: Session) -> Tuple[str, bool]:
-        """Display main menu"""
-        session.current_step = "main_menu"
-        db.commit()
+    def advance(self, session: USSDSession, step: str, **data) -> None:
+        """
+        Move the session to `step`, merging `data` into its session_data
 
-        menu = f"Welcome {member.name}!\n\n"
-        menu += "ADD Zambia Menu\n\n"
-        menu += "1. Check my details\n"
-        menu += "2. Update contact\n"
-        menu += "0. Exit"
+        A new dict is assigned because in-place changes to a JSON column are
+        not tracked and would be lost at commit.
+        """
+        session.current_step = step
+        if data:
+            session.session_data = {**(session.session_data or {}), **data}
 
-        return menu, False
+    def start_session(self, session: USSDSession, phone_number: str, db: Session) -> Tuple[str, bool]:
+        """First hop: recognise the caller and show the menu or start registration"""
+        # Check if phone number is registered (member contact or user account)
+        registered, member = MemberService.recognise_phone(db, phone_number)
 
-    def handle_main_menu(self, session: USSDSession, choice: str, db: Session) -> Tuple[str, bool]:
-        """Handle main menu selection"""
-        session_data = session.session_data or {}
-        member_id = session_data.get("member_id")
-        member = db.query(Member).filter(Member.id == member_id).first() if member_id else None
+        if member:
+            session.session_data = {"member_id": str(member.id)}
+            return self.show_main_menu(session, member, db)
 
-        if choice == "1":
-            # Check member details
-            if member:
-                return self.show_member_details(member, db), True
-            else:
-                return "Session error. Please try again.", True
-
-        elif choice == "2":
-            # Update contact
-            if member:
-                session.current_step = "update_contact"
-                db.commit()
-                response = f"Current contact: {member.contact}\n\n"
-                response += "Enter new contact number:\n(Format: 0971234567)"
-                return response, False
-            else:
-                return "Session error. Please try again.", True
-
-        elif choice == "0":
-            return "Thank you for using ADD Zambia USSD service", True
+        session.session_data = {}
+        prompt = self.menu.enter("register_nrc", session, db)
+        if registered:
+            # User exists but no member record
+            return "Welcome to ADD Zambia!\n\nLet's complete your registration.\n\n" + prompt, False
 
-        else:
-            return "Invalid choice. Please try again.\n\n" + self.show_main_menu(session, member, db)[0], False
-
-    # ==================== REGISTRATION FLOW ====================
-
-    def handle_registration(self, session: USSDSession, user_input: str, db: Session) -> Tuple[str, bool]:
-        """Handle registration steps"""
-        step = session.current_step
-        session_data = session.session_data or {}
-
-        if step == "register_nrc":
-            # Validate NRC format
-            if len(user_input) < 6:
-                return "Invalid NRC format.\nPlease enter your NRC:\n(Format: 123456/78/9)", False
-
-            # Check if already registered
-            existing = db.query(Member).filter(Member.nrc == user_input).first()
-            if existing:
-                return f"NRC already registered!\nMember: {existing.name}\n\nThank you!", True
-
-            session_data["nrc"] = user_input
-            session.session_data = session_data
-            session.current_step = "register_voter_id"
-            db.commit()
-            return "Enter your Voter ID Number:", False
-
-        elif step == "register_voter_id":
-            # Validate voter ID
-            if len(user_input) < 4:
-                return "Invalid Voter ID.\nPlease enter your Voter ID Number:", False
-
-            # Check if already registered
-            existing = db.query(Member).filter(Member.voters_id == user_input).first()
-            if existing:
-                return f"Voter ID already registered!\nMember: {existing.name}\n\nThank you!", True
-
-            session_data["voters_id"] = user_input
-            session.session_data = session_data
-            session.current_step = "register_name"
-            db.commit()
-            return "Enter your full name:", False
-
-        elif step == "register_name":
-            session_data["name"] = user_input
-            session.session_data = session_data
-            session.current_step = "register_gender"
-            db.commit()
-            return "Select gender:\n1. Male\n2. Female", False
-
-        elif step == "register_gender":
-            if user_input == "1":
-                session_data["gender"] = "Male"
-            elif user_input == "2":
-                session_data["gender"] = "Female"
-            else:
-                return "Invalid choice.\nSelect gender:\n1. Male\n2. Female", False
-
-            session.session_data = session_data
-            session.current_step = "register_dob"
-            db.commit()
-            return "Enter date of birth:\n(Format: DD/MM/YYYY)\nExample: 15/05/1990", False
-
-        elif step == "register_dob":
-            # Basic validation
-            try:
-                dob = datetime.strptime(user_input, "%d/%m/%Y").date()
-                session_data["date_of_birth"] = user_input
-                session.session_data = session_data
-                session.current_step = "register_province"
-                db.commit()
-
-                # Fetch provinces
-                provinces_text = self.get_provinces_menu(db)
-                return f"Select your province:\n{provinces_text}", False
-            except:
-                return "Invalid date format.\nEnter date of birth:\n(DD/MM/YYYY)\nExample: 15/05/1990", False
-
-        elif step == "register_province":
-            # Store province choice and fetch districts
-            provinces = self.get_provinces(db)
-            try:
-                province_index = int(user_input) - 1
-                if 0 <= province_index < len(provinces):
-                    selected_province = provinces[province_index]
-                    session_data["province_id"] = selected_province["id"]
-                    session.session_data = session_data
-                    session.current_step = "register_district"
-                    db.commit()
-
-                    districts_text = self.get_districts_menu(selected_province["id"], db)
-                    return f"Select your district:\n{districts_text}", False
-                else:
-                    return "Invalid choice. Try again.", False
-            except:
-                return "Invalid choice. Enter number only.", False
-
-        elif step == "register_district":
-            # Store district and fetch constituencies
-            districts = self.get_districts(session_data.get("province_id"), db)
-            try:
-                district_index = int(user_input) - 1
-                if 0 <= district_index < len(districts):
-                    selected_district = districts[district_index]
-                    session_data["district_id"] = selected_district["id"]
-                    session.session_data = session_data
-                    session.current_step = "register_constituency"
-                    db.commit()
-
-                    constituencies_text = self.get_constituencies_menu(selected_district["id"], db)
-                    return f"Select your constituency:\n{constituencies_text}", False
-                else:
-                    return "Invalid choice. Try again.", False
-            except:
-                return "Invalid choice. Enter number only.", False
-
-        elif step == "register_constituency":
-            # Store constituency and fetch wards
-            constituencies = self.get_constituencies(session_data.get("district_id"), db)
-            try:
-                constituency_index = int(user_input) - 1
-                if 0 <= constituency_index < len(constituencies):
-                    selected_constituency = constituencies[constituency_index]
-                    session_data["constituency_id"] = selected_constituency["id"]
-                    session.session_data = session_data
-                    session.current_step = "register_ward"
-                    db.commit()
-
-                    wards_text = self.get_wards_menu(selected_constituency["id"], db)
-                    return f"Select your ward:\n{wards_text}", False
-                else:
-                    return "Invalid choice. Try again.", False
-            except:
-                return "Invalid choice. Enter number only.", False
-
-        elif step == "register_ward":
-            # Store ward and create member
-            wards = self.get_wards(session_data.get("constituency_id"), db)
-            try:
-                ward_index = int(user_input) - 1
-                if 0 <= ward_index < len(wards):
-                    selected_ward = wards[ward_index]
-                    session_data["ward_id"] = selected_ward["id"]
-                    session.session_data = session_data
-
-                    # Create member
-                    return self.create_member(session, db)
-                else:
-                    return "Invalid choice. Try again.", False
-            except Exception as e:
-                logger.error(f"[USSD] Registration error: {e}")
-                return "Error. Please try again.", False
-
-        return "Error in registration. Please start again.", True
+        # User is not registered - start registration
+        return "Welcome to ADD Zambia!\n\nYou are not registered.\nLet's register you.\n\n" + prompt, False
+
+    def show_main_menu(self, session: USSDSession, member: Member, db: Session) -> Tuple[str, bool]:
+        """Display main menu"""
+        return self.menu.enter("main_menu", session, db, slots={"name": member.name}), False
+
+    # ==================== FLOW HANDLERS ====================
+    # Referred to by name from USSD_FLOW and resolved once when the engine
+    # is built, so a typo fails at startup rather than mid-dialogue
+
+    def session_member(self, session: USSDSession, db: Session) -> Member:
+        member_id = (session.session_data or {}).get("member_id")
+        member = db.query(Member).filter(Member.id == member_id).first() if member_id else None
+        if not member:
+            raise MenuSessionError()
+        return member
+
+    def slot_name(self, session: USSDSession, db: Session) -> str:
+        return self.session_member(session, db).name
+
+    def slot_contact(self, session: USSDSession, db: Session) -> str:
+        return self.session_member(session, db).contact
+
+    def validate_nrc(self, value: str) -> str:
+        if len(value) < 6:
+            raise ValueError(value)
+        return value
+
+    def validate_voters_id(self, value: str) -> str:
+        if len(value) < 4:
+            raise ValueError(value)
+        return value
+
+    def validate_date_of_birth(self, value: str) -> str:
+        datetime.strptime(value, "%d/%m/%Y")
+        return value
+
+    def validate_phone(self, value: str) -> str:
+        clean_phone = ''.join(c for c in value if c.isdigit())
+        if len(clean_phone) < 9 or len(clean_phone) > 15:
+            raise ValueError(value)
+        return clean_phone
+
+    def nrc_not_registered(self, session: USSDSession, nrc: str, db: Session) -> Optional[Tuple[str, bool]]:
+        existing = db.query(Member).filter(Member.nrc == nrc).first()
+        if existing:
+            return f"NRC already registered!\nMember: {existing.name}\n\nThank you!", True
+        return None
+
+    def voters_id_not_registered(self, session: USSDSession, voters_id: str, db: Session) -> Optional[Tuple[str, bool]]:
+        existing = db.query(Member).filter(Member.voters_id == voters_id).first()
+        if existing:
+            return f"Voter ID already registered!\nMember: {existing.name}\n\nThank you!", True
+        return None
+
+    def show_own_details(self, session: USSDSession, db: Session) -> Tuple[str, bool]:
+        return self.show_member_details(self.session_member(session, db), db), True
 
     def create_member(self, session: USSDSession, db: Session) -> Tuple[str, bool]:
         """Create new member from session data"""
@@ -322,8 +294,7 @@ class USSDService:
             )
 
             db.add(new_member)
-            db.commit()
-            db.refresh(new_member)
+            db.flush()  # assigns the id; committed with the hop
 
             # Get ward details for display
             ward = db.query(Ward).filter(Ward.id == new_member.ward_id).first()
@@ -340,24 +311,19 @@ class USSDService:
             return response, True
 
         except Exception as e:
+            db.rollback()
             logger.error(f"[USSD] Member creation error: {e}")
             return "Registration failed. Please try again later.", True
 
-    # ==================== STATUS CHECK FLOW ====================
-
-    def handle_status_check(self, session: USSDSession, user_input: str, db: Session) -> Tuple[str, bool]:
+    def check_status(self, session: USSDSession, db: Session) -> Tuple[str, bool]:
         """Handle membership status check"""
-        session_data = session.session_data or {}
-
-        if session.current_step == "check_nrc":
-            member = db.query(Member).filter(Member.nrc == user_input).first()
+        nrc = session.session_data.get("check_nrc")
+        member = db.query(Member).filter(Member.nrc == nrc).first()
 
-            if not member:
-                return f"Member with NRC {user_input} not found.", True
+        if not member:
+            return f"Member with NRC {nrc} not found.", True
 
-            return self.show_member_details(member, db), True
-
-        return "Error checking status.", True
+        return self.show_member_details(member, db), True
 
     def show_member_details(self, member: Member, db: Session) -> str:
         """Display member details"""
@@ -381,38 +347,17 @@ class USSDService:
 
         return response
 
-    # ==================== UPDATE INFORMATION FLOW ====================
-
-    def handle_update_info(self, session: USSDSession, user_input: str, db: Session) -> Tuple[str, bool]:
-        """Handle information update flow"""
-        step = session.current_step
-        session_data = session.session_data or {}
-
-        if step == "update_contact":
-            # Validate and update contact
-            member_id = session_data.get("member_id")
-            member = db.query(Member).filter(Member.id == member_id).first()
-
-            if not member:
-                return "Session error. Please try again.", True
+    def update_contact(self, session: USSDSession, db: Session) -> Tuple[str, bool]:
+        """Store the new contact number entered on the update_contact step"""
+        member = self.session_member(session, db)
+        clean_phone = session.session_data.get("new_contact")
 
-            # Clean phone number
-            clean_phone = ''.join(c for c in user_input if c.isdigit())
+        member.contact = clean_phone
+        member.updated_at = datetime.utcnow()
 
-            # Validate length
-            if len(clean_phone) < 9 or len(clean_phone) > 15:
-                return "Invalid phone number.\nEnter phone number:\n(Format: 0971234567)", False
+        logger.info(f"[USSD] Contact updated for member {member.name}: {clean_phone}")
 
-            # Update contact
-            member.contact = clean_phone
-            member.updated_at = datetime.utcnow()
-            db.commit()
-
-            logger.info(f"[USSD] Contact updated for member {member.name}: {clean_phone}")
-
-            return f"Contact updated successfully!\n\nNew contact: {clean_phone}\n\nThank you!", True
-
-        return "Update error. Please try again.", True
+        return f"Contact updated successfully!\n\nNew contact: {clean_phone}\n\nThank you!", True
 
     # ==================== GEOGRAPHY HELPERS ====================
 
@@ -425,17 +370,6 @@ class USSDService:
             logger.error(f"[USSD] Database error fetching provinces: {e}")
             return []
 
-    def get_provinces_menu(self, db: Session) -> str:
-        """Get formatted provinces menu"""
-        provinces = self.get_provinces(db)
-        if not provinces:
-            return "Error loading provinces"
-
-        menu = ""
-        for idx, province in enumerate(provinces[:10], 1):  # Limit to 10
-            menu += f"{idx}. {province['name']}\n"
-        return menu
-
     def get_districts(self, province_id: int, db: Session) -> list:
         """Fetch districts for a province from database"""
         try:
@@ -447,17 +381,6 @@ class USSDService:
             logger.error(f"[USSD] Database error fetching districts: {e}")
             return []
 
-    def get_districts_menu(self, province_id: int, db: Session) -> str:
-        """Get formatted districts menu"""
-        districts = self.get_districts(province_id, db)
-        if not districts:
-            return "Error loading districts"
-
-        menu = ""
-        for idx, district in enumerate(districts[:10], 1):
-            menu += f"{idx}. {district['name']}\n"
-        return menu
-
     def get_constituencies(self, district_id: int, db: Session) -> list:
         """Fetch constituencies for a district from database"""
         try:
@@ -469,17 +392,6 @@ class USSDService:
             logger.error(f"[USSD] Database error fetching constituencies: {e}")
             return []
 
-    def get_constituencies_menu(self, district_id: int, db: Session) -> str:
-        """Get formatted constituencies menu"""
-        constituencies = self.get_constituencies(district_id, db)
-        if not constituencies:
-            return "Error loading constituencies"
-
-        menu = ""
-        for idx, constituency in enumerate(constituencies[:10], 1):
-            menu += f"{idx}. {constituency['name']}\n"
-        return menu
-
     def get_wards(self, constituency_id: int, db: Session) -> list:
         """Fetch wards for a constituency from database"""
         try:
@@ -491,17 +403,6 @@ class USSDService:
             logger.error(f"[USSD] Database error fetching wards: {e}")
             return []
 
-    def get_wards_menu(self, constituency_id: int, db: Session) -> str:
-        """Get formatted wards menu"""
-        wards = self.get_wards(constituency_id, db)
-        if not wards:
-            return "Error loading wards"
-
-        menu = ""
-        for idx, ward in enumerate(wards[:10], 1):
-            menu += f"{idx}. {ward['name']}\n"
-        return menu
-
 
 # Create global instance
 ussd_service = USSDService()
@@ -0,0 +1,6 @@
+"""
+Shared helpers
+"""
+from .phone import stored_forms, to_e164
+
+__all__ = ["stored_forms", "to_e164"]
@@ -0,0 +1,90 @@
+"""
+Registration form documents
+
+Field offices type the paper registration forms into Word: a header naming
+the location ("Province: Lusaka  District: Lusaka  Ward: Kamwala") followed
+by numbered member tables. Only word/document.xml is read, through compiled
+XPath expressions, instead of building python-docx's object model for every
+cell. Nothing from the application is imported here, so the parsers are
+cheap to load in spawned worker processes.
+"""
+import io
+import re
+import time
+import zipfile
+from typing import List, NamedTuple
+
+from lxml import etree
+
+# Table columns after the row number: No., Name, Gender, Age, NRC, Voter ID, Phone
+FORM_FIELDS = ("name", "gender", "age", "nrc", "voters_id", "contact")
+LOCATION_FIELDS = ("province", "district", "constituency", "ward")
+
+# "Province: North Western  District: Solwezi" -> each label with the text up to the next label
+LOCATION_PATTERN = re.compile(
+    r"\b(province|district|constituency|ward)\s*:\s*(.*?)\s*(?=\b(?:province|district|constituency|ward)\s*:|$)",
+    re.IGNORECASE
+)
+
+# Uploaded XML: no external entities or network lookups
+_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+_NAMESPACES = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+_PARAGRAPHS = etree.XPath("w:body/w:p", namespaces=_NAMESPACES)
+_TABLES = etree.XPath("w:body/w:tbl", namespaces=_NAMESPACES)
+_ROWS = etree.XPath("w:tr", namespaces=_NAMESPACES)
+_CELLS = etree.XPath("w:tc", namespaces=_NAMESPACES)
+_TEXT = etree.XPath(".//w:t/text()", namespaces=_NAMESPACES)
+
+
+class FormDocument(NamedTuple):
+    name: str
+    rows: List[list]
+    seconds: float
+
+
+def parse_form(source) -> List[list]:
+    """
+    Member rows of one form document (a path or file object)
+
+    Each row holds FORM_FIELDS then LOCATION_FIELDS, the location being the
+    first value given for each label in the document's header paragraphs.
+    """
+    with zipfile.ZipFile(source) as document:
+        root = etree.fromstring(document.read("word/document.xml"), _PARSER)
+
+    location = dict.fromkeys(LOCATION_FIELDS)
+    for paragraph in _PARAGRAPHS(root):
+        for label, value in LOCATION_PATTERN.findall("".join(_TEXT(paragraph))):
+            # Blank forms leave "Ward: ______" to be filled in
+            value = value.strip(" ._-")
+            if value and location[label.lower()] is None:
+                location[label.lower()] = value
+
+    rows = []
+    for table in _TABLES(root):
+        for row in _ROWS(table)[1:]:
+            cells = ["".join(_TEXT(cell)).strip() for cell in _CELLS(row)]
+            if len(cells) >= 6 and cells[1]:
+                rows.append((cells[1:7] + [None])[:6] + list(location.values()))
+    return rows
+
+
+def archived_forms(path: str) -> List[str]:
+    """The form documents in a zip archive, in name order"""
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+    # Skip macOS resource forks and Word's "~$" lock files
+    return sorted(
+        name for name in names
+        if name.lower().endswith(".docx") and not name.startswith("__MACOSX/")
+        and not name.rsplit("/", 1)[-1].startswith("~$")
+    )
+
+
+def parse_archived_form(path: str, name: str) -> FormDocument:
+    """parse_form() for one document of a zip archive, timed"""
+    started = time.perf_counter()
+    with zipfile.ZipFile(path) as archive:
+        data = archive.read(name)
+    rows = parse_form(io.BytesIO(data))
+    return FormDocument(name, rows, time.perf_counter() - started)
@@ -0,0 +1,322 @@
+"""
+Prometheus metrics
+
+Every process (the API, the USSD gateway, the frontend) keeps its metrics in
+the default prometheus_client registry and serves them itself on /metrics,
+so a local Prometheus, or curl, can scrape them with no push gateway or agent:
+
+    curl -s localhost:9500/metrics | grep http_request_duration
+
+Route labels are route templates ("/api/v1/members/{member_id}"), never raw
+paths, to keep the number of series bounded.
+
+Only prometheus_client is needed at import time, so scripts run from
+backend/ (the USSD gateway) can import this module as utils.metrics.
+"""
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+# Seconds; USSD gateways drop a hop after a few seconds, so resolution matters below 1s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ("service", "method", "route", "status"), buckets=LATENCY_BUCKETS
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries issued while handling one request",
+    ("service", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in database queries while handling one request",
+    ("service", "route"), buckets=LATENCY_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Latency of single database queries", buckets=LATENCY_BUCKETS)
+
+USSD_HOPS = Counter("ussd_hops_total", "USSD requests handled, by the session state they were in", ("state",))
+USSD_HOP_SECONDS = Histogram(
+    "ussd_hop_duration_seconds", "Time to answer one USSD request, by session state",
+    ("state",), buckets=LATENCY_BUCKETS
+)
+USSD_ACTIVE_SESSIONS = Gauge("ussd_active_sessions", "USSD sessions held by the gateway")
+
+NOTIFICATION_QUEUE_DEPTH = Gauge(
+    "notification_queue_depth", "SMS and email messages accepted but not yet handed to the provider", ("channel",)
+)
+NOTIFICATION_PROVIDER_SECONDS = Histogram(
+    "notification_provider_duration_seconds", "Latency of SMS and email provider calls",
+    ("channel", "provider", "outcome"), buckets=LATENCY_BUCKETS
+)
+CGRATE_REQUEST_SECONDS = Histogram(
+    "cgrate_request_duration_seconds", "Latency of cGrate SOAP calls",
+    ("operation", "outcome"), buckets=LATENCY_BUCKETS
+)
+
+
+class QueryStats:
+    """
+    Database queries of one request or block
+
+    Subclasses can keep more per query by extending record() (the SQL
+    profiler keeps statement fingerprints).
+    """
+
+    __slots__ = ("count", "seconds", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.seconds = 0.0
+        # A block's queries also count against the request around it
+        self.parent = parent
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if self.parent is not None:
+            self.parent.record(statement, seconds)
+
+
+# Set for the duration of each instrumented request; None outside requests
+_request_queries: ContextVar[Optional[QueryStats]] = ContextVar("request_queries", default=None)
+# Stats collecting every query in the process whatever the context (tests,
+# where the app may run on another thread than the test)
+_process_queries: List[QueryStats] = []
+_process_lock = threading.Lock()
+# Threads of the process's own periodic jobs, never counted against anyone
+BACKGROUND_THREADS = frozenset({"ussd-session-reaper", "analytics-rollups"})
+
+
+@contextmanager
+def collect_queries(stats: QueryStats, every_thread: bool = False):
+    """
+    Count the queries run inside the block into stats
+
+    By default only queries of the current context count; with
+    every_thread, all queries in the process do (but the background jobs').
+    """
+    if every_thread:
+        with _process_lock:
+            _process_queries.append(stats)
+        try:
+            yield stats
+        finally:
+            with _process_lock:
+                _process_queries.remove(stats)
+    else:
+        token = _request_queries.set(stats)
+        try:
+            yield stats
+        finally:
+            _request_queries.reset(token)
+
+
+def observe_request(service: str, method: str, route: str, status: int, seconds: float,
+                    queries: Optional[QueryStats]) -> None:
+    HTTP_REQUEST_SECONDS.labels(service, method, route, str(status)).observe(seconds)
+    if queries is not None:
+        HTTP_REQUEST_QUERIES.labels(service, route).observe(queries.count)
+        HTTP_REQUEST_DB_SECONDS.labels(service, route).observe(queries.seconds)
+
+
+def route_template(scope) -> str:
+    """
+    The matched route's path template, router prefix included
+
+    Some FastAPI versions give included routes paths relative to their
+    router's prefix; the prefix is recovered from the request path.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", route.path)
+    try:
+        rendered = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    return path[:len(path) - len(rendered)] + template if path.endswith(rendered) else template
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording latency and database use of every HTTP request
+
+    A profiler (sql_profiler.SQLProfiler) supplies each request's
+    QueryStats and may add to the response as it starts.
+    """
+
+    def __init__(self, app, service: str = "backend", profiler=None):
+        self.app = app
+        self.service = service
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        queries = self.profiler.new_stats() if self.profiler is not None else QueryStats()
+        token = _request_queries.set(queries)
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.profiler is not None:
+                    # The endpoint has returned by the time its response starts
+                    message = self.profiler.response_start(scope, queries, message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router puts the matched route into the scope
+            observe_request(self.service, scope["method"], route_template(scope), status,
+                            time.perf_counter() - started, queries)
+            _request_queries.reset(token)
+
+
+def instrument_flask(app, service: str, database: bool = True) -> None:
+    """
+    Record latency of a Flask app's requests and serve /metrics
+
+    With database, also their queries on engines passed to
+    instrument_engine(); apps without a database leave it off.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        if database:
+            g.metrics_queries = QueryStats()
+            g.metrics_token = _request_queries.set(g.metrics_queries)
+
+    def record(status):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        observe_request(service, request.method, route, status,
+                        time.perf_counter() - g.pop("metrics_started"), g.get("metrics_queries"))
+
+    @app.after_request
+    def record_request(response):
+        if "metrics_started" in g:
+            record(response.status_code)
+        return response
+
+    @app.teardown_request
+    def reset_queries(exc):
+        # A view that raised never reaches after_request
+        if "metrics_started" in g:
+            record(500)
+        token = g.pop("metrics_token", None)
+        if token is not None:
+            _request_queries.reset(token)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def metrics_response():
+    """(body, content type) of the current metrics in the Prometheus text format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class PoolCollector:
+    """Connection pool gauges, read from the engine's pool at scrape time"""
+
+    GAUGES = (
+        ("db_pool_size", "size", "Connections the pool keeps open"),
+        ("db_pool_checked_out", "checkedout", "Connections in use"),
+        ("db_pool_checked_in", "checkedin", "Idle connections in the pool"),
+        ("db_pool_overflow", "overflow", "Connections open beyond the pool size, negative until the pool fills"),
+    )
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.pool
+        for name, attribute, documentation in self.GAUGES:
+            # SQLite's pools only have some of these
+            reading = getattr(pool, attribute, None)
+            if callable(reading):
+                gauge = GaugeMetricFamily(name, documentation)
+                gauge.add_metric([], reading())
+                yield gauge
+
+
+_instrumented_engines = set()
+
+
+def instrument_engine(engine) -> None:
+    """Time every query on the engine, count it against the current request and export pool gauges"""
+    from sqlalchemy import event
+
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_started"].pop()
+        DB_QUERY_SECONDS.observe(elapsed)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.record(statement, elapsed)
+        if _process_queries and threading.current_thread().name not in BACKGROUND_THREADS:
+            with _process_lock:
+                for stats in _process_queries:
+                    stats.record(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def failed_query(exception_context):
+        started = exception_context.connection.info.get("metrics_query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+    REGISTRY.register(PoolCollector(engine))
+
+
+@contextmanager
+def time_provider_call(channel: str, provider: str):
+    """
+    Time one SMS or email provider call
+
+    The outcome label is "ok" unless the block raises or sets
+    ``call["ok"] = False`` for a call the provider refused.
+    """
+    call = {"ok": True}
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call["ok"] = False
+        raise
+    finally:
+        NOTIFICATION_PROVIDER_SECONDS.labels(channel, provider, "ok" if call["ok"] else "error").observe(
+            time.perf_counter() - started
+        )
+
+
+_SOAP_OPERATION = re.compile(r"<kon:(\w+)")
+
+
+def soap_operation(soap_body: str) -> str:
+    """The operation name of a cGrate SOAP body, e.g. processCustomerPayment"""
+    match = _SOAP_OPERATION.search(soap_body)
+    return match.group(1) if match else "unknown"
@@ -0,0 +1,52 @@
+"""
+Phone number normalisation
+"""
+import os
+from typing import List, Optional
+
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "260")
+NATIONAL_NUMBER_LENGTH = 9
+
+
+def to_e164(number: Optional[str], country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    Canonical E.164 form of a phone number, or None when it cannot be one
+
+    Accepts the shapes members and gateways use: 0971234567, 971234567,
+    260971234567, +260 97 123 4567 and 00260971234567.
+    """
+    if not number:
+        return None
+    number = str(number).strip()
+    digits = "".join(c for c in number if c.isdigit())
+
+    if number.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0") and len(digits) == NATIONAL_NUMBER_LENGTH + 1:
+        digits = country_code + digits[1:]
+    elif len(digits) == NATIONAL_NUMBER_LENGTH:
+        digits = country_code + digits
+    elif not digits.startswith(country_code):
+        return None
+
+    # E.164 allows at most 15 digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return "+" + digits
+
+
+def stored_forms(e164: str, country_code: str = DEFAULT_COUNTRY_CODE) -> List[str]:
+    """
+    The shapes an E.164 number may be stored in by code that does not normalise
+
+    For matching columns without a canonical copy: +260971234567 is also
+    looked up as 260971234567, 0971234567 and 971234567.
+    """
+    digits = e164.lstrip("+")
+    forms = ["+" + digits, digits]
+    if digits.startswith(country_code):
+        national = digits[len(country_code):]
+        forms += ["0" + national, national]
+    return forms
@@ -0,0 +1,66 @@
+"""
+Query budgets for tests (pytest plugin)
+
+Enable with ``pytest -p backend.utils.query_budget``. A test then declares
+how many queries the code it drives may issue, and fails with the query
+profile when it issues more, or repeats one statement shape too often:
+
+    @pytest.mark.query_budget(4)
+    def test_list_events(client):
+        client.get("/api/v1/events")
+
+    def test_referrals(client, query_budget):
+        with query_budget(3, max_repeats=2):
+            client.get("/api/v1/referrals")
+
+Only the test body counts (not fixtures), on the application's engine;
+other engines can be added with metrics.instrument_engine().
+"""
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+
+from backend.utils.metrics import instrument_engine
+from backend.utils.sql_profiler import profile_queries
+
+
+@contextmanager
+def _budget(max_queries: Optional[int], max_repeats: Optional[int] = None):
+    with profile_queries(every_thread=True) as profile:
+        yield profile
+    problems = []
+    # Over the budget, every statement is listed; over the repeat limit, the repeated ones
+    threshold = 1
+    if max_repeats is not None and profile.repeated(max_repeats + 1):
+        problems.append(f"a statement repeated more than {max_repeats} times")
+        threshold = max_repeats + 1
+    if max_queries is not None and profile.count > max_queries:
+        problems.insert(0, f"{profile.count} queries, over the budget of {max_queries}")
+        threshold = 1
+    if problems:
+        pytest.fail(f"{'; '.join(problems)}\n{profile.summary(threshold)}", pytrace=False)
+
+
+def pytest_configure(config):
+    from backend.config.database import engine
+
+    config.addinivalue_line(
+        "markers", "query_budget(max_queries, max_repeats=None): fail when the test body issues more queries"
+    )
+    instrument_engine(engine)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    with _budget(*marker.args, **marker.kwargs):
+        return (yield)
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager failing the test when the block exceeds its query budget"""
+    return _budget
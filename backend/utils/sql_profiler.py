@@ -0,0 +1,115 @@
+"""
+SQL query profiler
+
+Records every query an API request issues: how many, how long they took,
+and how often each statement shape repeated. A shape (fingerprint) is the
+SQL with literals and IN lists collapsed, so the queries an ORM issues for
+each row of a result ("SELECT ... FROM members WHERE members.id = ?")
+collapse into one fingerprint repeated N times: the N+1 pattern.
+
+Meant for development and staging (SQL_PROFILER=true). Each response then
+carries X-DB-Queries, X-DB-Time-Ms and, when a fingerprint repeats at least
+SQL_PROFILER_REPEAT_THRESHOLD times, X-DB-Repeated; the repeated statements
+are logged in full. Tests can enforce query budgets with the pytest plugin
+in backend.utils.query_budget.
+
+Queries are timed once, by the cursor listeners and PrometheusMiddleware of
+backend.utils.metrics; the profiler only keeps the fingerprints of what
+they record.
+"""
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from backend.utils.metrics import QueryStats, _request_queries, collect_queries
+
+logger = logging.getLogger(__name__)
+
+SQL_PROFILER = os.getenv("SQL_PROFILER", "false").lower() == "true"
+SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv("SQL_PROFILER_REPEAT_THRESHOLD", "5"))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+# :name, but not the Postgres cast x::type
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """The statement with literals, placeholders and IN lists collapsed to ?"""
+    statement = _STRING.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("IN (?)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+class QueryProfile(QueryStats):
+    """The queries of one request or block, with how often each statement shape ran"""
+
+    __slots__ = ("fingerprints",)
+
+    def __init__(self, parent: Optional[QueryStats] = None):
+        super().__init__(parent)
+        self.fingerprints = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        super().record(statement, seconds)
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = SQL_PROFILER_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """(fingerprint, times) of statements run at least `threshold` times, most repeated first"""
+        return [(statement, times) for statement, times in self.fingerprints.most_common() if times >= threshold]
+
+    def summary(self, threshold: int = SQL_PROFILER_REPEAT_THRESHOLD) -> str:
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f} ms"]
+        lines += [f"  {times}x [{fingerprint_id(statement)}] {statement}" for statement, times in self.repeated(threshold)]
+        return "\n".join(lines)
+
+
+def fingerprint_id(statement: str) -> str:
+    """A short stable id of a fingerprint, to name it in a header"""
+    return hashlib.sha1(statement.encode()).hexdigest()[:8]
+
+
+@contextmanager
+def profile_queries(every_thread: bool = False):
+    """
+    Profile the queries run inside the block, on engines instrumented with
+    metrics.instrument_engine()
+
+    By default only queries of the current context count (and still count
+    towards the request's); with every_thread, all queries in the process
+    do (but the background jobs'), which is what a test driving the app
+    through a test client needs.
+    """
+    profile = QueryProfile() if every_thread else QueryProfile(parent=_request_queries.get())
+    with collect_queries(profile, every_thread=every_thread):
+        yield profile
+
+
+class SQLProfiler:
+    """Reports each request's queries in response headers and the log, for PrometheusMiddleware(profiler=...)"""
+
+    def __init__(self, threshold: int = SQL_PROFILER_REPEAT_THRESHOLD):
+        self.threshold = threshold
+
+    def new_stats(self) -> QueryProfile:
+        return QueryProfile()
+
+    def response_start(self, scope, profile: QueryProfile, message: dict) -> dict:
+        headers = list(message.get("headers", []))
+        headers.append((b"x-db-queries", str(profile.count).encode()))
+        headers.append((b"x-db-time-ms", f"{profile.seconds * 1000:.1f}".encode()))
+        repeated = profile.repeated(self.threshold)
+        if repeated:
+            headers.append((b"x-db-repeated", ", ".join(
+                f"{times}x {fingerprint_id(statement)}" for statement, times in repeated
+            ).encode()))
+            logger.warning(f"Likely N+1 in {scope['method']} {scope['path']}: {profile.summary(self.threshold)}")
+        return {**message, "headers": headers}
@@ -0,0 +1,117 @@
+"""
+Internal election voting engine
+
+Votes are idempotent through the unique (election_id, voter_id) constraint on
+election_votes, and candidate tallies live in sharded counter rows that are
+bumped with a single atomic upsert. Concurrent voters therefore never lose
+updates and a popular candidate's votes are spread over several rows instead
+of serialising on one.
+
+The shards count every vote cast. A vote invalidated later (is_valid set to
+false, by whatever path) is subtracted when tallying, so results count valid
+votes only, as before. migrations/add_election_vote_shards.sql creates the
+table and backfills it from election_votes for elections already running.
+"""
+import os
+import random
+import uuid
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from models_enhanced import ElectionCandidate, ElectionVote, ElectionVoteShard
+
+VOTE_COUNTER_SHARDS = int(os.getenv("VOTE_COUNTER_SHARDS", "16"))
+
+# The vote insert only yields a row when the candidate stands in the election
+# and the voter has not voted yet; the shard upsert feeds off its RETURNING, so
+# a duplicate or invalid vote touches no counter. Written as text because
+# SQLAlchemy cannot cache insert-CTE constructs and would recompile per vote.
+CAST_VOTE_SQL = text("""
+WITH new_vote AS (
+    INSERT INTO election_votes
+        (id, election_id, voter_id, candidate_id, vote_method, vote_timestamp, is_valid)
+    SELECT CAST(:vote_id AS uuid), c.election_id, CAST(:voter_id AS uuid), c.id,
+           :vote_method, :voted_at, true
+    FROM election_candidates c
+    WHERE c.id = CAST(:candidate_id AS uuid)
+      AND c.election_id = CAST(:election_id AS uuid)
+      AND c.withdrawal_date IS NULL
+    ON CONFLICT ON CONSTRAINT uq_election_vote_voter DO NOTHING
+    RETURNING candidate_id, election_id
+)
+INSERT INTO election_vote_shards (candidate_id, shard, election_id, votes)
+SELECT candidate_id, :shard, election_id, 1 FROM new_vote
+ON CONFLICT (candidate_id, shard) DO UPDATE SET votes = election_vote_shards.votes + 1
+RETURNING candidate_id
+""")
+
+
+class AlreadyVotedError(Exception):
+    """Raised when a member votes twice in the same election"""
+
+
+class InvalidCandidateError(Exception):
+    """Raised when the candidate is not standing in the election"""
+
+
+class VotingEngine:
+    def __init__(self, shards: int = VOTE_COUNTER_SHARDS):
+        self.shards = shards
+
+    def cast_vote(self, db: Session, election_id, voter_id, candidate_id, vote_method: str = "online"):
+        """
+        Record a vote and bump one counter shard in a single statement
+
+        Raises AlreadyVotedError for a repeat vote and InvalidCandidateError
+        when the candidate is not standing in the election.
+        """
+        vote_id = uuid.uuid4()
+        counted = db.execute(CAST_VOTE_SQL, {
+            "vote_id": str(vote_id),
+            "voter_id": str(voter_id),
+            "vote_method": vote_method,
+            "voted_at": datetime.utcnow(),
+            "candidate_id": str(candidate_id),
+            "election_id": str(election_id),
+            "shard": random.randrange(self.shards)
+        }).first()
+
+        if counted is None:
+            db.rollback()
+            standing = db.query(ElectionCandidate.id).filter(
+                ElectionCandidate.id == candidate_id,
+                ElectionCandidate.election_id == election_id,
+                ElectionCandidate.withdrawal_date.is_(None)
+            ).first()
+            if not standing:
+                raise InvalidCandidateError("Candidate is not standing in this election")
+            raise AlreadyVotedError("You have already voted in this election")
+
+        db.commit()
+        return vote_id
+
+    def tally(self, db: Session, election_id) -> Dict:
+        """Return {candidate_id: valid votes}: the shard sums less the invalidated votes"""
+        rows = db.query(
+            ElectionVoteShard.candidate_id,
+            func.sum(ElectionVoteShard.votes)
+        ).filter(
+            ElectionVoteShard.election_id == election_id
+        ).group_by(ElectionVoteShard.candidate_id).all()
+
+        # Few votes are ever invalidated; a partial index serves this
+        invalidated = dict(db.query(
+            ElectionVote.candidate_id,
+            func.count(ElectionVote.id)
+        ).filter(
+            ElectionVote.election_id == election_id,
+            ElectionVote.is_valid == False
+        ).group_by(ElectionVote.candidate_id).all())
+
+        return {candidate_id: int(votes) - invalidated.get(candidate_id, 0) for candidate_id, votes in rows}
+
+
+voting_engine = VotingEngine()
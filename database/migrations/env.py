@@ -9,7 +9,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from backend.config.database import Base
-from backend.models import Province, District, Ward, Member, FormMetadata
+import backend.models  # noqa: F401  (registers every model on Base.metadata)
 
 # this is the Alembic Config object
 config = context.config
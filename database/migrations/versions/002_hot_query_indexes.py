@@ -0,0 +1,64 @@
+"""hot query indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, partial index predicate)
+INDEXES = [
+    # USSD session start: Member.contact == phone
+    ('ix_members_contact', 'members', ['contact'], 'contact IS NOT NULL'),
+    # Members per ward (ward pages, membership counters)
+    ('ix_members_ward_id', 'members', ['ward_id'], None),
+    # Idle active sessions, oldest first
+    ('ix_ussd_sessions_active_updated_at', 'ussd_sessions', ['updated_at'], 'is_active = true'),
+    # Event listing: status filter ordered by start date
+    ('ix_events_status_start_date', 'events', ['status', 'start_date'], None),
+    # Registration/attendance counts per event
+    ('ix_event_registrations_event_id_status', 'event_registrations', ['event_id', 'registration_status'], None),
+    # Referral listing: per referrer or per status, newest first
+    ('ix_referrals_referrer_id_referred_date', 'referrals', ['referrer_id', 'referred_date'], None),
+    ('ix_referrals_status_referred_date', 'referrals', ['status', 'referred_date'], None),
+]
+
+
+def _existing():
+    """{table: {index names}} for the tables this revision touches"""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    return {
+        table: {index['name'] for index in inspector.get_indexes(table)}
+        for table in {table for _, table, _, _ in INDEXES} if table in tables
+    }
+
+
+def upgrade() -> None:
+    # Several of these tables are created by the application (create_all)
+    # rather than by a migration, and may already carry the indexes from the
+    # model definitions; only add what is missing
+    existing = _existing()
+    for name, table, columns, where in INDEXES:
+        if table not in existing or name in existing[table]:
+            continue
+        predicate = sa.text(where) if where else None
+        op.create_index(name, table, columns, unique=False,
+                        postgresql_where=predicate, sqlite_where=predicate)
+
+
+def downgrade() -> None:
+    existing = _existing()
+    for name, table, _, _ in reversed(INDEXES):
+        if name in existing.get(table, ()):
+            op.drop_index(name, table_name=table)
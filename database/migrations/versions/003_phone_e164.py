@@ -0,0 +1,86 @@
+"""canonical E.164 phone columns
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from backend.utils.phone import to_e164
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table, raw phone column, canonical column, unique
+PHONE_COLUMNS = [
+    ('members', 'contact', 'contact_e164', False),
+    ('users', 'phone', 'phone_e164', True),
+]
+
+BATCH_SIZE = 5000
+
+
+def _backfill(bind, table, source, target, unique):
+    """Normalise existing numbers in Python (SQL has no portable equivalent) and write them back"""
+    rows = bind.execute(sa.text(
+        f"SELECT id, {source} FROM {table} WHERE {source} IS NOT NULL ORDER BY id"
+    )).all()
+
+    seen = set()
+    updates = []
+    skipped = 0
+    for row_id, raw in rows:
+        e164 = to_e164(raw)
+        if e164 is None:
+            continue
+        if unique and e164 in seen:
+            # Two accounts stored the same number in different formats; the
+            # oldest keeps it, the rest are left for an administrator
+            skipped += 1
+            continue
+        seen.add(e164)
+        updates.append({'id': row_id, 'e164': e164})
+
+    statement = sa.text(f"UPDATE {table} SET {target} = :e164 WHERE id = :id")
+    for start in range(0, len(updates), BATCH_SIZE):
+        bind.execute(statement, updates[start:start + BATCH_SIZE])
+
+    print(f"  {table}.{target}: {len(updates)} of {len(rows)} numbers normalised"
+          + (f", {skipped} duplicates left empty" if skipped else ""))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+
+    for table, source, target, unique in PHONE_COLUMNS:
+        if table not in tables:
+            continue
+        if target not in {column['name'] for column in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column(target, sa.String(length=16), nullable=True))
+        _backfill(bind, table, source, target, unique)
+
+        index = f'ix_{table}_{target}'
+        if index not in {i['name'] for i in inspector.get_indexes(table)}:
+            op.create_index(index, table, [target], unique=unique)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for table, _, target, _ in reversed(PHONE_COLUMNS):
+        if table not in tables:
+            continue
+        if f'ix_{table}_{target}' in {i['name'] for i in inspector.get_indexes(table)}:
+            op.drop_index(f'ix_{table}_{target}', table_name=table)
+        if target in {column['name'] for column in inspector.get_columns(table)}:
+            op.drop_column(table, target)
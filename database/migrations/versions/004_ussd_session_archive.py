@@ -0,0 +1,43 @@
+"""ussd session archive
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The application may already have created it (create_all)
+    if 'ussd_session_archive' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'ussd_session_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.String(length=100), nullable=False),
+        sa.Column('phone_number', sa.String(length=50), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=True),
+        sa.Column('final_step', sa.String(length=100), nullable=False),
+        sa.Column('outcome', sa.String(length=20), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('ended_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ussd_session_archive_id'), 'ussd_session_archive', ['id'], unique=False)
+    op.create_index(op.f('ix_ussd_session_archive_ended_at'), 'ussd_session_archive', ['ended_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ussd_session_archive_ended_at'), table_name='ussd_session_archive')
+    op.drop_index(op.f('ix_ussd_session_archive_id'), table_name='ussd_session_archive')
+    op.drop_table('ussd_session_archive')
@@ -0,0 +1,84 @@
+"""member import jobs and staging rows
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The application may already have created them (create_all)
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'import_jobs' not in tables:
+        # users is created by the application, not by these migrations
+        created_by = [sa.ForeignKeyConstraint(['created_by'], ['users.id'])] if 'users' in tables else []
+        op.create_table(
+            'import_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('file_path', sa.String(length=500), nullable=False),
+            sa.Column('file_format', sa.String(length=10), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('default_ward_id', sa.Integer(), nullable=True),
+            sa.Column('total_rows', sa.Integer(), nullable=False),
+            sa.Column('valid_rows', sa.Integer(), nullable=False),
+            sa.Column('imported_rows', sa.Integer(), nullable=False),
+            sa.Column('skipped_rows', sa.Integer(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_by', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['default_ward_id'], ['wards.id']),
+            *created_by,
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_import_jobs_id'), 'import_jobs', ['id'], unique=False)
+        op.create_index(op.f('ix_import_jobs_status'), 'import_jobs', ['status'], unique=False)
+
+    if 'import_staging_rows' not in tables:
+        op.create_table(
+            'import_staging_rows',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('row_number', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=True),
+            sa.Column('gender', sa.String(length=10), nullable=True),
+            sa.Column('date_of_birth', sa.Date(), nullable=True),
+            sa.Column('age', sa.Integer(), nullable=True),
+            sa.Column('nrc', sa.String(length=50), nullable=True),
+            sa.Column('voters_id', sa.String(length=50), nullable=True),
+            sa.Column('contact', sa.String(length=50), nullable=True),
+            sa.Column('contact_e164', sa.String(length=16), nullable=True),
+            sa.Column('province', sa.String(length=100), nullable=True),
+            sa.Column('district', sa.String(length=100), nullable=True),
+            sa.Column('constituency', sa.String(length=100), nullable=True),
+            sa.Column('ward', sa.String(length=100), nullable=True),
+            sa.Column('ward_id', sa.Integer(), nullable=True),
+            sa.Column('is_valid', sa.Boolean(), nullable=False),
+            sa.Column('errors', sa.Text(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.ForeignKeyConstraint(['job_id'], ['import_jobs.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_import_staging_rows_job_id_row_number', 'import_staging_rows',
+                        ['job_id', 'row_number'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_staging_rows_job_id_row_number', table_name='import_staging_rows')
+    op.drop_table('import_staging_rows')
+    op.drop_index(op.f('ix_import_jobs_status'), table_name='import_jobs')
+    op.drop_index(op.f('ix_import_jobs_id'), table_name='import_jobs')
+    op.drop_table('import_jobs')
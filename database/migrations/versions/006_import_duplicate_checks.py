@@ -0,0 +1,47 @@
+"""import duplicate checks: staging warnings and member date of birth index
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table, column; server defaults fill the rows of existing jobs
+NEW_COLUMNS = [
+    ('import_jobs', sa.Column('match_similar', sa.Boolean(), server_default=sa.false(), nullable=False)),
+    ('import_jobs', sa.Column('warning_rows', sa.Integer(), server_default='0', nullable=False)),
+    ('import_staging_rows', sa.Column('warnings', sa.Text(), nullable=True)),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # The application may already have created them (create_all)
+    for table, column in NEW_COLUMNS:
+        if column.name not in {c['name'] for c in inspector.get_columns(table)}:
+            op.add_column(table, column)
+
+    # Similar-member checks look members up by date of birth; the column
+    # itself comes from the application's model, not these migrations
+    if 'date_of_birth' in {c['name'] for c in inspector.get_columns('members')} and \
+            'ix_members_date_of_birth' not in {i['name'] for i in inspector.get_indexes('members')}:
+        op.create_index('ix_members_date_of_birth', 'members', ['date_of_birth'], unique=False)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_members_date_of_birth' in {i['name'] for i in inspector.get_indexes('members')}:
+        op.drop_index('ix_members_date_of_birth', table_name='members')
+    for table, column in reversed(NEW_COLUMNS):
+        op.drop_column(table, column.name)
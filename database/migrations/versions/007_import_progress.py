@@ -0,0 +1,40 @@
+"""import job progress: row counters and parse timings
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table, column; server defaults fill the rows of existing jobs
+NEW_COLUMNS = [
+    ('import_jobs', sa.Column('expected_rows', sa.Integer(), nullable=True)),
+    ('import_jobs', sa.Column('parsed_rows', sa.Integer(), server_default='0', nullable=False)),
+    ('import_jobs', sa.Column('validated_rows', sa.Integer(), server_default='0', nullable=False)),
+    ('import_jobs', sa.Column('started_at', sa.DateTime(timezone=True), nullable=True)),
+    ('import_jobs', sa.Column('staged_at', sa.DateTime(timezone=True), nullable=True)),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # The application may already have created them (create_all)
+    for table, column in NEW_COLUMNS:
+        if column.name not in {c['name'] for c in inspector.get_columns(table)}:
+            op.add_column(table, column)
+
+
+def downgrade() -> None:
+    for table, column in reversed(NEW_COLUMNS):
+        op.drop_column(table, column.name)
@@ -0,0 +1,86 @@
+"""seed account roles: member import permissions for admins and coordinators
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from backend.models.rbac import Permission, Role, RolePermission, UserRole
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same names and descriptions as database/seed_rbac.py, so either may run first
+PERMISSIONS = [
+    ('Create Members', 'members', 'create', 'Create new members'),
+    ('Read Members', 'members', 'read', 'View member information'),
+]
+
+# system role, description, account role (users.role) that holds it, permissions
+ROLES = [
+    ('Administrator', 'General administrative access', 'admin', [('members', 'create'), ('members', 'read')]),
+    ('Ward Coordinator', 'Manage ward-level activities and members', 'coordinator',
+     [('members', 'create'), ('members', 'read')]),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # The RBAC tables are created by the application, which may not have started yet
+    for model in (Role, Permission, RolePermission, UserRole):
+        model.__table__.create(bind, checkfirst=True)
+
+    for name, resource, action, description in PERMISSIONS:
+        bind.execute(sa.text(
+            "INSERT INTO permissions (name, resource, action, description) "
+            "SELECT :name, :resource, :action, :description WHERE NOT EXISTS "
+            "(SELECT 1 FROM permissions WHERE resource = :resource AND action = :action)"
+        ), {'name': name, 'resource': resource, 'action': action, 'description': description})
+
+    has_users = 'users' in sa.inspect(bind).get_table_names()
+    for name, description, account_role, permissions in ROLES:
+        bind.execute(sa.text(
+            "INSERT INTO roles (name, description, is_system_role) "
+            "SELECT :name, :description, :system WHERE NOT EXISTS (SELECT 1 FROM roles WHERE name = :name)"
+        ), {'name': name, 'description': description, 'system': True})
+
+        for resource, action in permissions:
+            bind.execute(sa.text(
+                "INSERT INTO role_permissions (role_id, permission_id) "
+                "SELECT r.id, p.id FROM roles r, permissions p "
+                "WHERE r.name = :name AND p.resource = :resource AND p.action = :action "
+                "AND NOT EXISTS (SELECT 1 FROM role_permissions rp WHERE rp.role_id = r.id AND rp.permission_id = p.id)"
+            ), {'name': name, 'resource': resource, 'action': action})
+
+        # Later accounts get theirs from the users routes (sync_account_role)
+        if has_users:
+            assigned = bind.execute(sa.text(
+                "INSERT INTO user_roles (user_id, user_type, role_id) "
+                "SELECT u.id, 'admin', r.id FROM users u, roles r "
+                "WHERE u.role = :account_role AND r.name = :name "
+                "AND NOT EXISTS (SELECT 1 FROM user_roles ur WHERE ur.user_id = u.id "
+                "AND ur.user_type = 'admin' AND ur.role_id = r.id)"
+            ), {'name': name, 'account_role': account_role}).rowcount
+            print(f"  {name}: assigned to {assigned} '{account_role}' accounts")
+
+
+def downgrade() -> None:
+    # Roles and permissions may be shared with seed_rbac.py; only the assignments are undone
+    bind = op.get_bind()
+    if 'users' not in sa.inspect(bind).get_table_names():
+        return
+    for name, _, account_role, _ in ROLES:
+        bind.execute(sa.text(
+            "DELETE FROM user_roles WHERE user_type = 'admin' "
+            "AND role_id IN (SELECT id FROM roles WHERE name = :name) "
+            "AND user_id IN (SELECT id FROM users WHERE role = :account_role)"
+        ), {'name': name, 'account_role': account_role})
@@ -160,33 +160,32 @@ def seed_rbac():
             existing_role = db.query(Role).filter(Role.name == role_data["name"]).first()
 
             if existing_role:
+                # e.g. created by migration 008 with only part of its permissions
                 print(f"   ⏭  Role '{role_data['name']}' already exists")
-                role_map[role_data["name"]] = existing_role.id
+                role = existing_role
             else:
                 role = Role(**role_data)
                 db.add(role)
                 db.flush()
-                role_map[role_data["name"]] = role.id
                 print(f"   ✅ Created role: {role_data['name']}")
+            role_map[role_data["name"]] = role.id
 
-                # Assign permissions to role
-                if permissions == "ALL":
-                    # Assign all permissions to Super Administrator
-                    all_permissions = db.query(Permission).all()
-                    for perm in all_permissions:
-                        role_perm = RolePermission(role_id=role.id, permission_id=perm.id)
-                        db.add(role_perm)
-                    print(f"      → Assigned ALL permissions to {role_data['name']}")
-                else:
-                    # Assign specific permissions
-                    for perm_key in permissions:
-                        if perm_key in permission_map:
-                            role_perm = RolePermission(
-                                role_id=role.id,
-                                permission_id=permission_map[perm_key]
-                            )
-                            db.add(role_perm)
-                    print(f"      → Assigned {len(permissions)} permissions to {role_data['name']}")
+            # Assign permissions to role
+            assigned = {
+                permission_id for (permission_id,) in
+                db.query(RolePermission.permission_id).filter(RolePermission.role_id == role.id)
+            }
+            if permissions == "ALL":
+                # Assign all permissions to Super Administrator
+                permission_ids = [perm.id for perm in db.query(Permission).all()]
+            else:
+                # Assign specific permissions
+                permission_ids = [permission_map[perm_key] for perm_key in permissions if perm_key in permission_map]
+            missing = [permission_id for permission_id in permission_ids if permission_id not in assigned]
+            for permission_id in missing:
+                db.add(RolePermission(role_id=role.id, permission_id=permission_id))
+            if missing:
+                print(f"      → Assigned {len(missing)} permissions to {role_data['name']}")
 
         db.commit()
 
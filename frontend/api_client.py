@@ -0,0 +1,237 @@
+"""
+Backend API client
+
+Every view talks to the backend through ``api_client.request`` (a
+drop-in for ``requests.request``), which
+
+* fails fast while the circuit breaker is open, instead of letting each
+  view wait on its own timeout against a backend that is down;
+* sends the signed-in user's access token and, when it is about to
+  expire or the backend answers 401, trades the session's refresh token
+  for a new pair and retries once, so sessions outlive the 30 minute
+  access token.
+"""
+import re
+import threading
+import time
+
+import requests
+from flask import current_app, g, has_request_context, session
+
+# Refresh this long before the access token expires
+REFRESH_MARGIN = 30
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for backend API availability
+
+    While closed, requests go straight through with no health pre-check.
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    views fail fast; once ``reset_timeout`` seconds pass, a single /health
+    probe decides whether to close it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=30, probe_timeout=2):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.health_url = None
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Initialize circuit breaker with app"""
+        # /health sits at the server root, whether or not API_BASE_URL carries /api/v1
+        self.health_url = re.sub(r'/api/v\d+/?$', '', app.config['API_BASE_URL']) + '/health'
+        self.failure_threshold = app.config.get('API_BREAKER_FAILURE_THRESHOLD', self.failure_threshold)
+        self.reset_timeout = app.config.get('API_BREAKER_RESET_TIMEOUT', self.reset_timeout)
+
+    def allow_request(self):
+        """Return True if the backend should be considered available"""
+        if self.state == self.CLOSED:
+            return True
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            # Half-open: one caller probes, the rest keep failing fast
+            self.opened_at = time.monotonic()
+
+        if self._probe():
+            self.record_success()
+            return True
+        self.record_failure()
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def _probe(self):
+        try:
+            response = requests.get(self.health_url, timeout=self.probe_timeout)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+
+api_breaker = CircuitBreaker()
+
+
+def store_tokens(token_data):
+    """Keep a login or refresh response's token pair in the session"""
+    session['user_token'] = token_data['access_token']
+    session['refresh_token'] = token_data.get('refresh_token')
+    expires_in = token_data.get('expires_in')
+    session['token_expires_at'] = time.time() + expires_in if expires_in else None
+
+
+def revoke_tokens():
+    """Revoke the session's tokens on the backend at logout; the session is signed out either way"""
+    if not session.get('user_token'):
+        return
+    try:
+        api_client.request('POST', f"{api_client.base_url}/auth/logout",
+                           json={'refresh_token': session['refresh_token']} if session.get('refresh_token') else None)
+    except requests.exceptions.RequestException as e:
+        current_app.logger.warning(f"Token revocation at logout failed: {e}")
+
+
+class APIClient:
+    """API Client for backend communication"""
+
+    def __init__(self):
+        self.base_url = None
+        self.headers = {}
+        self.timeout = 30
+
+    def init_app(self, app):
+        """Initialize API client with app"""
+        # The routes app's API_BASE_URL already ends in /api/v1; the blueprints app sets API_VERSION
+        if app.config.get('API_VERSION'):
+            self.base_url = f"{app.config['API_BASE_URL']}/api/{app.config['API_VERSION']}"
+        else:
+            self.base_url = app.config['API_BASE_URL']
+        self.timeout = app.config.get('API_TIMEOUT', 30)
+        api_breaker.init_app(app)
+
+    def set_auth_token(self, token):
+        """Set authentication token"""
+        self.headers['Authorization'] = f'Bearer {token}'
+
+    def _record(self, response):
+        """Feed the response outcome into the circuit breaker"""
+        if response.status_code >= 500:
+            api_breaker.record_failure()
+        else:
+            api_breaker.record_success()
+
+    def _send(self, method, url, **kwargs):
+        try:
+            response = requests.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            api_breaker.record_failure()
+            raise
+        self._record(response)
+        return response
+
+    def refresh_session(self):
+        """
+        Trade the session's refresh token for a new pair
+
+        Returns False, and signs the session out, when there is no refresh
+        token or the backend refuses it.
+        """
+        refresh_token = session.get('refresh_token')
+        if not refresh_token:
+            return False
+        response = self._send(
+            'POST', f"{self.base_url}/auth/refresh",
+            json={'refresh_token': refresh_token}, timeout=self.timeout
+        )
+        if response.status_code != 200:
+            for key in ('user_token', 'refresh_token', 'token_expires_at'):
+                session.pop(key, None)
+            return False
+        # Views build their headers once; later calls in this request may still carry the old token
+        g.replaced_token = session.get('user_token')
+        store_tokens(response.json())
+        return True
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request to the backend, like ``requests.request``
+
+        Connection errors and timeouts propagate as with requests; while
+        the circuit is open they are raised without contacting the
+        backend. Requests without an Authorization header, or with the
+        session's own token, carry the signed-in user's current access
+        token. Uploads (``files``) are not
+        retried after a 401, as their streams are already consumed; the
+        refresh ahead of expiry covers them.
+        """
+        if not api_breaker.allow_request():
+            raise requests.exceptions.ConnectionError('Backend unavailable (circuit open)')
+        kwargs.setdefault('timeout', self.timeout)
+        headers = dict(kwargs.pop('headers', None) or {})
+
+        user_request = False
+        if has_request_context() and session.get('user_token'):
+            sent = headers.get('Authorization')
+            user_request = sent is None or sent in (f"Bearer {session['user_token']}",
+                                                    f"Bearer {g.get('replaced_token')}")
+            expires_at = session.get('token_expires_at')
+            if user_request and expires_at and time.time() > expires_at - REFRESH_MARGIN:
+                self.refresh_session()
+            if user_request and session.get('user_token'):
+                headers['Authorization'] = f"Bearer {session['user_token']}"
+
+        response = self._send(method, url, headers=headers, **kwargs)
+        if (response.status_code == 401 and user_request and 'files' not in kwargs
+                and self.refresh_session()):
+            headers['Authorization'] = f"Bearer {session['user_token']}"
+            response = self._send(method, url, headers=headers, **kwargs)
+        return response
+
+    def _call(self, method, endpoint, **kwargs):
+        try:
+            return self.request(method, f"{self.base_url}/{endpoint}", headers=self.headers or None, **kwargs)
+        except Exception as e:
+            current_app.logger.error(f"API {method} error: {str(e)}")
+            return None
+
+    def get(self, endpoint, params=None):
+        """GET request to API"""
+        return self._call('GET', endpoint, params=params)
+
+    def post(self, endpoint, data=None, json=None):
+        """POST request to API"""
+        return self._call('POST', endpoint, data=data, json=json)
+
+    def put(self, endpoint, data=None, json=None):
+        """PUT request to API"""
+        return self._call('PUT', endpoint, data=data, json=json)
+
+    def delete(self, endpoint):
+        """DELETE request to API"""
+        return self._call('DELETE', endpoint)
+
+
+# Initialize API client
+api_client = APIClient()
@@ -3,6 +3,9 @@ Flask frontend application
 """
 from flask import Flask, render_template
 from frontend.routes import register_routes
+from frontend.api_client import api_client
+from frontend.response_cache import response_cache
+from frontend.metrics import init_metrics
 import os
 
 def create_app():
@@ -13,6 +16,15 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     app.config['API_BASE_URL'] = os.getenv('API_BASE_URL', 'http://localhost:9500/api/v1')
     
+    # Backend client: circuit breaker and token refresh
+    api_client.init_app(app)
+
+    # Page and backend data cache
+    response_cache.init_app(app)
+
+    # Request latency on /metrics
+    init_metrics(app)
+
     # Register routes
     register_routes(app)
     
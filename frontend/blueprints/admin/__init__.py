@@ -1,14 +1,18 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
 from functools import wraps
-import requests
+from api_client import api_client
 from datetime import datetime, timedelta
 import os
+from response_cache import response_cache, fetch_json
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 # Backend API URL - Use environment variable or default to backend service
 API_URL = os.environ.get('API_URL', 'http://backend:8000') + "/api/v1"
 
+# Dashboard figures are the same for every admin; they may lag by this much
+DASHBOARD_TIMEOUT = 30
+
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -40,14 +44,17 @@ def dashboard():
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
 
         # Get dashboard statistics
-        response = requests.get(f"{API_URL}/admin/dashboard/stats", headers=headers)
-        if response.status_code == 200:
-            stats.update(response.json())
+        stats.update(response_cache.get_data('admin/dashboard/stats',
+                                             fetch_json(f"{API_URL}/admin/dashboard/stats",
+                                                        send=api_client.request, headers=headers),
+                                             timeout=DASHBOARD_TIMEOUT, tags=('statistics',)))
 
         # Get recent registrations
-        response = requests.get(f"{API_URL}/members?limit=10&sort=created_at_desc", headers=headers)
-        if response.status_code == 200:
-            stats['recent_registrations'] = response.json().get('members', [])
+        recent = response_cache.get_data('admin/recent-registrations',
+                                         fetch_json(f"{API_URL}/members?limit=10&sort=created_at_desc",
+                                                    send=api_client.request, headers=headers),
+                                         timeout=DASHBOARD_TIMEOUT, tags=('statistics',))
+        stats['recent_registrations'] = recent.get('members', [])
 
     except:
         pass
@@ -68,7 +75,7 @@ def members():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/members", params=filters, headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members", params=filters, headers=headers)
         if response.status_code == 200:
             data = response.json()
             members_list = data.get('members', [])
@@ -89,17 +96,17 @@ def member_detail(member_id):
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
 
         # Get member details
-        response = requests.get(f"{API_URL}/members/{member_id}", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{member_id}", headers=headers)
         if response.status_code == 200:
             member = response.json()
 
         # Get member activities
-        response = requests.get(f"{API_URL}/members/{member_id}/activities", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{member_id}/activities", headers=headers)
         if response.status_code == 200:
             activities = response.json()
 
         # Get member payments
-        response = requests.get(f"{API_URL}/payments/member/{member_id}", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/payments/member/{member_id}", headers=headers)
         if response.status_code == 200:
             payments = response.json()
 
@@ -117,9 +124,10 @@ def member_detail(member_id):
 def approve_member(member_id):
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.post(f"{API_URL}/admin/members/{member_id}/approve", headers=headers)
+        response = api_client.request('POST', f"{API_URL}/admin/members/{member_id}/approve", headers=headers)
 
         if response.status_code == 200:
+            response_cache.invalidate('statistics')
             return jsonify({'success': True, 'message': 'Member approved successfully'})
         else:
             return jsonify({'success': False, 'message': 'Failed to approve member'}), 400
@@ -133,10 +141,11 @@ def suspend_member(member_id):
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.post(f"{API_URL}/admin/members/{member_id}/suspend",
+        response = api_client.request('POST', f"{API_URL}/admin/members/{member_id}/suspend",
                                 json={'reason': reason}, headers=headers)
 
         if response.status_code == 200:
+            response_cache.invalidate('statistics')
             return jsonify({'success': True, 'message': 'Member suspended successfully'})
         else:
             return jsonify({'success': False, 'message': 'Failed to suspend member'}), 400
@@ -165,12 +174,12 @@ def payments():
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
 
         # Get payment statistics
-        response = requests.get(f"{API_URL}/admin/payments/stats", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/admin/payments/stats", headers=headers)
         if response.status_code == 200:
             stats = response.json()
 
         # Get payments list
-        response = requests.get(f"{API_URL}/payments", params=filters, headers=headers)
+        response = api_client.request('GET', f"{API_URL}/payments", params=filters, headers=headers)
         if response.status_code == 200:
             payments_list = response.json().get('payments', [])
 
@@ -184,7 +193,7 @@ def payments():
 def verify_payment(payment_id):
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.post(f"{API_URL}/admin/payments/{payment_id}/verify", headers=headers)
+        response = api_client.request('POST', f"{API_URL}/admin/payments/{payment_id}/verify", headers=headers)
 
         if response.status_code == 200:
             return jsonify({'success': True, 'message': 'Payment verified successfully'})
@@ -200,7 +209,7 @@ def events():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/events", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/events", headers=headers)
         if response.status_code == 200:
             events_list = response.json().get('events', [])
     except:
@@ -229,9 +238,10 @@ def create_event():
 
         try:
             headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-            response = requests.post(f"{API_URL}/events", json=event_data, headers=headers)
+            response = api_client.request('POST', f"{API_URL}/events", json=event_data, headers=headers)
 
             if response.status_code == 201:
+                response_cache.invalidate('events')
                 flash('Event created successfully!', 'success')
                 return redirect(url_for('admin.events'))
             else:
@@ -242,7 +252,7 @@ def create_event():
     # Get provinces for dropdown
     provinces = []
     try:
-        response = requests.get(f"{API_URL}/demographics/provinces")
+        response = api_client.request('GET', f"{API_URL}/demographics/provinces")
         if response.status_code == 200:
             provinces = response.json()
     except:
@@ -266,9 +276,10 @@ def edit_event(event_id):
 
         try:
             headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-            response = requests.put(f"{API_URL}/events/{event_id}", json=event_data, headers=headers)
+            response = api_client.request('PUT', f"{API_URL}/events/{event_id}", json=event_data, headers=headers)
 
             if response.status_code == 200:
+                response_cache.invalidate('events')
                 flash('Event updated successfully!', 'success')
                 return redirect(url_for('admin.events'))
             else:
@@ -280,7 +291,7 @@ def edit_event(event_id):
     event = None
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/events/{event_id}", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/events/{event_id}", headers=headers)
         if response.status_code == 200:
             event = response.json()
     except:
@@ -302,12 +313,12 @@ def communications():
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
 
         # Get communication campaigns
-        response = requests.get(f"{API_URL}/communications/campaigns", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/communications/campaigns", headers=headers)
         if response.status_code == 200:
             campaigns = response.json()
 
         # Get message templates
-        response = requests.get(f"{API_URL}/communications/templates", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/communications/templates", headers=headers)
         if response.status_code == 200:
             templates = response.json()
 
@@ -329,7 +340,7 @@ def broadcast_message():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.post(f"{API_URL}/communications/broadcast",
+        response = api_client.request('POST', f"{API_URL}/communications/broadcast",
                                 json=message_data, headers=headers)
 
         if response.status_code == 201:
@@ -354,7 +365,7 @@ def generate_report():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.post(f"{API_URL}/admin/reports/generate",
+        response = api_client.request('POST', f"{API_URL}/admin/reports/generate",
                                 json={
                                     'report_type': report_type,
                                     'date_from': date_from,
@@ -377,7 +388,7 @@ def settings():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/admin/settings", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/admin/settings", headers=headers)
         if response.status_code == 200:
             settings_data = response.json()
     except:
@@ -392,10 +403,11 @@ def update_settings():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.put(f"{API_URL}/admin/settings",
+        response = api_client.request('PUT', f"{API_URL}/admin/settings",
                                json=settings_data, headers=headers)
 
         if response.status_code == 200:
+            response_cache.invalidate('public')
             return jsonify({'success': True, 'message': 'Settings updated successfully'})
         else:
             return jsonify({'success': False, 'message': 'Failed to update settings'}), 400
@@ -409,7 +421,7 @@ def users():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/admin/users", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/admin/users", headers=headers)
         if response.status_code == 200:
             users_list = response.json()
     except:
@@ -430,7 +442,7 @@ def create_user():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.post(f"{API_URL}/admin/users",
+        response = api_client.request('POST', f"{API_URL}/admin/users",
                                 json=user_data, headers=headers)
 
         if response.status_code == 201:
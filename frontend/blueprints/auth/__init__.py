@@ -2,6 +2,8 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 import requests
+from api_client import api_client, revoke_tokens, store_tokens
+from session_store import regenerate_session
 import jwt
 import datetime
 import re
@@ -55,7 +57,8 @@ def login():
 
         try:
             # Call backend API for authentication
-            response = requests.post(
+            response = api_client.request(
+                'POST',
                 f"{API_URL}/auth/login",
                 json={'username': identifier, 'password': password},
                 timeout=10
@@ -67,7 +70,8 @@ def login():
                 access_token = token_data.get('access_token')
 
                 # Fetch user profile using the token
-                profile_response = requests.get(
+                profile_response = api_client.request(
+                    'GET',
                     f"{API_URL}/members/me/profile",
                     headers={'Authorization': f'Bearer {access_token}'},
                     timeout=10
@@ -76,8 +80,9 @@ def login():
                 if profile_response.status_code == 200:
                     member_data = profile_response.json()
 
-                    # Create session
-                    session['user_token'] = access_token
+                    # Create session, under a new session id
+                    regenerate_session()
+                    store_tokens(token_data)
                     session['user_id'] = member_data.get('id')
                     session['user_name'] = f"{member_data.get('first_name', '')} {member_data.get('last_name', '')}".strip()
                     session['user_role'] = 'admin' if member_data.get('is_admin') else 'member'
@@ -149,13 +154,13 @@ def register():
         # Fetch constituency and ward names from geography API
         try:
             if request.form.get('constituency_id'):
-                resp = requests.get(f"{API_URL}/geography/constituencies/{request.form.get('constituency_id')}", timeout=5)
+                resp = api_client.request('GET', f"{API_URL}/geography/constituencies/{request.form.get('constituency_id')}", timeout=5)
                 if resp.status_code == 200:
                     constituency_data = resp.json()
                     form_data['constituency'] = constituency_data.get('constituency_name', 'Unknown')
 
             if request.form.get('ward_id'):
-                resp = requests.get(f"{API_URL}/geography/wards/{request.form.get('ward_id')}", timeout=5)
+                resp = api_client.request('GET', f"{API_URL}/geography/wards/{request.form.get('ward_id')}", timeout=5)
                 if resp.status_code == 200:
                     ward_data = resp.json()
                     form_data['ward'] = ward_data.get('ward_name', 'Unknown')
@@ -197,7 +202,8 @@ def register():
 
         try:
             # Register via backend API
-            response = requests.post(
+            response = api_client.request(
+                'POST',
                 f"{API_URL}/auth/register",
                 json=form_data,
                 timeout=10
@@ -238,7 +244,7 @@ def register():
     # Load provinces for dropdown
     provinces = []
     try:
-        response = requests.get(f"{API_URL}/geography/provinces", timeout=5)
+        response = api_client.request('GET', f"{API_URL}/geography/provinces", timeout=5)
         if response.status_code == 200:
             provinces = response.json()
     except:
@@ -279,13 +285,13 @@ def register_lite():
         # Fetch location names
         try:
             if request.form.get('constituency_id'):
-                resp = requests.get(f"{API_URL}/geography/constituencies/{request.form.get('constituency_id')}", timeout=5)
+                resp = api_client.request('GET', f"{API_URL}/geography/constituencies/{request.form.get('constituency_id')}", timeout=5)
                 if resp.status_code == 200:
                     constituency_data = resp.json()
                     form_data['constituency'] = constituency_data.get('constituency_name', 'Unknown')
 
             if request.form.get('ward_id'):
-                resp = requests.get(f"{API_URL}/geography/wards/{request.form.get('ward_id')}", timeout=5)
+                resp = api_client.request('GET', f"{API_URL}/geography/wards/{request.form.get('ward_id')}", timeout=5)
                 if resp.status_code == 200:
                     ward_data = resp.json()
                     form_data['ward'] = ward_data.get('ward_name', 'Unknown')
@@ -307,7 +313,8 @@ def register_lite():
 
         try:
             # Register via backend API
-            response = requests.post(
+            response = api_client.request(
+                'POST',
                 f"{API_URL}/auth/register",
                 json=form_data,
                 timeout=10
@@ -337,6 +344,7 @@ def register_lite():
 @auth_bp.route('/logout')
 def logout():
     user_name = session.get('user_name', 'User')
+    revoke_tokens()
     session.clear()
     flash(f'Goodbye, {user_name}! You have been logged out.', 'info')
     return redirect(url_for('public.index'))
@@ -347,7 +355,7 @@ def logout():
 @auth_bp.route('/api/provinces')
 def get_provinces():
     try:
-        response = requests.get(f"{API_URL}/geography/provinces")
+        response = api_client.request('GET', f"{API_URL}/geography/provinces")
         if response.status_code == 200:
             return jsonify(response.json())
     except:
@@ -357,7 +365,7 @@ def get_provinces():
 @auth_bp.route('/api/districts/<int:province_id>')
 def get_districts(province_id):
     try:
-        response = requests.get(f"{API_URL}/geography/provinces/{province_id}/districts")
+        response = api_client.request('GET', f"{API_URL}/geography/provinces/{province_id}/districts")
         if response.status_code == 200:
             return jsonify(response.json())
     except:
@@ -367,7 +375,7 @@ def get_districts(province_id):
 @auth_bp.route('/api/constituencies/<int:district_id>')
 def get_constituencies(district_id):
     try:
-        response = requests.get(f"{API_URL}/geography/districts/{district_id}/constituencies")
+        response = api_client.request('GET', f"{API_URL}/geography/districts/{district_id}/constituencies")
         if response.status_code == 200:
             return jsonify(response.json())
     except:
@@ -377,7 +385,7 @@ def get_constituencies(district_id):
 @auth_bp.route('/api/wards/<int:constituency_id>')
 def get_wards(constituency_id):
     try:
-        response = requests.get(f"{API_URL}/geography/constituencies/{constituency_id}/wards")
+        response = api_client.request('GET', f"{API_URL}/geography/constituencies/{constituency_id}/wards")
         if response.status_code == 200:
             return jsonify(response.json())
     except:
@@ -1,11 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, send_file
 from werkzeug.utils import secure_filename
 import pandas as pd
-import docx
-import os
 import re
-from datetime import datetime
 import requests
+from api_client import api_client
 import io
 import csv
 
@@ -14,8 +12,11 @@ import_bp = Blueprint('import_data', __name__, url_prefix='/import')
 # Backend API URL
 API_URL = "http://localhost:57021/api/v1"
 
+# Staged rows shown per preview page
+PREVIEW_PAGE_SIZE = 50
+
 # Allowed file extensions
-ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'docx'}
+ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'docx', 'zip'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -46,16 +47,15 @@ def validate_phone(phone):
         return '0' + phone[3:]
     return None
 
-def parse_gender(gender_str):
-    """Parse gender from various formats"""
-    if not gender_str:
-        return None
-    gender_str = str(gender_str).strip().upper()
-    if gender_str in ['M', 'MALE']:
-        return 'Male'
-    elif gender_str in ['F', 'FEMALE']:
-        return 'Female'
-    return 'Other'
+def api_headers():
+    return {'Authorization': f'Bearer {session.get("user_token")}'}
+
+def api_error(response, default):
+    """Backend error detail, falling back to a generic message"""
+    try:
+        return response.json().get('detail', default)
+    except ValueError:
+        return default
 
 @import_bp.route('/')
 @admin_required
@@ -63,13 +63,12 @@ def index():
     """Main import page"""
     import_history = []
 
-    # Get import history from backend
+    # Get import jobs from backend
     try:
-        headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/imports/history", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/imports", headers=api_headers())
         if response.status_code == 200:
             import_history = response.json()
-    except:
+    except requests.exceptions.RequestException:
         pass
 
     return render_template('import/index.html', history=import_history)
@@ -77,7 +76,7 @@ def index():
 @import_bp.route('/upload', methods=['GET', 'POST'])
 @admin_required
 def upload():
-    """Upload and process bulk member data"""
+    """Hand the uploaded file to the backend, which parses it into a staged import job"""
     if request.method == 'POST':
         if 'file' not in request.files:
             flash('No file selected', 'danger')
@@ -88,362 +87,168 @@ def upload():
             flash('No file selected', 'danger')
             return redirect(url_for('import_data.upload'))
 
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            file_ext = filename.rsplit('.', 1)[1].lower()
-
-            # Save file temporarily
-            temp_path = os.path.join('/tmp', filename)
-            file.save(temp_path)
-
-            try:
-                # Process based on file type
-                if file_ext in ['csv']:
-                    data = process_csv(temp_path)
-                elif file_ext in ['xlsx', 'xls']:
-                    data = process_excel(temp_path)
-                elif file_ext == 'docx':
-                    data = process_docx(temp_path)
-                else:
-                    flash('Unsupported file type', 'danger')
-                    return redirect(url_for('import_data.upload'))
-
-                # Store in session for preview
-                session['import_data'] = data
-                session['import_filename'] = filename
-
-                # Clean up temp file
-                os.remove(temp_path)
-
-                return redirect(url_for('import_data.preview'))
-
-            except Exception as e:
-                flash(f'Error processing file: {str(e)}', 'danger')
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                return redirect(url_for('import_data.upload'))
-        else:
-            flash('Invalid file type. Allowed types: CSV, Excel, DOCX', 'danger')
+        if not allowed_file(file.filename):
+            flash('Invalid file type. Allowed types: CSV, Excel, DOCX, ZIP of DOCX forms', 'danger')
             return redirect(url_for('import_data.upload'))
 
-    return render_template('import/upload.html')
+        # Stream the upload straight through; only the job id is kept in the session
+        filename = secure_filename(file.filename)
+        try:
+            response = api_client.request('POST', f"{API_URL}/imports",
+                                     files={'file': (filename, file.stream, file.mimetype)},
+                                     data={'match_similar': 'true' if request.form.get('match_similar') else 'false'},
+                                     headers=api_headers())
+        except requests.exceptions.RequestException as e:
+            flash(f'Error uploading file: {str(e)}', 'danger')
+            return redirect(url_for('import_data.upload'))
 
-def process_csv(filepath):
-    """Process CSV file and extract member data"""
-    members = []
-
-    with open(filepath, 'r', encoding='utf-8-sig') as file:
-        # Try to detect delimiter
-        sample = file.read(1024)
-        file.seek(0)
-        sniffer = csv.Sniffer()
-        delimiter = sniffer.sniff(sample).delimiter
-
-        reader = csv.DictReader(file, delimiter=delimiter)
-
-        for row in reader:
-            member = extract_member_from_row(row)
-            if member:
-                members.append(member)
-
-    return members
-
-def process_excel(filepath):
-    """Process Excel file and extract member data"""
-    members = []
-
-    # Read Excel file
-    df = pd.read_excel(filepath)
-
-    # Convert to dictionary records
-    for _, row in df.iterrows():
-        member = extract_member_from_row(row.to_dict())
-        if member:
-            members.append(member)
-
-    return members
-
-def process_docx(filepath):
-    """Process DOCX file and extract member data from tables"""
-    members = []
-
-    doc = docx.Document(filepath)
-
-    # Extract location info from header
-    location_info = {'province': '', 'district': '', 'ward': ''}
-    for paragraph in doc.paragraphs:
-        text = paragraph.text.upper()
-        if 'PROVINCE:' in text:
-            # Try to extract province, district, ward
-            parts = text.split()
-            for i, part in enumerate(parts):
-                if 'PROVINCE:' in part and i+1 < len(parts):
-                    location_info['province'] = parts[i+1].strip('.')
-                elif 'DISTRICT:' in part and i+1 < len(parts):
-                    location_info['district'] = parts[i+1].strip('.')
-                elif 'WARD:' in part and i+1 < len(parts):
-                    location_info['ward'] = parts[i+1].strip('.')
-
-    # Process tables
-    for table in doc.tables:
-        # Skip header row
-        for i, row in enumerate(table.rows):
-            if i == 0:
-                continue  # Skip header
-
-            cells = [cell.text.strip() for cell in row.cells]
-
-            # Check if row has data (not just row number)
-            if len(cells) >= 6 and cells[1]:  # Name field is not empty
-                member = {
-                    'name': cells[1],
-                    'gender': parse_gender(cells[2]),
-                    'age': cells[3],
-                    'nrc_number': cells[4],
-                    'voter_id': cells[5],
-                    'phone': validate_phone(cells[6]) if len(cells) > 6 else '',
-                    'province': location_info['province'],
-                    'district': location_info['district'],
-                    'ward': location_info['ward']
-                }
-
-                # Split name into first and last
-                name_parts = member['name'].split()
-                if len(name_parts) >= 2:
-                    member['first_name'] = name_parts[0]
-                    member['last_name'] = ' '.join(name_parts[1:])
-                else:
-                    member['first_name'] = member['name']
-                    member['last_name'] = ''
-
-                # Validate and clean data
-                if member['nrc_number'] and validate_nrc(member['nrc_number']):
-                    members.append(member)
-
-    return members
-
-def extract_member_from_row(row):
-    """Extract member data from a row (dict)"""
-    member = {}
-
-    # Map common column names
-    name_fields = ['name', 'Name', 'NAME', 'full_name', 'Full Name']
-    fname_fields = ['first_name', 'First Name', 'FIRST_NAME', 'fname']
-    lname_fields = ['last_name', 'Last Name', 'LAST_NAME', 'lname', 'surname']
-    nrc_fields = ['nrc', 'NRC', 'nrc_number', 'NRC Number', 'national_id']
-    phone_fields = ['phone', 'Phone', 'PHONE', 'contact', 'Contact', 'mobile']
-    gender_fields = ['gender', 'Gender', 'GENDER', 'sex', 'Sex']
-    age_fields = ['age', 'Age', 'AGE']
-    voter_fields = ['voter_id', 'Voter ID', "Voter's ID", 'voter_registration']
-
-    # Extract name
-    for field in name_fields:
-        if field in row and row[field]:
-            name_parts = str(row[field]).split()
-            if len(name_parts) >= 2:
-                member['first_name'] = name_parts[0]
-                member['last_name'] = ' '.join(name_parts[1:])
-            break
-
-    # Or extract first and last name separately
-    for field in fname_fields:
-        if field in row and row[field]:
-            member['first_name'] = str(row[field]).strip()
-            break
-
-    for field in lname_fields:
-        if field in row and row[field]:
-            member['last_name'] = str(row[field]).strip()
-            break
-
-    # Extract NRC
-    for field in nrc_fields:
-        if field in row and row[field]:
-            nrc = str(row[field]).strip()
-            if validate_nrc(nrc):
-                member['nrc_number'] = nrc
-            break
-
-    # Extract phone
-    for field in phone_fields:
-        if field in row and row[field]:
-            phone = validate_phone(str(row[field]))
-            if phone:
-                member['phone'] = phone
-            break
-
-    # Extract gender
-    for field in gender_fields:
-        if field in row and row[field]:
-            member['gender'] = parse_gender(row[field])
-            break
-
-    # Extract age
-    for field in age_fields:
-        if field in row and row[field]:
-            try:
-                age = int(float(str(row[field])))
-                if 18 <= age <= 120:
-                    member['age'] = age
-            except:
-                pass
-            break
-
-    # Extract voter ID
-    for field in voter_fields:
-        if field in row and row[field]:
-            member['voter_registration_number'] = str(row[field]).strip()
-            break
-
-    # Only return if we have minimum required fields
-    if member.get('first_name') and member.get('nrc_number'):
-        return member
+        if response.status_code != 202:
+            flash(api_error(response, 'Error processing file'), 'danger')
+            return redirect(url_for('import_data.upload'))
 
-    return None
+        session['import_job_id'] = response.json()['id']
+        return redirect(url_for('import_data.preview'))
+
+    return render_template('import/upload.html')
 
 @import_bp.route('/preview')
 @admin_required
 def preview():
-    """Preview data before importing"""
-    data = session.get('import_data', [])
-    filename = session.get('import_filename', 'Unknown')
-
-    if not data:
+    """Preview one page of the staged rows before importing"""
+    job_id = session.get('import_job_id')
+    if not job_id:
         flash('No data to preview', 'warning')
         return redirect(url_for('import_data.upload'))
 
-    # Validate each record
-    for member in data:
-        member['valid'] = bool(
-            member.get('first_name') and
-            member.get('nrc_number') and
-            validate_nrc(member.get('nrc_number', ''))
-        )
-        member['errors'] = []
+    page = request.args.get('page', 1, type=int)
+    params = {'page': page, 'per_page': PREVIEW_PAGE_SIZE}
+    if request.args.get('valid') in ('true', 'false'):
+        params['valid'] = request.args['valid']
+    if request.args.get('flagged') == 'true':
+        params['flagged'] = 'true'
+
+    try:
+        response = api_client.request('GET', f"{API_URL}/imports/{job_id}/rows", params=params, headers=api_headers())
+    except requests.exceptions.RequestException as e:
+        flash(f'Error loading import: {str(e)}', 'danger')
+        return redirect(url_for('import_data.upload'))
 
-        if not member.get('first_name'):
-            member['errors'].append('Missing first name')
-        if not member.get('last_name'):
-            member['errors'].append('Missing last name')
-        if not validate_nrc(member.get('nrc_number', '')):
-            member['errors'].append('Invalid NRC format')
-        if member.get('phone') and not validate_phone(member.get('phone')):
-            member['errors'].append('Invalid phone number')
+    if response.status_code != 200:
+        session.pop('import_job_id', None)
+        flash(api_error(response, 'Import not found'), 'danger')
+        return redirect(url_for('import_data.upload'))
+
+    result = response.json()
+    job = result['job']
+    if job['status'] == 'failed':
+        session.pop('import_job_id', None)
+        flash(f"Error processing file: {job.get('error') or 'unknown error'}", 'danger')
+        return redirect(url_for('import_data.upload'))
 
-    valid_count = sum(1 for m in data if m['valid'])
-    invalid_count = len(data) - valid_count
+    for row in result['rows']:
+        row['errors'] = row['errors'].split('; ') if row['errors'] else []
+        row['warnings'] = row['warnings'].split('; ') if row.get('warnings') else []
 
     return render_template('import/preview.html',
-                         data=data,
-                         filename=filename,
-                         total=len(data),
-                         valid=valid_count,
-                         invalid=invalid_count)
+                         job=job,
+                         data=result['rows'],
+                         filename=job['filename'],
+                         total=job['total_rows'],
+                         valid=job['valid_rows'],
+                         invalid=job['invalid_rows'],
+                         page=page,
+                         pages=max(1, -(-result['total'] // PREVIEW_PAGE_SIZE)),
+                         valid_filter=params.get('valid'),
+                         flagged_filter=params.get('flagged'),
+                         parsing=job['status'] in ('uploaded', 'parsing'))
 
 @import_bp.route('/process', methods=['POST'])
 @admin_required
 def process():
-    """Process the import"""
-    data = session.get('import_data', [])
+    """Commit the staged import job"""
+    job_id = session.get('import_job_id')
 
-    if not data:
+    if not job_id:
         flash('No data to import', 'warning')
         return redirect(url_for('import_data.upload'))
 
-    # Filter valid records only
-    valid_members = [m for m in data if m.get('valid', False)]
+    try:
+        response = api_client.request('POST', f"{API_URL}/imports/{job_id}/commit", headers=api_headers())
+    except requests.exceptions.RequestException as e:
+        flash(f'Import failed: {str(e)}', 'danger')
+        return redirect(url_for('import_data.preview'))
 
-    if not valid_members:
-        flash('No valid records to import', 'danger')
+    if response.status_code != 202:
+        flash(api_error(response, 'Import failed'), 'danger')
         return redirect(url_for('import_data.preview'))
 
-    # Prepare for import
-    import_batch = {
-        'filename': session.get('import_filename', 'Unknown'),
-        'total_records': len(data),
-        'valid_records': len(valid_members),
-        'imported_by': session.get('user_id'),
-        'members': []
-    }
-
-    success_count = 0
-    error_count = 0
-    errors = []
-
-    # Process each member
-    for member in valid_members:
-        # Prepare member data for API
-        member_data = {
-            'first_name': member.get('first_name'),
-            'last_name': member.get('last_name', ''),
-            'nrc_number': member.get('nrc_number'),
-            'phone': member.get('phone', ''),
-            'gender': member.get('gender', 'Other'),
-            'age': member.get('age'),
-            'voter_registration_number': member.get('voter_registration_number', ''),
-            'password': member.get('nrc_number', '').replace('/', ''),  # Default password is NRC without slashes
-            'registration_channel': 'bulk_import'
-        }
-
-        # Add location if available
-        if member.get('province'):
-            member_data['province'] = member['province']
-        if member.get('district'):
-            member_data['district'] = member['district']
-        if member.get('ward'):
-            member_data['ward'] = member['ward']
-
-        # Send to API
-        try:
-            headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-            response = requests.post(f"{API_URL}/members/register",
-                                    json=member_data,
-                                    headers=headers)
-
-            if response.status_code in [200, 201]:
-                success_count += 1
-                result = response.json()
-                import_batch['members'].append({
-                    'name': f"{member['first_name']} {member.get('last_name', '')}",
-                    'membership_number': result.get('membership_number'),
-                    'status': 'success'
-                })
-            else:
-                error_count += 1
-                error_msg = response.json().get('detail', 'Import failed')
-                errors.append(f"{member['first_name']} {member.get('last_name', '')}: {error_msg}")
-
-        except Exception as e:
-            error_count += 1
-            errors.append(f"{member['first_name']} {member.get('last_name', '')}: {str(e)}")
-
-    # Clear session data
-    session.pop('import_data', None)
-    session.pop('import_filename', None)
-
-    # Show results
-    flash(f'Import completed: {success_count} successful, {error_count} failed',
-          'success' if error_count == 0 else 'warning')
-
-    if errors:
-        for error in errors[:10]:  # Show first 10 errors
-            flash(error, 'danger')
-
-    return redirect(url_for('import_data.results',
-                          success=success_count,
-                          failed=error_count))
+    # The import runs in the background; the results page follows its progress
+    return redirect(url_for('import_data.results', job=job_id))
+
+@import_bp.route('/retry/<int:job_id>', methods=['POST'])
+@admin_required
+def retry(job_id):
+    """Parse a failed or interrupted job's file again, then preview it"""
+    try:
+        response = api_client.request('POST', f"{API_URL}/imports/{job_id}/retry", headers=api_headers())
+    except requests.exceptions.RequestException as e:
+        flash(f'Retry failed: {str(e)}', 'danger')
+        return redirect(url_for('import_data.index'))
+
+    if response.status_code != 202:
+        flash(api_error(response, 'Retry failed'), 'danger')
+        return redirect(url_for('import_data.index'))
+
+    session['import_job_id'] = job_id
+    return redirect(url_for('import_data.preview'))
+
+@import_bp.route('/progress/<int:job_id>')
+@admin_required
+def progress(job_id):
+    """Import job progress as JSON, for polling from the preview and results pages"""
+    try:
+        response = api_client.request('GET', f"{API_URL}/imports/{job_id}/progress", headers=api_headers())
+    except requests.exceptions.RequestException as e:
+        return jsonify({'detail': str(e)}), 502
+    return jsonify(response.json()), response.status_code
 
 @import_bp.route('/results')
 @admin_required
 def results():
-    """Show import results"""
-    success = request.args.get('success', 0, type=int)
-    failed = request.args.get('failed', 0, type=int)
+    """Show an import's progress while it runs, then its results"""
+    job_id = request.args.get('job', type=int)
+    if not job_id:
+        return redirect(url_for('import_data.index'))
+
+    try:
+        response = api_client.request('GET', f"{API_URL}/imports/{job_id}/progress", headers=api_headers())
+    except requests.exceptions.RequestException as e:
+        flash(f'Error loading import: {str(e)}', 'danger')
+        return redirect(url_for('import_data.index'))
+
+    if response.status_code != 200:
+        flash(api_error(response, 'Import not found'), 'danger')
+        return redirect(url_for('import_data.index'))
+
+    progress = response.json()
+    if progress['status'] == 'staged':
+        # The import failed and was rolled back; its rows are still staged
+        session['import_job_id'] = job_id
+        flash(progress.get('error') or 'Import failed', 'danger')
+        return redirect(url_for('import_data.preview'))
+
+    running = progress['status'] != 'completed'
+    if not running and session.get('import_job_id') == job_id:
+        session.pop('import_job_id', None)
 
+    success = progress['imported_rows']
+    failed = progress['failed_rows'] + progress['skipped_rows']
     return render_template('import/results.html',
+                         progress=progress,
+                         running=running,
                          success=success,
                          failed=failed,
-                         total=success+failed)
+                         total=success + failed)
 
 @import_bp.route('/template/<format>')
 @admin_required
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, Response
 from functools import wraps
 import requests
+from api_client import api_client
 from datetime import datetime
 import os
 
@@ -14,7 +15,7 @@ API_URL = os.environ.get('API_URL', 'http://backend:8000') + "/api"
 def serve_upload(filename):
     """Proxy uploaded files from backend"""
     try:
-        response = requests.get(f"http://localhost:57021/uploads/{filename}", stream=True)
+        response = api_client.request('GET', f"http://localhost:57021/uploads/{filename}", stream=True)
         return Response(
             response.content,
             status=response.status_code,
@@ -36,7 +37,7 @@ def get_member_data():
     """Helper function to get current member data"""
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/members/{session.get('user_id')}", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{session.get('user_id')}", headers=headers)
         if response.status_code == 200:
             data = response.json()
             # Transform photo_url to use frontend proxy route
@@ -96,7 +97,7 @@ def dashboard():
     # Get recent payments
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/payments/member/{session.get('user_id')}/recent", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/payments/member/{session.get('user_id')}/recent", headers=headers)
         if response.status_code == 200:
             payments = response.json()
             if payments:
@@ -106,7 +107,7 @@ def dashboard():
 
     # Get upcoming events
     try:
-        response = requests.get(f"{API_URL}/events/upcoming", headers={'Authorization': f'Bearer {session.get("user_token")}'})
+        response = api_client.request('GET', f"{API_URL}/events/upcoming", headers={'Authorization': f'Bearer {session.get("user_token")}'})
         if response.status_code == 200:
             stats['upcoming_events'] = response.json().get('events', [])[:5]
     except:
@@ -115,7 +116,7 @@ def dashboard():
     # Get events attended count (when endpoint exists)
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/activities/member/{session.get('user_id')}/count", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/activities/member/{session.get('user_id')}/count", headers=headers)
         if response.status_code == 200:
             stats['events_attended'] = response.json().get('count', 0)
             member_data['events_attended'] = stats['events_attended']
@@ -125,7 +126,7 @@ def dashboard():
     # Get referrals count (when endpoint exists)
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/members/{session.get('user_id')}/referrals", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{session.get('user_id')}/referrals", headers=headers)
         if response.status_code == 200:
             referral_data = response.json()
             stats['referrals_count'] = referral_data.get('stats', {}).get('total', 0) if isinstance(referral_data, dict) else len(referral_data)
@@ -202,7 +203,8 @@ def edit_profile():
                     headers = {'Authorization': f'Bearer {session.get("user_token")}'}
                     files = {'photo': (photo_file.filename, photo_file.read(), photo_file.content_type)}
 
-                    photo_response = requests.post(
+                    photo_response = api_client.request(
+                        'POST',
                         f"{API_URL}/members/{session.get('user_id')}/upload-photo",
                         files=files,
                         headers=headers,
@@ -243,13 +245,13 @@ def edit_profile():
             ward_id = request.form.get('ward_id')
 
             if constituency_id:
-                resp = requests.get(f"{API_URL}/geography/constituencies/{constituency_id}", timeout=5)
+                resp = api_client.request('GET', f"{API_URL}/geography/constituencies/{constituency_id}", timeout=5)
                 if resp.status_code == 200:
                     constituency_data = resp.json()
                     update_data['constituency'] = constituency_data.get('constituency_name')
 
             if ward_id:
-                resp = requests.get(f"{API_URL}/geography/wards/{ward_id}", timeout=5)
+                resp = api_client.request('GET', f"{API_URL}/geography/wards/{ward_id}", timeout=5)
                 if resp.status_code == 200:
                     ward_data = resp.json()
                     update_data['ward'] = ward_data.get('ward_name')
@@ -264,7 +266,8 @@ def edit_profile():
 
         try:
             headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-            response = requests.put(
+            response = api_client.request(
+                'PUT',
                 f"{API_URL}/members/{session.get('user_id')}",
                 json=update_data,
                 headers=headers,
@@ -344,7 +347,7 @@ def payments():
     payments_list = []
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/payments/member/{session.get('user_id')}", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/payments/member/{session.get('user_id')}", headers=headers)
         if response.status_code == 200:
             payments_list = response.json()
     except:
@@ -369,7 +372,7 @@ def make_payment():
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
         print(f"DEBUG: Posting to {API_URL}/payments with data: {payment_data}")
-        response = requests.post(f"{API_URL}/payments", json=payment_data, headers=headers)
+        response = api_client.request('POST', f"{API_URL}/payments", json=payment_data, headers=headers)
         print(f"DEBUG: Response status: {response.status_code}, Response: {response.text}")
 
         if response.status_code in [200, 201]:
@@ -396,12 +399,12 @@ def events():
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
         # Get all events
-        response = requests.get(f"{API_URL}/events", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/events", headers=headers)
         if response.status_code == 200:
             events_list = response.json().get('events', [])
 
         # Get member's registrations
-        response = requests.get(f"{API_URL}/events/member/{session.get('user_id')}/registrations", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/events/member/{session.get('user_id')}/registrations", headers=headers)
         if response.status_code == 200:
             registrations = [r['event_id'] for r in response.json()]
     except:
@@ -419,7 +422,7 @@ def register_event(event_id):
             'event_id': event_id
         }
 
-        response = requests.post(f"{API_URL}/events/{event_id}/register",
+        response = api_client.request('POST', f"{API_URL}/events/{event_id}/register",
                                 json=registration_data, headers=headers)
 
         if response.status_code == 201:
@@ -434,7 +437,7 @@ def register_event(event_id):
 def event_details(event_id):
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/events/{event_id}", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/events/{event_id}", headers=headers)
 
         if response.status_code == 200:
             return jsonify({'success': True, 'event': response.json()})
@@ -449,7 +452,7 @@ def documents():
     documents_list = []
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/members/{session.get('user_id')}/documents", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{session.get('user_id')}/documents", headers=headers)
         if response.status_code == 200:
             documents_list = response.json()
     except:
@@ -499,7 +502,7 @@ def membership_card():
 def download_card():
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/members/{session.get('user_id')}/card", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{session.get('user_id')}/card", headers=headers)
 
         if response.status_code == 200:
             # Return the PDF file
@@ -518,7 +521,7 @@ def activities():
     activities_list = []
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/members/{session.get('user_id')}/activities", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{session.get('user_id')}/activities", headers=headers)
         if response.status_code == 200:
             activities_list = response.json()
     except:
@@ -535,12 +538,12 @@ def volunteer():
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
         # Get volunteer opportunities
-        response = requests.get(f"{API_URL}/volunteer/opportunities", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/volunteer/opportunities", headers=headers)
         if response.status_code == 200:
             opportunities = response.json()
 
         # Get member's volunteer history
-        response = requests.get(f"{API_URL}/volunteer/member/{session.get('user_id')}", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/volunteer/member/{session.get('user_id')}", headers=headers)
         if response.status_code == 200:
             my_volunteering = response.json()
     except:
@@ -561,7 +564,7 @@ def volunteer_signup(opportunity_id):
             'availability': request.json.get('availability')
         }
 
-        response = requests.post(f"{API_URL}/volunteer/signup",
+        response = api_client.request('POST', f"{API_URL}/volunteer/signup",
                                 json=signup_data, headers=headers)
 
         if response.status_code == 201:
@@ -579,7 +582,7 @@ def referrals():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.get(f"{API_URL}/members/{session.get('user_id')}/referrals", headers=headers)
+        response = api_client.request('GET', f"{API_URL}/members/{session.get('user_id')}/referrals", headers=headers)
         if response.status_code == 200:
             data = response.json()
             referrals_list = data.get('referrals', [])
@@ -603,7 +606,7 @@ def send_referral():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.post(f"{API_URL}/referrals/send", json=referral_data, headers=headers)
+        response = api_client.request('POST', f"{API_URL}/referrals/send", json=referral_data, headers=headers)
 
         if response.status_code in [200, 201]:
             result = response.json()
@@ -645,7 +648,7 @@ def update_notifications():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.put(f"{API_URL}/members/{session.get('user_id')}/notifications",
+        response = api_client.request('PUT', f"{API_URL}/members/{session.get('user_id')}/notifications",
                                json=settings_data, headers=headers)
 
         if response.status_code == 200:
@@ -668,7 +671,7 @@ def change_password():
 
     try:
         headers = {'Authorization': f'Bearer {session.get("user_token")}'}
-        response = requests.put(f"{API_URL}/members/{session.get('user_id')}/change-password",
+        response = api_client.request('PUT', f"{API_URL}/members/{session.get('user_id')}/change-password",
                                json=password_data, headers=headers)
 
         if response.status_code == 200:
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, session, request, current_app
 import requests
 import os
+from response_cache import response_cache, dont_cache, fetch_json
 
 public_bp = Blueprint('public', __name__)
 
@@ -8,7 +9,13 @@ public_bp = Blueprint('public', __name__)
 API_URL = os.environ.get('API_URL', 'http://backend:8000') + "/api/v1"
 GEOGRAPHY_API_URL = os.environ.get('API_URL', 'http://backend:8000') + "/api/geography"
 
+# Anonymous landing traffic during campaigns is served from the page cache;
+# the backend data behind it is refreshed in the background when it ages
+PAGE_TIMEOUT = 60
+GEOGRAPHY_TIMEOUT = 3600
+
 @public_bp.route('/')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def index():
     # If user is logged in, redirect to appropriate dashboard
     if 'user_token' in session:
@@ -26,27 +33,30 @@ def index():
     }
 
     try:
-        response = requests.get(f"{API_URL}/public/stats")
-        if response.status_code == 200:
-            stats.update(response.json())
+        stats.update(response_cache.get_data('public/stats', fetch_json(f"{API_URL}/public/stats"),
+                                             tags=('statistics',)))
     except:
-        pass
+        dont_cache()
 
     return render_template('public/index.html', stats=stats)
 
 @public_bp.route('/about')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def about():
     return render_template('public/about.html')
 
 @public_bp.route('/contact')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def contact():
     return render_template('public/contact.html')
 
 @public_bp.route('/privacy')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def privacy():
     return render_template('public/privacy.html')
 
 @public_bp.route('/terms')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def terms():
     return render_template('public/terms.html')
 
@@ -56,14 +66,17 @@ def set_language(lang):
     return redirect(request.referrer or url_for('public.index'))
 
 @public_bp.route('/ussd-info')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def ussd_info():
     return render_template('public/ussd_info.html')
 
 @public_bp.route('/mobile-app')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def mobile_app():
     return render_template('public/mobile_app.html')
 
 @public_bp.route('/voter-info')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def voter_info():
     # Get voter education information
     voter_data = {
@@ -73,37 +86,36 @@ def voter_info():
     }
 
     try:
-        response = requests.get(f"{API_URL}/public/voter-info")
-        if response.status_code == 200:
-            voter_data = response.json()
+        voter_data = response_cache.get_data('public/voter-info', fetch_json(f"{API_URL}/public/voter-info"),
+                                             tags=('public',))
     except:
-        pass
+        dont_cache()
 
     return render_template('public/voter_info.html', voter_data=voter_data)
 
 @public_bp.route('/news')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def news():
     news_items = []
 
     try:
-        response = requests.get(f"{API_URL}/public/news")
-        if response.status_code == 200:
-            news_items = response.json().get('news', [])
+        news_items = response_cache.get_data('public/news', fetch_json(f"{API_URL}/public/news"),
+                                             tags=('news',)).get('news', [])
     except:
-        pass
+        dont_cache()
 
     return render_template('public/news.html', news=news_items)
 
 @public_bp.route('/news/<int:news_id>')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def news_detail(news_id):
     article = None
 
     try:
-        response = requests.get(f"{API_URL}/public/news/{news_id}")
-        if response.status_code == 200:
-            article = response.json()
+        article = response_cache.get_data(f'public/news/{news_id}', fetch_json(f"{API_URL}/public/news/{news_id}"),
+                                          tags=('news',))
     except:
-        pass
+        dont_cache()
 
     if not article:
         return redirect(url_for('public.news'))
@@ -111,19 +123,20 @@ def news_detail(news_id):
     return render_template('public/news_detail.html', article=article)
 
 @public_bp.route('/events')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def public_events():
     events = []
 
     try:
-        response = requests.get(f"{API_URL}/public/events")
-        if response.status_code == 200:
-            events = response.json().get('events', [])
+        events = response_cache.get_data('public/events', fetch_json(f"{API_URL}/public/events"),
+                                         tags=('events',)).get('events', [])
     except:
-        pass
+        dont_cache()
 
     return render_template('public/events.html', events=events)
 
 @public_bp.route('/party-structure')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def party_structure():
     structure_data = {
         'leadership': [],
@@ -132,15 +145,15 @@ def party_structure():
     }
 
     try:
-        response = requests.get(f"{API_URL}/public/party-structure")
-        if response.status_code == 200:
-            structure_data = response.json()
+        structure_data = response_cache.get_data('public/party-structure', fetch_json(f"{API_URL}/public/party-structure"),
+                                                 tags=('public',))
     except:
-        pass
+        dont_cache()
 
     return render_template('public/party_structure.html', structure=structure_data)
 
 @public_bp.route('/manifesto')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def manifesto():
     manifesto_data = {
         'vision': '',
@@ -150,41 +163,41 @@ def manifesto():
     }
 
     try:
-        response = requests.get(f"{API_URL}/public/manifesto")
-        if response.status_code == 200:
-            manifesto_data = response.json()
+        manifesto_data = response_cache.get_data('public/manifesto', fetch_json(f"{API_URL}/public/manifesto"),
+                                                 tags=('public',))
     except:
-        pass
+        dont_cache()
 
     return render_template('public/manifesto.html', manifesto=manifesto_data)
 
 @public_bp.route('/donate')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def donate():
     donation_options = []
 
     try:
-        response = requests.get(f"{API_URL}/public/donation-options")
-        if response.status_code == 200:
-            donation_options = response.json()
+        donation_options = response_cache.get_data('public/donation-options', fetch_json(f"{API_URL}/public/donation-options"),
+                                                   tags=('public',))
     except:
-        pass
+        dont_cache()
 
     return render_template('public/donate.html', options=donation_options)
 
 @public_bp.route('/faq')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def faq():
     faqs = []
 
     try:
-        response = requests.get(f"{API_URL}/public/faqs")
-        if response.status_code == 200:
-            faqs = response.json()
+        faqs = response_cache.get_data('public/faqs', fetch_json(f"{API_URL}/public/faqs"),
+                                       tags=('public',))
     except:
-        pass
+        dont_cache()
 
     return render_template('public/faq.html', faqs=faqs)
 
 @public_bp.route('/social-media')
+@response_cache.cached_page(timeout=PAGE_TIMEOUT)
 def social_media():
     return render_template('public/social_media.html')
 
@@ -192,10 +205,10 @@ def social_media():
 @public_bp.route('/api/geography/provinces')
 def get_provinces():
     try:
-        response = requests.get(f"{GEOGRAPHY_API_URL}/provinces")
-        if response.status_code == 200:
-            return response.json()
-        return [], response.status_code
+        return response_cache.get_data('geography/provinces', fetch_json(f"{GEOGRAPHY_API_URL}/provinces"),
+                                       timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
+    except requests.exceptions.HTTPError as e:
+        return [], e.response.status_code
     except Exception as e:
         print(f"Error fetching provinces: {e}")
         return [], 500
@@ -207,10 +220,11 @@ def get_districts():
         return {'error': 'province_id is required'}, 400
 
     try:
-        response = requests.get(f"{GEOGRAPHY_API_URL}/districts?province_id={province_id}")
-        if response.status_code == 200:
-            return response.json()
-        return [], response.status_code
+        return response_cache.get_data(f'geography/districts/{province_id}',
+                                       fetch_json(f"{GEOGRAPHY_API_URL}/districts", params={'province_id': province_id}),
+                                       timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
+    except requests.exceptions.HTTPError as e:
+        return [], e.response.status_code
     except Exception as e:
         print(f"Error fetching districts: {e}")
         return [], 500
@@ -222,10 +236,11 @@ def get_constituencies():
         return {'error': 'district_id is required'}, 400
 
     try:
-        response = requests.get(f"{GEOGRAPHY_API_URL}/constituencies?district_id={district_id}")
-        if response.status_code == 200:
-            return response.json()
-        return [], response.status_code
+        return response_cache.get_data(f'geography/constituencies/{district_id}',
+                                       fetch_json(f"{GEOGRAPHY_API_URL}/constituencies", params={'district_id': district_id}),
+                                       timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
+    except requests.exceptions.HTTPError as e:
+        return [], e.response.status_code
     except Exception as e:
         print(f"Error fetching constituencies: {e}")
         return [], 500
@@ -237,10 +252,11 @@ def get_wards():
         return {'error': 'constituency_id is required'}, 400
 
     try:
-        response = requests.get(f"{GEOGRAPHY_API_URL}/wards?constituency_id={constituency_id}")
-        if response.status_code == 200:
-            return response.json()
-        return [], response.status_code
+        return response_cache.get_data(f'geography/wards/{constituency_id}',
+                                       fetch_json(f"{GEOGRAPHY_API_URL}/wards", params={'constituency_id': constituency_id}),
+                                       timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
+    except requests.exceptions.HTTPError as e:
+        return [], e.response.status_code
     except Exception as e:
         print(f"Error fetching wards: {e}")
         return [], 500
@@ -16,6 +16,8 @@ class Config:
     API_BASE_URL = os.environ.get('API_URL', 'http://backend:8000')
     API_VERSION = 'v1'
     API_TIMEOUT = 30
+    API_BREAKER_FAILURE_THRESHOLD = 3
+    API_BREAKER_RESET_TIMEOUT = 30  # seconds before probing /health again
 
     # Party Information
     PARTY_NAME = 'Alliance for Democracy and Development'
@@ -44,7 +46,12 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     # Session Configuration
-    SESSION_TYPE = 'filesystem'
+    # sqlite or redis: server-side sessions (session_store.py); filesystem: Flask-Session
+    SESSION_TYPE = os.environ.get('SESSION_TYPE', 'sqlite')
+    SESSION_SQLITE_PATH = os.environ.get('SESSION_SQLITE_PATH')  # default: sessions.db in the instance folder
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL', 'redis://localhost:6379/1')
+    SESSION_MAX_BYTES = 8192  # whole session, serialized
+    SESSION_MAX_VALUE_BYTES = 2048  # any one value
     SESSION_PERMANENT = False
     PERMANENT_SESSION_LIFETIME = timedelta(hours=2)
     SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
@@ -73,8 +80,12 @@ class Config:
     DEFAULT_LANGUAGE = 'en'
 
     # Cache Configuration
-    CACHE_TYPE = 'simple'
+    # simple: in-process LRU; redis: shared by all workers; null: disabled (response_cache.py)
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/2')
     CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_STALE_TIMEOUT = 600  # seconds backend data may be served stale while it is refreshed
+    CACHE_MAX_ENTRIES = 1024  # simple cache only
 
     # Security Headers
     SECURITY_HEADERS = {
@@ -112,6 +123,8 @@ class TestingConfig(Config):
     TESTING = True
     WTF_CSRF_ENABLED = False
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SESSION_SQLITE_PATH = '/tmp/frontend_sessions_test.db'
+    CACHE_TYPE = 'null'
 
 # Configuration dictionary
 config = {
@@ -8,6 +8,10 @@ from flask_session import Session
 import requests
 from functools import wraps
 from flask import current_app, session, redirect, url_for, flash
+from api_client import api_breaker, api_client
+from session_store import SESSION_STORES, init_session_store
+from response_cache import response_cache
+from metrics import init_metrics
 
 # Initialize extensions
 login_manager = LoginManager()
@@ -31,7 +35,19 @@ def init_extensions(app):
             return {'csrf_token': lambda: ''}
 
     # Session
-    sess.init_app(app)
+    if app.config.get('SESSION_TYPE') in SESSION_STORES:
+        init_session_store(app)
+    else:
+        sess.init_app(app)
+
+    # Page and backend data cache
+    response_cache.init_app(app)
+
+    # Request latency on /metrics
+    init_metrics(app)
+
+    # Backend client: circuit breaker and token refresh
+    api_client.init_app(app)
 
     # Login Manager
     login_manager.init_app(app)
@@ -59,22 +75,22 @@ def admin_required(f):
     return decorated_function
 
 def api_required(f):
-    """Decorator to check API availability"""
+    """
+    Decorator to check API availability
+
+    Views under it reach the backend through api_client, which has already
+    fed the circuit breaker by the time a connection error gets here.
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        if not api_breaker.allow_request():
+            flash('System is currently unavailable. Please try again later.', 'warning')
+            return redirect(url_for('public.index'))
         try:
-            # Check if API is accessible
-            response = requests.get(
-                f"{current_app.config['API_BASE_URL']}/health",
-                timeout=5
-            )
-            if response.status_code != 200:
-                flash('System is currently unavailable. Please try again later.', 'warning')
-                return redirect(url_for('public.index'))
-        except:
+            return f(*args, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             flash('Cannot connect to server. Please check your connection.', 'danger')
             return redirect(url_for('public.index'))
-        return f(*args, **kwargs)
     return decorated_function
 
 def language_required(f):
@@ -85,79 +101,3 @@ def language_required(f):
             session['language'] = current_app.config.get('DEFAULT_LANGUAGE', 'en')
         return f(*args, **kwargs)
     return decorated_function
-
-class APIClient:
-    """API Client for backend communication"""
-
-    def __init__(self):
-        self.base_url = None
-        self.headers = {}
-
-    def init_app(self, app):
-        """Initialize API client with app"""
-        self.base_url = f"{app.config['API_BASE_URL']}/api/{app.config['API_VERSION']}"
-        self.timeout = app.config.get('API_TIMEOUT', 30)
-
-    def set_auth_token(self, token):
-        """Set authentication token"""
-        self.headers['Authorization'] = f'Bearer {token}'
-
-    def get(self, endpoint, params=None):
-        """GET request to API"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/{endpoint}",
-                params=params,
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            return response
-        except Exception as e:
-            current_app.logger.error(f"API GET error: {str(e)}")
-            return None
-
-    def post(self, endpoint, data=None, json=None):
-        """POST request to API"""
-        try:
-            response = requests.post(
-                f"{self.base_url}/{endpoint}",
-                data=data,
-                json=json,
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            return response
-        except Exception as e:
-            current_app.logger.error(f"API POST error: {str(e)}")
-            return None
-
-    def put(self, endpoint, data=None, json=None):
-        """PUT request to API"""
-        try:
-            response = requests.put(
-                f"{self.base_url}/{endpoint}",
-                data=data,
-                json=json,
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            return response
-        except Exception as e:
-            current_app.logger.error(f"API PUT error: {str(e)}")
-            return None
-
-    def delete(self, endpoint):
-        """DELETE request to API"""
-        try:
-            response = requests.delete(
-                f"{self.base_url}/{endpoint}",
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            return response
-        except Exception as e:
-            current_app.logger.error(f"API DELETE error: {str(e)}")
-            return None
-
-# Initialize API client
-api_client = APIClient()
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Prometheus metrics for the frontend
+
+Request latency by route template and status, served on /metrics in the
+Prometheus text format for a local scrape, through the same Flask
+instrumentation as the USSD gateway (backend/utils/metrics.py). Backend
+calls show up in the backend's own /metrics.
+"""
+from backend.utils.metrics import instrument_flask
+
+
+def init_metrics(app, service: str = "frontend") -> None:
+    """Time every request of the app and serve /metrics"""
+    instrument_flask(app, service, database=False)
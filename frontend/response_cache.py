@@ -0,0 +1,280 @@
+"""
+Response and backend data cache
+
+Two layers share one store (an in-process LRU, or Redis so that every
+worker sees the same entries):
+
+* ``get_data`` caches what views fetch from the backend API. A value is
+  fresh for ``timeout`` seconds and may then be served stale for another
+  ``stale`` seconds while one background thread fetches a new copy, so a
+  busy page never waits on the API once it has been warmed.
+* ``cached_page`` caches whole rendered GET responses, keyed on the view,
+  its arguments, the query string, the visitor's language and role.
+  Pages are only served from cache to anonymous visitors unless the view
+  declares that its output depends on the role alone, as the shared
+  layouts show the signed-in user's name.
+
+Entries are grouped by tags; ``invalidate(tag)`` bumps the tag's
+generation, which orphans every entry built under the old one.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Iterable, List, Optional
+
+import msgpack
+import requests
+from flask import current_app, g, request, session
+
+
+def _pack(value) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _unpack(data: bytes):
+    return msgpack.unpackb(data, raw=False)
+
+
+class LRUCacheBackend:
+    """Entries in this process, least recently used evicted first"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, tags: List[str]) -> List[int]:
+        return [self._generations.get(tag, 0) for tag in tags]
+
+    def bump(self, tag: str) -> None:
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisCacheBackend:
+    """Entries in Redis, shared by every worker and expired by Redis itself"""
+
+    def __init__(self, url: str, prefix: str = "cache:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, data: bytes, ttl: int) -> None:
+        self.client.set(self.prefix + key, data, ex=ttl)
+
+    def generations(self, tags: List[str]) -> List[int]:
+        if not tags:
+            return []
+        return [int(value or 0) for value in self.client.mget([f"{self.prefix}tag:{tag}" for tag in tags])]
+
+    def bump(self, tag: str) -> None:
+        self.client.incr(f"{self.prefix}tag:{tag}")
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ResponseCache:
+    """Cache of backend data and rendered pages, configured from CACHE_* settings"""
+
+    def __init__(self):
+        self.backend = None
+        self.timeout = 300
+        self.stale = 600
+        self._refreshing = set()
+        self._fetching = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        cache_type = app.config.get("CACHE_TYPE", "simple")
+        if cache_type == "null":
+            self.backend = None
+        elif cache_type == "redis":
+            self.backend = RedisCacheBackend(app.config.get("CACHE_REDIS_URL", "redis://localhost:6379/2"))
+        else:
+            self.backend = LRUCacheBackend(app.config.get("CACHE_MAX_ENTRIES", 1024))
+        self.timeout = app.config.get("CACHE_DEFAULT_TIMEOUT", self.timeout)
+        self.stale = app.config.get("CACHE_STALE_TIMEOUT", self.stale)
+        app.extensions["response_cache"] = self
+
+    def _key(self, key: str, tags: Iterable[str]) -> str:
+        tags = sorted(tags)
+        generations = self.backend.generations(tags)
+        return ":".join(f"{tag}.{generation}" for tag, generation in zip(tags, generations)) + "|" + key
+
+    def _load(self, key: str):
+        """[fresh_until, value] of an entry still within its stale window"""
+        data = self.backend.get(key)
+        if data is None:
+            return None
+        fresh_until, stale_until, value = _unpack(data)
+        return [fresh_until, value] if time.time() < stale_until else None
+
+    def _store(self, key: str, value, timeout: int, stale: int) -> None:
+        now = time.time()
+        self.backend.set(key, _pack([now + timeout, now + timeout + stale, value]), timeout + stale)
+
+    def get_data(self, key: str, fetch: Callable, timeout: Optional[int] = None,
+                 stale: Optional[int] = None, tags: Iterable[str] = ()):
+        """
+        The cached result of ``fetch()``, fetching it on a miss
+
+        ``fetch`` must return msgpack-serializable data (decoded JSON) and
+        raise when the backend did not answer; failures are never cached.
+        Past ``timeout`` the old value is still returned for ``stale``
+        seconds while a background thread calls ``fetch`` again.
+        """
+        if self.backend is None:
+            return fetch()
+        timeout = self.timeout if timeout is None else timeout
+        stale = self.stale if stale is None else stale
+        key = self._key(key, tags)
+
+        entry = self._load(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if time.time() >= fresh_until:
+                self._refresh(key, fetch, timeout, stale)
+            return value
+
+        # Cold miss: one thread fetches, concurrent callers wait for its result
+        with self._lock:
+            event = self._fetching.get(key)
+            leader = event is None
+            if leader:
+                event = self._fetching[key] = threading.Event()
+        if not leader:
+            event.wait(timeout=30)
+            entry = self._load(key)
+            if entry is not None:
+                return entry[1]
+            return fetch()
+        try:
+            value = fetch()
+            self._store(key, value, timeout, stale)
+            return value
+        finally:
+            with self._lock:
+                del self._fetching[key]
+            event.set()
+
+    def get_json(self, url: str, default=None, timeout: Optional[int] = None,
+                 stale: Optional[int] = None, tags: Iterable[str] = ()):
+        """get_data() of a backend GET keyed on its URL; an error status returns ``default``, uncached"""
+        try:
+            return self.get_data(url, fetch_json(url), timeout, stale, tags)
+        except requests.exceptions.HTTPError:
+            return default
+
+    def _refresh(self, key: str, fetch: Callable, timeout: int, stale: int) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        app = current_app._get_current_object()
+
+        def refresh():
+            try:
+                self._store(key, fetch(), timeout, stale)
+            except Exception as e:
+                # Keep serving the stale copy; the next request past its expiry retries
+                app.logger.warning(f"Cache refresh of {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="cache-refresh", daemon=True).start()
+
+    def cached_page(self, timeout: Optional[int] = None, tags: Iterable[str] = ("pages",), by_role: bool = False):
+        """
+        Cache a GET view's rendered response
+
+        Signed-in users bypass the cache unless ``by_role`` is set, meaning
+        the page differs by role but not by user. Requests with pending
+        flash messages, and responses that are not 200, set cookies or
+        called ``dont_cache()``, are never cached.
+        """
+        def decorator(view):
+            @wraps(view)
+            def decorated_function(*args, **kwargs):
+                if (self.backend is None or request.method != "GET" or "_flashes" in session
+                        or ("user_token" in session and not by_role)):
+                    return view(*args, **kwargs)
+
+                language = session.get("language", current_app.config.get("DEFAULT_LANGUAGE", "en"))
+                role = session.get("user_role", "anonymous") if "user_token" in session else "anonymous"
+                view_args = sorted((request.view_args or {}).items())
+                query = sorted(request.args.items(multi=True))
+                key = self._key(f"page:{request.endpoint}:{view_args}:{query}:{language}:{role}", tags)
+
+                entry = self._load(key)
+                if entry is not None:
+                    status, body, content_type = entry[1]
+                    response = current_app.response_class(body, status=status, content_type=content_type)
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+
+                response = current_app.make_response(view(*args, **kwargs))
+                if (response.status_code == 200 and not response.direct_passthrough
+                        and "Set-Cookie" not in response.headers and not session.modified
+                        and not g.get("dont_cache", False)):
+                    page_timeout = self.timeout if timeout is None else timeout
+                    self._store(key, [200, response.get_data(), response.content_type], page_timeout, 0)
+                    response.headers["X-Cache"] = "MISS"
+                return response
+            return decorated_function
+        return decorator
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry cached under any of these tags"""
+        if self.backend is not None:
+            for tag in tags:
+                self.backend.bump(tag)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def dont_cache() -> None:
+    """Keep the current response out of the page cache, e.g. when it shows fallback data"""
+    g.dont_cache = True
+
+
+def fetch_json(url: str, timeout: int = 5, send: Callable = requests.request, **kwargs) -> Callable:
+    """A get_data() fetcher for a backend GET returning JSON, sent with ``send`` (e.g. api_client.request)"""
+    def fetch():
+        response = send("GET", url, timeout=timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+    return fetch
+
+
+response_cache = ResponseCache()
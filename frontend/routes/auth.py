@@ -4,6 +4,8 @@ Authentication routes
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from functools import wraps
 import requests
+from frontend.api_client import revoke_tokens, store_tokens
+from frontend.session_store import regenerate_session
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -67,8 +69,9 @@ def login():
                 data = response.json()
                 user_data = data['user']
 
-                # Store session data
-                session['user_token'] = data['access_token']
+                # Store session data, under a new session id
+                regenerate_session()
+                store_tokens(data)
                 session['user_id'] = user_data['member_id'] if user_data['member_id'] else user_data['id']
                 session['user_name'] = user_data['full_name']
                 session['user_role'] = user_data['role']
@@ -153,6 +156,7 @@ def register():
 
 @auth_bp.route('/logout')
 def logout():
+    revoke_tokens()
     session.clear()
     flash('Logged out successfully', 'info')
     return redirect(url_for('main.index'))
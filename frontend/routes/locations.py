@@ -3,19 +3,28 @@ Location management routes (Provinces, Districts, Wards)
 """
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify
 import requests
+from frontend.response_cache import response_cache
 
 locations_bp = Blueprint('locations', __name__)
 
+# Location lists are cached until a location is created, edited or deleted
+GEOGRAPHY_TIMEOUT = 3600
+
+
+def _geography(url, default=None):
+    """A location list or record from the backend, from the cache when possible"""
+    return response_cache.get_json(url, default, timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
+
 
 @locations_bp.route('/provinces')
 def provinces():
     """List all provinces"""
     api_url = current_app.config['API_BASE_URL']
     try:
-        provinces = requests.get(f"{api_url}/provinces/").json()
-        districts = requests.get(f"{api_url}/districts/").json()
-        constituencies = requests.get(f"{api_url}/constituencies/").json()
-        wards = requests.get(f"{api_url}/wards/").json()
+        provinces = _geography(f"{api_url}/provinces/", [])
+        districts = _geography(f"{api_url}/districts/", [])
+        constituencies = _geography(f"{api_url}/constituencies/", [])
+        wards = _geography(f"{api_url}/wards/", [])
     except:
         provinces = []
         districts = []
@@ -41,6 +50,7 @@ def new_province():
         try:
             response = requests.post(f"{api_url}/provinces/", json=province_data)
             if response.status_code == 201:
+                response_cache.invalidate('geography')
                 flash('Province created successfully!', 'success')
                 return redirect(url_for('locations.provinces'))
             else:
@@ -65,6 +75,7 @@ def create_district():
     try:
         response = requests.post(f"{api_url}/districts/", json=district_data)
         if response.status_code == 201:
+            response_cache.invalidate('geography')
             flash('District created successfully!', 'success')
         else:
             flash('Error creating district', 'error')
@@ -96,6 +107,7 @@ def edit_district(district_id):
     try:
         response = requests.put(f"{api_url}/districts/{district_id}", json=district_data)
         if response.status_code == 200:
+            response_cache.invalidate('geography')
             flash('District updated successfully!', 'success')
         else:
             flash('Error updating district', 'error')
@@ -122,6 +134,7 @@ def delete_district(district_id):
     try:
         response = requests.delete(f"{api_url}/districts/{district_id}")
         if response.status_code == 204:
+            response_cache.invalidate('geography')
             flash('District deleted successfully!', 'success')
         else:
             flash('Error deleting district', 'error')
@@ -136,15 +149,12 @@ def districts(province_id):
     """List districts by province"""
     api_url = current_app.config['API_BASE_URL']
     try:
-        response = requests.get(f"{api_url}/districts/province/{province_id}")
-        districts = response.json() if response.status_code == 200 else []
-
-        province_response = requests.get(f"{api_url}/provinces/{province_id}")
-        province = province_response.json() if province_response.status_code == 200 else None
+        districts = _geography(f"{api_url}/districts/province/{province_id}", [])
+        province = _geography(f"{api_url}/provinces/{province_id}")
 
         # Get all constituencies and wards for stats
-        constituencies = requests.get(f"{api_url}/constituencies/").json()
-        wards = requests.get(f"{api_url}/wards/").json()
+        constituencies = _geography(f"{api_url}/constituencies/", [])
+        wards = _geography(f"{api_url}/wards/", [])
     except:
         districts = []
         province = None
@@ -173,6 +183,7 @@ def create_constituency():
     try:
         response = requests.post(f"{api_url}/constituencies/", json=constituency_data)
         if response.status_code == 201:
+            response_cache.invalidate('geography')
             flash('Constituency created successfully!', 'success')
         else:
             flash('Error creating constituency', 'error')
@@ -204,6 +215,7 @@ def edit_constituency(constituency_id):
     try:
         response = requests.put(f"{api_url}/constituencies/{constituency_id}", json=constituency_data)
         if response.status_code == 200:
+            response_cache.invalidate('geography')
             flash('Constituency updated successfully!', 'success')
         else:
             flash('Error updating constituency', 'error')
@@ -230,6 +242,7 @@ def delete_constituency(constituency_id):
     try:
         response = requests.delete(f"{api_url}/constituencies/{constituency_id}")
         if response.status_code == 204:
+            response_cache.invalidate('geography')
             flash('Constituency deleted successfully!', 'success')
         else:
             flash('Error deleting constituency', 'error')
@@ -244,14 +257,11 @@ def constituencies(district_id):
     """List constituencies by district"""
     api_url = current_app.config['API_BASE_URL']
     try:
-        response = requests.get(f"{api_url}/constituencies/district/{district_id}")
-        constituencies = response.json() if response.status_code == 200 else []
-
-        district_response = requests.get(f"{api_url}/districts/{district_id}")
-        district = district_response.json() if district_response.status_code == 200 else None
+        constituencies = _geography(f"{api_url}/constituencies/district/{district_id}", [])
+        district = _geography(f"{api_url}/districts/{district_id}")
 
         # Get wards for stats
-        wards = requests.get(f"{api_url}/wards/").json()
+        wards = _geography(f"{api_url}/wards/", [])
     except:
         constituencies = []
         district = None
@@ -278,6 +288,7 @@ def create_ward():
     try:
         response = requests.post(f"{api_url}/wards/", json=ward_data)
         if response.status_code == 201:
+            response_cache.invalidate('geography')
             flash('Ward created successfully!', 'success')
         else:
             flash('Error creating ward', 'error')
@@ -309,6 +320,7 @@ def edit_ward(ward_id):
     try:
         response = requests.put(f"{api_url}/wards/{ward_id}", json=ward_data)
         if response.status_code == 200:
+            response_cache.invalidate('geography')
             flash('Ward updated successfully!', 'success')
         else:
             flash('Error updating ward', 'error')
@@ -335,6 +347,7 @@ def delete_ward(ward_id):
     try:
         response = requests.delete(f"{api_url}/wards/{ward_id}")
         if response.status_code == 204:
+            response_cache.invalidate('geography')
             flash('Ward deleted successfully!', 'success')
         else:
             flash('Error deleting ward', 'error')
@@ -349,11 +362,8 @@ def wards(constituency_id):
     """List wards by constituency"""
     api_url = current_app.config['API_BASE_URL']
     try:
-        response = requests.get(f"{api_url}/wards/constituency/{constituency_id}")
-        wards = response.json() if response.status_code == 200 else []
-
-        constituency_response = requests.get(f"{api_url}/constituencies/{constituency_id}")
-        constituency = constituency_response.json() if constituency_response.status_code == 200 else None
+        wards = _geography(f"{api_url}/wards/constituency/{constituency_id}", [])
+        constituency = _geography(f"{api_url}/constituencies/{constituency_id}")
     except:
         wards = []
         constituency = None
@@ -368,8 +378,7 @@ def api_get_districts(province_id):
     """API endpoint to get districts for a province"""
     api_url = current_app.config['API_BASE_URL']
     try:
-        response = requests.get(f"{api_url}/districts/province/{province_id}")
-        return jsonify(response.json() if response.status_code == 200 else [])
+        return jsonify(_geography(f"{api_url}/districts/province/{province_id}", []))
     except:
         return jsonify([])
 
@@ -379,7 +388,6 @@ def api_get_wards(district_id):
     """API endpoint to get wards for a district"""
     api_url = current_app.config['API_BASE_URL']
     try:
-        response = requests.get(f"{api_url}/wards/district/{district_id}")
-        return jsonify(response.json() if response.status_code == 200 else [])
+        return jsonify(_geography(f"{api_url}/wards/district/{district_id}", []))
     except:
         return jsonify([])
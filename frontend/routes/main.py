@@ -2,23 +2,30 @@
 Main routes
 """
 from flask import Blueprint, render_template, session, current_app
-import requests
+from frontend.response_cache import response_cache, dont_cache
 
 main_bp = Blueprint('main', __name__)
 
+# Geography changes rarely and is invalidated on edit; member counts may lag a little
+GEOGRAPHY_TIMEOUT = 3600
+STATISTICS_TIMEOUT = 60
+
 
 @main_bp.route('/')
+@response_cache.cached_page(timeout=60)
 def index():
     """Landing page"""
     api_url = current_app.config.get('API_BASE_URL', 'http://localhost:9500/api/v1')
 
     try:
         # Fetch real data from API
-        members_response = requests.get(f"{api_url}/members/", timeout=2)
-        provinces_response = requests.get(f"{api_url}/provinces/", timeout=2)
+        membership = response_cache.get_json(f"{api_url}/statistics/membership", {},
+                                             timeout=STATISTICS_TIMEOUT, tags=('statistics',))
+        provinces = response_cache.get_json(f"{api_url}/provinces/", [],
+                                            timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
 
-        total_members = len(members_response.json()) if members_response.status_code == 200 else 0
-        provinces_count = len(provinces_response.json()) if provinces_response.status_code == 200 else 0
+        total_members = membership.get('total_members', 0)
+        provinces_count = len(provinces)
 
         stats = {
             'total_members': f"{total_members:,}",
@@ -28,6 +35,7 @@ def index():
         }
     except:
         # Fallback if API is not available
+        dont_cache()
         stats = {
             'total_members': '0',
             'provinces_covered': '0',
@@ -47,46 +55,31 @@ def dashboard():
     api_url = current_app.config.get('API_BASE_URL', 'http://localhost:9500/api/v1')
 
     try:
-        # Fetch real data from API
-        members_response = requests.get(f"{api_url}/members/", timeout=2)
-        provinces_response = requests.get(f"{api_url}/provinces/", timeout=2)
-        districts_response = requests.get(f"{api_url}/districts/", timeout=2)
-        wards_response = requests.get(f"{api_url}/wards/", timeout=2)
-
-        members = members_response.json() if members_response.status_code == 200 else []
-        provinces = provinces_response.json() if provinces_response.status_code == 200 else []
-        districts = districts_response.json() if districts_response.status_code == 200 else []
-        wards = wards_response.json() if wards_response.status_code == 200 else []
+        # Member counts come pre-aggregated from the membership counters
+        membership = response_cache.get_json(f"{api_url}/statistics/membership", {},
+                                             timeout=STATISTICS_TIMEOUT, tags=('statistics',))
+        provinces = response_cache.get_json(f"{api_url}/provinces/", [],
+                                            timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
+        districts = response_cache.get_json(f"{api_url}/districts/", [],
+                                            timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
+        wards = response_cache.get_json(f"{api_url}/wards/", [],
+                                        timeout=GEOGRAPHY_TIMEOUT, tags=('geography',))
 
         # Calculate statistics
-        total_members = len(members)
+        total_members = membership.get('total_members', 0)
         total_provinces = len(provinces)
         total_districts = len(districts)
         total_wards = len(wards)
 
         # Gender breakdown
-        male_count = sum(1 for m in members if m.get('gender') == 'Male')
-        female_count = sum(1 for m in members if m.get('gender') == 'Female')
-
-        # Count members by province (using ward relationships)
-        province_counts = {}
-        for member in members:
-            ward_id = member.get('ward_id')
-            if ward_id:
-                # Find the ward
-                ward = next((w for w in wards if w['id'] == ward_id), None)
-                if ward:
-                    district_id = ward.get('district_id')
-                    district = next((d for d in districts if d['id'] == district_id), None)
-                    if district:
-                        province_id = district.get('province_id')
-                        province = next((p for p in provinces if p['id'] == province_id), None)
-                        if province:
-                            province_name = province.get('name')
-                            province_counts[province_name] = province_counts.get(province_name, 0) + 1
-
-        # Sort provinces by member count (descending)
-        sorted_provinces = sorted(province_counts.items(), key=lambda x: x[1], reverse=True)
+        male_count = membership.get('gender', {}).get('Male', 0)
+        female_count = membership.get('gender', {}).get('Female', 0)
+
+        # Provinces by member count (already sorted descending)
+        sorted_provinces = [
+            (location['name'], location['member_count'])
+            for location in membership.get('locations', [])
+        ]
 
         stats = {
             'total_members': total_members,
@@ -2,7 +2,7 @@
 Member Portal Routes - For individual members to view their own data
 """
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app
-import requests
+from frontend.api_client import api_client
 from datetime import date, datetime
 import qrcode
 import io
@@ -26,7 +26,7 @@ def dashboard():
 
     try:
         # Get member details
-        member_response = requests.get(f"{api_url}/members/{member_id}", timeout=5)
+        member_response = api_client.request('GET', f"{api_url}/members/{member_id}", timeout=5)
         if member_response.status_code == 200:
             member = member_response.json()
         else:
@@ -34,14 +34,14 @@ def dashboard():
             member = None
 
         # Get member's events
-        events_response = requests.get(f"{api_url}/events/registrations/member/{member_id}", timeout=5)
+        events_response = api_client.request('GET', f"{api_url}/events/registrations/member/{member_id}", timeout=5)
         if events_response.status_code == 200:
             events = events_response.json()
         else:
             events = []
 
         # Get member's referrals
-        referrals_response = requests.get(f"{api_url}/referrals/?referrer_id={member_id}", timeout=5)
+        referrals_response = api_client.request('GET', f"{api_url}/referrals/?referrer_id={member_id}", timeout=5)
         if referrals_response.status_code == 200:
             referrals_data = referrals_response.json()
             referrals = referrals_data.get('referrals', [])
@@ -88,7 +88,7 @@ def profile():
     member_id = session.get('user_id')
 
     try:
-        response = requests.get(f"{api_url}/members/{member_id}")
+        response = api_client.request('GET', f"{api_url}/members/{member_id}")
         member = response.json() if response.status_code == 200 else None
     except:
         member = None
@@ -143,7 +143,7 @@ def edit_profile():
                     flash('Invalid file type. Please upload a PNG, JPG, JPEG, or GIF file.', 'warning')
 
         try:
-            response = requests.put(f"{api_url}/members/{member_id}", json=member_data)
+            response = api_client.request('PUT', f"{api_url}/members/{member_id}", json=member_data)
             if response.status_code == 200:
                 flash('Profile updated successfully!', 'success')
                 return redirect(url_for('member_portal.profile'))
@@ -153,7 +153,7 @@ def edit_profile():
             flash(f'Error: {str(e)}', 'error')
 
     try:
-        member_response = requests.get(f"{api_url}/members/{member_id}")
+        member_response = api_client.request('GET', f"{api_url}/members/{member_id}")
         member = member_response.json() if member_response.status_code == 200 else None
     except:
         member = None
@@ -173,7 +173,7 @@ def my_events():
     member_id = session.get('user_id')
 
     try:
-        response = requests.get(f"{api_url}/events/registrations/member/{member_id}")
+        response = api_client.request('GET', f"{api_url}/events/registrations/member/{member_id}")
         events = response.json() if response.status_code == 200 else []
 
         # Categorize events
@@ -205,7 +205,7 @@ def my_referrals():
 
     try:
         # Get referrals
-        response = requests.get(f"{api_url}/referrals/?referrer_id={member_id}")
+        response = api_client.request('GET', f"{api_url}/referrals/?referrer_id={member_id}")
         data = response.json() if response.status_code == 200 else {}
         referrals = data.get('referrals', [])
 
@@ -254,7 +254,7 @@ def new_referral():
         }
 
         try:
-            response = requests.post(f"{api_url}/referrals", json=referral_data)
+            response = api_client.request('POST', f"{api_url}/referrals", json=referral_data)
             if response.status_code == 201:
                 flash('Referral created successfully!', 'success')
                 return redirect(url_for('member_portal.my_referrals'))
@@ -278,7 +278,7 @@ def membership_card():
 
     try:
         # Get member details
-        response = requests.get(f"{api_url}/members/{member_id}")
+        response = api_client.request('GET', f"{api_url}/members/{member_id}")
         if response.status_code != 200:
             flash('Error loading member details', 'error')
             return redirect(url_for('member_portal.dashboard'))
@@ -322,28 +322,28 @@ def membership_card():
 
         if member.get('ward_id'):
             try:
-                ward_response = requests.get(f"{api_url}/wards/{member.get('ward_id')}")
+                ward_response = api_client.request('GET', f"{api_url}/wards/{member.get('ward_id')}")
                 if ward_response.status_code == 200:
                     ward = ward_response.json()
                     ward_name = ward.get('name')
 
                     # Get constituency
                     if ward.get('constituency_id'):
-                        const_response = requests.get(f"{api_url}/constituencies/{ward.get('constituency_id')}")
+                        const_response = api_client.request('GET', f"{api_url}/constituencies/{ward.get('constituency_id')}")
                         if const_response.status_code == 200:
                             constituency = const_response.json()
                             constituency_name = constituency.get('name')
 
                             # Get district
                             if constituency.get('district_id'):
-                                dist_response = requests.get(f"{api_url}/districts/{constituency.get('district_id')}")
+                                dist_response = api_client.request('GET', f"{api_url}/districts/{constituency.get('district_id')}")
                                 if dist_response.status_code == 200:
                                     district = dist_response.json()
                                     district_name = district.get('name')
 
                                     # Get province
                                     if district.get('province_id'):
-                                        prov_response = requests.get(f"{api_url}/provinces/{district.get('province_id')}")
+                                        prov_response = api_client.request('GET', f"{api_url}/provinces/{district.get('province_id')}")
                                         if prov_response.status_code == 200:
                                             province = prov_response.json()
                                             province_name = province.get('name')
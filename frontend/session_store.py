@@ -0,0 +1,242 @@
+"""
+Server-side Flask sessions
+
+The cookie only carries a random session id; the session itself is kept in
+a store (SQLite in WAL mode, or Redis) as one msgpack record. Sessions are
+written back only when a view changed them, or when a long-lived session is
+past half its lifetime, so most requests cost a single read. Values are
+capped in size: sessions hold ids and tokens, not data, and a bulky value is
+rejected where it is assigned rather than slowing down every later request.
+
+Sessions hold bearer tokens: the SQLite file is kept owner-only, and login
+must call regenerate_session() so a session id planted before login is
+never the one that carries the tokens.
+"""
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import msgpack
+from flask import current_app, session
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class SessionValueTooLarge(ValueError):
+    """Raised when a session value or the whole session exceeds its size cap"""
+
+
+def _pack(value) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _unpack(data: bytes):
+    return msgpack.unpackb(data, raw=False)
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """A session dict that knows its id and refuses oversized values"""
+
+    def __init__(self, initial=None, sid=None, new=False, expires_at=0.0, max_value_bytes=None):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.max_value_bytes = max_value_bytes
+        self.modified = False
+
+    def __setitem__(self, key, value):
+        if self.max_value_bytes is not None:
+            size = len(_pack(value))
+            if size > self.max_value_bytes:
+                raise SessionValueTooLarge(
+                    f"session[{key!r}] is {size} bytes, over the {self.max_value_bytes} byte limit"
+                )
+        super().__setitem__(key, value)
+
+
+class SQLiteSessionStore:
+    """Sessions in a local SQLite database in WAL mode, one connection per thread"""
+
+    # Expired rows are purged on about one write in this many
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        # Owner-only before SQLite opens it; its -wal and -shm files copy the mode
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            # WAL lets readers carry on while a session is written
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, sid: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid: str, data: bytes, ttl: int) -> None:
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+            (sid, data, time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, sid: str) -> None:
+        self._connection().execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+
+class RedisSessionStore:
+    """Sessions in Redis, expired by Redis itself"""
+
+    def __init__(self, url: str, prefix: str = "session:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, sid: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + sid)
+
+    def set(self, sid: str, data: bytes, ttl: int) -> None:
+        self.client.set(self.prefix + sid, data, ex=ttl)
+
+    def delete(self, sid: str) -> None:
+        self.client.delete(self.prefix + sid)
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Flask session interface over a SQLite or Redis session store
+
+    Each record is msgpack of [expires_at, session dict]. Only msgpack
+    types (str, bytes, numbers, bool, None, lists, dicts) can be stored;
+    tuples come back as lists.
+    """
+
+    def __init__(self, store, lifetime: int, max_bytes: int = 8192, max_value_bytes: int = 2048):
+        self.store = store
+        self.lifetime = lifetime
+        self.max_bytes = max_bytes
+        self.max_value_bytes = max_value_bytes
+
+    def _new_session(self) -> ServerSession:
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True, max_value_bytes=self.max_value_bytes)
+
+    def regenerate(self, session: ServerSession) -> None:
+        """Move the session to a new id, dropping the record under the old one"""
+        if not session.new:
+            self.store.delete(session.sid)
+        session.sid = secrets.token_urlsafe(32)
+        session.new = True
+        session.modified = True
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return self._new_session()
+
+        record = self.store.get(sid)
+        if record is None:
+            return self._new_session()
+        try:
+            expires_at, data = _unpack(record)
+        except (ValueError, TypeError, msgpack.UnpackException):
+            app.logger.warning("Discarding unreadable session record")
+            return self._new_session()
+        if expires_at <= time.time():
+            return self._new_session()
+        return ServerSession(data, sid=sid, expires_at=expires_at, max_value_bytes=self.max_value_bytes)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            # Emptied (logged out): drop the record and the cookie
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        # Lazy write-back: an unchanged session is only rewritten to extend it
+        # once it is past half its lifetime
+        now = time.time()
+        stale = session.expires_at - now < self.lifetime / 2
+        if not (session.modified or session.new or stale):
+            return
+
+        expires_at = now + self.lifetime
+        record = _pack([expires_at, dict(session)])
+        if len(record) > self.max_bytes:
+            raise SessionValueTooLarge(f"session is {len(record)} bytes, over the {self.max_bytes} byte limit")
+        self.store.set(session.sid, record, self.lifetime)
+        session.expires_at = expires_at
+
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+SESSION_STORES = ("sqlite", "redis")
+
+
+def init_session_store(app) -> None:
+    """Install the server-side session interface configured by SESSION_TYPE"""
+    if app.config["SESSION_TYPE"] == "redis":
+        store = RedisSessionStore(app.config["SESSION_REDIS_URL"])
+    else:
+        path = app.config.get("SESSION_SQLITE_PATH")
+        if not path:
+            os.makedirs(app.instance_path, mode=0o700, exist_ok=True)
+            path = os.path.join(app.instance_path, "sessions.db")
+        store = SQLiteSessionStore(path)
+    app.session_interface = ServerSessionInterface(
+        store,
+        lifetime=int(app.permanent_session_lifetime.total_seconds()),
+        max_bytes=app.config.get("SESSION_MAX_BYTES", 8192),
+        max_value_bytes=app.config.get("SESSION_MAX_VALUE_BYTES", 2048),
+    )
+
+
+def regenerate_session() -> None:
+    """
+    Give the current session a new id at login, against session fixation
+
+    Works with this module's interface and Flask-Session's; signed cookie
+    sessions have no server-side id and are left alone.
+    """
+    regenerate = getattr(current_app.session_interface, "regenerate", None)
+    if regenerate is not None:
+        regenerate(session)
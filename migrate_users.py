@@ -12,18 +12,13 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from backend.config.database import Base
 from backend.models import User, Member
-import hashlib
+from backend.services.pin_hasher import hash_pin
 
 # Create engine and session for SQLite
 engine = create_engine('sqlite:///member_registry.db')
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def hash_pin(pin: str) -> str:
-    """Hash a PIN using SHA256"""
-    return hashlib.sha256(pin.encode()).hexdigest()
-
-
 def create_users_table():
     """Create the users table"""
     print("Creating users table...")